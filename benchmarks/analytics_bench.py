@@ -0,0 +1,129 @@
+"""
+Compare dictionary loops with the NumPy column engine for vote analytics.
+
+Builds synthetic vote columns (voter, candidate, block height, timestamp),
+then times per-candidate tallies, participation counts and an hourly
+histogram both ways. Also measures how fast blocks are loaded into the
+columns.
+
+Usage:
+    python -m benchmarks.analytics_bench --votes 10000000 --candidates 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.blockchain.block import Block
+from src.blockchain.chain import ChainView
+from src.network.analytics import ColumnSnapshot, VoteColumns, histogram, summarize
+
+def build_columns(votes: int, candidates: int, voters: int, per_block: int) -> ColumnSnapshot:
+    """
+    Build random vote columns in chain order.
+    Block timestamps are jittered so they do not increase with height, as
+    when blocks come from peers with skewed clocks.
+    """
+    rng = np.random.default_rng(42)
+    height = (np.arange(votes) // per_block + 1).astype(np.int32)
+    blocks = int(height[-1]) + 1 if votes else 1
+    block_time = 1.7e9 + np.arange(blocks) * 10 + rng.uniform(-3600, 3600, blocks)
+    return ColumnSnapshot(
+        voter=rng.integers(0, voters, votes, dtype=np.int32),
+        candidate=rng.integers(0, candidates, votes, dtype=np.int32),
+        height=height,
+        timestamp=block_time[height],
+        candidates=[f'candidate-{i}' for i in range(candidates)],
+        voters=voters,
+        blocks=blocks
+    )
+
+def loop_analytics(names, voters, timestamps):
+    """The per-transaction dictionary loops the voting endpoints used to run."""
+    counts = {}
+    seen = set()
+    timeline = {}
+    for name, voter, ts in zip(names, voters, timestamps):
+        counts[name] = counts.get(name, 0) + 1
+        seen.add(voter)
+        hour = int(ts // 3600)
+        timeline[hour] = timeline.get(hour, 0) + 1
+    return counts, len(seen), timeline
+
+def numpy_analytics(snap: ColumnSnapshot):
+    """The same results from the column engine."""
+    stats = summarize(snap)
+    hourly = histogram(snap, 3600)
+    return stats, hourly
+
+def timed(fn, repeat: int):
+    """Return (result, best time in seconds) over several runs."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def ingest(blocks: int, per_block: int, candidates: int) -> float:
+    """Feed synthetic blocks through the chain listener; return votes per second."""
+    chain = [Block(index=0, transactions=[], previous_hash='0' * 64, timestamp=1.0)]
+    for i in range(1, blocks + 1):
+        txs = [
+            {'sender': f'voter-{i}-{j}', 'recipient': f'candidate-{j % candidates}', 'amount': 1}
+            for j in range(per_block)
+        ]
+        chain.append(Block(index=i, transactions=txs, previous_hash=chain[-1].hash, timestamp=1.0 + i))
+    columns = VoteColumns()
+    old = ChainView([])
+    start = time.perf_counter()
+    for i in range(len(chain)):
+        new = ChainView(chain, i + 1)
+        columns.on_change('chain', {'old': old, 'new': new, 'fork': i})
+        old = new
+    elapsed = time.perf_counter() - start
+    return blocks * per_block / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dict loops vs NumPy vote analytics')
+    parser.add_argument('--votes', type=int, default=10_000_000, help='Number of votes')
+    parser.add_argument('--candidates', type=int, default=50, help='Number of candidates')
+    parser.add_argument('--voters', type=int, default=None, help='Distinct voters (default: votes)')
+    parser.add_argument('--per-block', type=int, default=1000, help='Votes per block')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    parser.add_argument('--ingest-blocks', type=int, default=200, help='Blocks for the ingest measurement')
+    parser.add_argument('--skip-loops', action='store_true', help='Skip the dictionary-loop baseline')
+    args = parser.parse_args()
+
+    snap = build_columns(args.votes, args.candidates, args.voters or args.votes, args.per_block)
+    print(f"Votes: {args.votes:,}  candidates: {args.candidates}  blocks: {snap.blocks:,}")
+
+    (stats, hourly), numpy_time = timed(lambda: numpy_analytics(snap), args.repeat)
+    # Out-of-order timestamps: the default range must still cover every vote
+    assert stats['first_vote'] == snap.timestamp.min() and stats['last_vote'] == snap.timestamp.max()
+    assert hourly['total_votes'] == args.votes
+    print(f"{'numpy':<10}{numpy_time * 1000:>12.1f} ms   "
+          f"({stats['distinct_voters']:,} voters, {len(hourly['counts'])} hourly buckets)")
+
+    if not args.skip_loops:
+        names = [snap.candidates[i] for i in snap.candidate.tolist()]
+        voters = snap.voter.tolist()
+        timestamps = snap.timestamp.tolist()
+        (counts, distinct, _), loop_time = timed(lambda: loop_analytics(names, voters, timestamps), 1)
+        assert distinct == stats['distinct_voters']
+        assert all(counts.get(c['candidate']) == c['votes'] for c in stats['candidates'])
+        print(f"{'loops':<10}{loop_time * 1000:>12.1f} ms   speedup x{loop_time / numpy_time:.1f}")
+
+    rate = ingest(args.ingest_blocks, args.per_block, args.candidates)
+    print(f"Ingest: {rate:,.0f} votes/s through the chain listener "
+          f"({args.ingest_blocks} blocks x {args.per_block} votes)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare JSON and the binary wire codec for node-to-node payloads.
+
+Reports bytes on the wire (raw, gzip, zlib) and encode/decode time for a
+synthetic voting chain.
+
+Usage:
+    python -m benchmarks.codec_bench --blocks 200 --votes 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.blockchain.block import Block
+from src.network import codec
+
+def build_chain(blocks: int, votes: int):
+    """Build a linked chain of vote blocks without proof of work."""
+    chain = [Block(index=0, transactions=[], previous_hash='0' * 64, timestamp=1.0)]
+    for i in range(1, blocks + 1):
+        txs = [
+            {'sender': f'voter-{i}-{j}', 'recipient': f'candidate-{j % 7}', 'amount': 1}
+            for j in range(votes)
+        ]
+        chain.append(Block(index=i, transactions=txs, previous_hash=chain[-1].hash,
+                           timestamp=1.0 + i))
+    return chain
+
+def timed(fn, repeat: int):
+    """Return (result, best time in seconds) over several runs."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON vs binary chain encoding')
+    parser.add_argument('--blocks', type=int, default=200, help='Number of blocks')
+    parser.add_argument('--votes', type=int, default=50, help='Votes per block')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    args = parser.parse_args()
+
+    chain = build_chain(args.blocks, args.votes)
+
+    def encode_json():
+        return json.dumps({'chain': [b.to_dict() for b in chain], 'difficulty': 4},
+                          separators=(',', ':')).encode()
+
+    def encode_binary():
+        for block in chain:
+            block.invalidate_cache()
+        return codec.encode_chain(chain, 4)
+
+    json_body, json_enc = timed(encode_json, args.repeat)
+    bin_body, bin_enc = timed(encode_binary, args.repeat)
+    _, json_dec = timed(lambda: [Block.from_dict(b) for b in json.loads(json_body)['chain']], args.repeat)
+    _, bin_dec = timed(lambda: codec.decode_chain(bin_body), args.repeat)
+
+    print(f"Chain: {args.blocks} blocks x {args.votes} votes")
+    print(f"{'format':<10}{'raw bytes':>12}{'gzip':>12}{'zlib':>12}{'encode ms':>12}{'decode ms':>12}")
+    for name, body, enc, dec in (('json', json_body, json_enc, json_dec),
+                                 ('binary', bin_body, bin_enc, bin_dec)):
+        print(f"{name:<10}{len(body):>12}{len(codec.compress(body, 'gzip')):>12}"
+              f"{len(codec.compress(body, 'deflate')):>12}{enc * 1000:>12.1f}{dec * 1000:>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare vote ingest through /vote (one vote per request) and /votes/batch.
+
+Runs the voting routes in-process with Flask's test client, so the numbers
+cover request parsing, validation and the pending pool but not the network.
+
+Usage:
+    python -m benchmarks.ingest_bench --votes 20000 --batch 5000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from flask import Flask
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.blockchain.chain import Blockchain
+from src.network.voting import setup_voting_routes
+
+def make_client():
+    """Fresh node state with the voting routes mounted."""
+    app = Flask(__name__)
+    logger = logging.getLogger('ingest_bench')
+    logger.setLevel(logging.WARNING)
+    setup_voting_routes(app, Blockchain(), logger)
+    return app.test_client()
+
+def single(client, votes):
+    for vote in votes:
+        client.post('/vote', json=vote)
+
+def batched(client, votes, size: int, ndjson: bool):
+    for i in range(0, len(votes), size):
+        chunk = votes[i:i + size]
+        if ndjson:
+            body = '\n'.join(json.dumps(v) for v in chunk)
+            client.post('/votes/batch', data=body, content_type='application/x-ndjson')
+        else:
+            client.post('/votes/batch', json=chunk)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single vs batched vote ingest')
+    parser.add_argument('--votes', type=int, default=20000, help='Votes to submit per mode')
+    parser.add_argument('--batch', type=int, default=5000, help='Votes per batch request')
+    args = parser.parse_args()
+
+    votes = [{'voter': f'voter-{i}', 'candidate': f'candidate-{i % 7}'} for i in range(args.votes)]
+    print(f"{'mode':<14}{'seconds':>10}{'votes/s':>12}")
+    for name, run in (('single /vote', lambda c: single(c, votes)),
+                      ('batch json', lambda c: batched(c, votes, args.batch, False)),
+                      ('batch ndjson', lambda c: batched(c, votes, args.batch, True))):
+        client = make_client()
+        start = time.perf_counter()
+        run(client)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14}{elapsed:>10.2f}{args.votes / elapsed:>12,.0f}")
+
+if __name__ == '__main__':
+    main()
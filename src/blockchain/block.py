@@ -16,6 +16,18 @@ def hash_pair(a: str, b: str) -> str:
     """
     return hashlib.sha256((a + b).encode()).hexdigest()
 
+def tx_hash(tx: Dict[str, Any]) -> str:
+    """
+    Calculate the hash of a transaction, used as its ID and Merkle leaf.
+    
+    Args:
+        tx: Transaction dictionary
+    
+    Returns:
+        Transaction hash string
+    """
+    return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+
 def compute_merkle_root(tx_hashes: List[str]) -> str:
     """
     Calculate Merkle root hash from transaction hashes.
@@ -67,6 +79,8 @@ class Block:
         self.merkle_tree = self._build_merkle_tree()
         self.merkle_root = self.merkle_tree[-1][0]  # Root is the last level's first node
         self.hash = self.calculate_hash()
+        # Serialized forms by format, each keyed by the hash it was built for
+        self._cache = {}
 
     def _build_merkle_tree(self) -> List[List[str]]:
         """
@@ -79,10 +93,7 @@ class Block:
             return [['0' * 64]]
             
         # Calculate leaf node hashes
-        tx_hashes = [
-            hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
-            for tx in self.transactions
-        ]
+        tx_hashes = [tx_hash(tx) for tx in self.transactions]
         
         # Build tree level by level
         tree = [tx_hashes]  # First level is transaction hashes
@@ -147,6 +158,7 @@ class Block:
             self.transactions[tx_index] = new_transaction
             
         # Update block hash and merkle root
+        self.invalidate_cache()
         self.merkle_tree = self._build_merkle_tree()
         self.merkle_root = self.merkle_tree[-1][0]  # Root is the last level's first node
         self.hash = self.calculate_hash()
@@ -195,9 +207,7 @@ class Block:
             raise IndexError("Transaction index out of range")
             
         # Calculate current transaction hash
-        current_tx_hash = hashlib.sha256(
-            json.dumps(self.transactions[tx_index], sort_keys=True).encode()
-        ).hexdigest()
+        current_tx_hash = tx_hash(self.transactions[tx_index])
         
         # Get path to root
         path = self._get_path_to_root(tx_index)
@@ -281,6 +291,57 @@ class Block:
             "merkle_tree": self.merkle_tree
         }
 
+    def header(self) -> Dict[str, Any]:
+        """
+        Get the block header: every field except transactions and Merkle tree.
+        
+        Returns:
+            Dictionary containing header fields
+        """
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "hash": self.hash,
+            "nonce": self.nonce,
+            "difficulty": self.difficulty,
+            "merkle_root": self.merkle_root
+        }
+
+    def cached(self, key: str, build) -> Any:
+        """
+        Get a value derived from this block, computing it at most once per block hash.
+        
+        Args:
+            key: Name of the derived value (e.g. a serialization format)
+            build: Function computing the value
+            
+        Returns:
+            Cached or freshly built value
+        """
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == self.hash:
+            return entry[1]
+        value = build()
+        self._cache[key] = (self.hash, value)
+        return value
+
+    def to_json(self) -> bytes:
+        """
+        Get the block serialized as JSON bytes.
+        The result is cached until the block hash changes or invalidate_cache() is called.
+        
+        Returns:
+            JSON encoding of to_dict()
+        """
+        return self.cached('json', lambda: json.dumps(self.to_dict(), separators=(',', ':')).encode())
+
+    def invalidate_cache(self) -> None:
+        """
+        Drop cached serializations after the block was modified in place.
+        """
+        self._cache = {}
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Block':
         """
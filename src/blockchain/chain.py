@@ -1,17 +1,305 @@
-from typing import List, Dict, Any
-from .block import Block
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple
+import bisect
+import hashlib
+import json
+import logging
+import threading
+from itertools import islice
+from .block import Block, tx_hash
+from .follow import ChainFollower
+from .guard import DoubleVoteGuard
 import time
 
+class ChainView(Sequence):
+    """
+    Immutable snapshot of a chain: the first `length` blocks of a shared,
+    append-only block list.
+    Appending to the newest view extends the shared list in place, so
+    snapshots are structurally shared and cost O(1) to publish; older views
+    never see the extra blocks because their length is fixed.
+    """
+
+    __slots__ = ('_blocks', '_length')
+
+    def __init__(self, blocks: List[Block] = None, length: int = None):
+        """
+        Initialize view.
+
+        Args:
+            blocks: Shared block list (a new list is used if omitted)
+            length: Number of blocks visible in this view (defaults to all)
+        """
+        self._blocks = blocks if blocks is not None else []
+        self._length = len(self._blocks) if length is None else length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(islice(self._blocks, self._length))[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("chain index out of range")
+        return self._blocks[index]
+
+    def __iter__(self) -> Iterator[Block]:
+        return islice(self._blocks, self._length)
+
+    def __reversed__(self) -> Iterator[Block]:
+        blocks = self._blocks
+        for i in range(self._length - 1, -1, -1):
+            yield blocks[i]
+
+    def appended(self, block: Block) -> 'ChainView':
+        """
+        Get a new view with one more block.
+        Shares the block list when this is its newest view; copies it otherwise.
+
+        Args:
+            block: Block to append
+
+        Returns:
+            New view ending with block
+        """
+        if len(self._blocks) == self._length:
+            blocks = self._blocks
+        else:
+            blocks = self._blocks[:self._length]
+        blocks.append(block)
+        return ChainView(blocks, self._length + 1)
+
+def common_prefix_length(old: Sequence[Block], new: Sequence[Block]) -> int:
+    """
+    Count the leading blocks two chains have in common (the fork point).
+    Searches back from the shorter tip, so it costs O(reorg depth).
+
+    Args:
+        old: First chain
+        new: Second chain
+
+    Returns:
+        Number of shared leading blocks
+    """
+    i = min(len(old), len(new))
+    while i > 0 and old[i - 1].hash != new[i - 1].hash:
+        i -= 1
+    return i
+
+class ChainIndex(ChainFollower):
+    """
+    Secondary indexes for explorer queries: blocks by hash, transactions by
+    sender and by recipient, and blocks sorted by timestamp.
+    Like the vote guard it follows chain changes: blocks that left the chain
+    are removed newest first and the new ones added, so an update costs
+    O(changed blocks). Block timestamps need not increase with height, so the
+    time index is a sorted array of (timestamp, height) with a running count
+    of transactions, and range queries bisect it. The index has its own lock,
+    so queries never wait for the writer lock. Un-indexing reads the block,
+    so an edited block is handled by a rebuild.
+    """
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self._chain: Sequence[Block] = ChainView()
+        self.by_hash: Dict[str, int] = {}
+        # Address -> (height, position) of its transactions in chain order
+        self.by_sender: Dict[str, List[Tuple[int, int]]] = {}
+        self.by_recipient: Dict[str, List[Tuple[int, int]]] = {}
+        # (timestamp, height) of every block, sorted
+        self.by_time: List[Tuple[float, int]] = []
+        # Transactions in by_time[:i] at position i
+        self._time_counts: List[int] = [0]
+        self.stats = {'blocks_added': 0, 'blocks_removed': 0, 'rebuilds': 0}
+
+    def rebuild(self, chain: Sequence[Block]) -> None:
+        """
+        Re-index a whole chain.
+
+        Args:
+            chain: Current chain
+        """
+        with self._lock:
+            self._chain = chain
+            self.by_hash, self.by_sender, self.by_recipient = {}, {}, {}
+            self.by_time, self._time_counts = [], [0]
+            self._replay(chain)
+            self.stats['rebuilds'] += 1
+
+    def chain_changed(self, old: Sequence[Block], new: Sequence[Block], fork: int) -> None:
+        """
+        Follow a chain change: un-index blocks that left, index the new ones.
+
+        Args:
+            old: Previous chain
+            new: New chain
+            fork: Number of leading blocks the chains share
+        """
+        with self._lock:
+            self._follow_chain(new, fork)
+            self._chain = new
+
+    def _push(self, height: int, block: Block) -> None:
+        """Index a block on top. Caller holds the lock."""
+        self.by_hash[block.hash] = height
+        for position, tx in enumerate(block.transactions):
+            if 'sender' in tx:
+                self.by_sender.setdefault(tx['sender'], []).append((height, position))
+            if 'recipient' in tx:
+                self.by_recipient.setdefault(tx['recipient'], []).append((height, position))
+        i = bisect.bisect_left(self.by_time, (block.timestamp, height))
+        self.by_time.insert(i, (block.timestamp, height))
+        count = len(block.transactions)
+        self._time_counts.insert(i + 1, self._time_counts[i] + count)
+        # Only out-of-order timestamps land before the end
+        for j in range(i + 2, len(self._time_counts)):
+            self._time_counts[j] += count
+        self.stats['blocks_added'] += 1
+
+    def _pop(self, height: int, block: Block) -> None:
+        """Un-index the top block. Caller holds the lock."""
+        if self.by_hash.get(block.hash) == height:
+            del self.by_hash[block.hash]
+        # Blocks are removed newest first, so their entries are at the end
+        for tx in reversed(block.transactions):
+            for index, key in ((self.by_sender, 'sender'), (self.by_recipient, 'recipient')):
+                if key in tx:
+                    entries = index[tx[key]]
+                    entries.pop()
+                    if not entries:
+                        del index[tx[key]]
+        i = bisect.bisect_left(self.by_time, (block.timestamp, height))
+        del self.by_time[i]
+        del self._time_counts[i + 1]
+        count = len(block.transactions)
+        for j in range(i + 1, len(self._time_counts)):
+            self._time_counts[j] -= count
+        self.stats['blocks_removed'] += 1
+
+    def _entry(self, height: int, position: int) -> Dict[str, Any]:
+        """Describe one transaction for a query result. Caller holds the lock."""
+        block = self._chain[height]
+        tx = block.transactions[position]
+        return {
+            'block_index': height,
+            'block_hash': block.hash,
+            'timestamp': block.timestamp,
+            'position': position,
+            'tx_hash': tx_hash(tx),
+            'transaction': tx
+        }
+
+    def block_by_hash(self, block_hash: str) -> Optional[Tuple[Block, int]]:
+        """
+        Find a block in the current chain by its hash.
+
+        Args:
+            block_hash: Block hash
+
+        Returns:
+            tuple: (block, current chain length), or None if not in the chain
+        """
+        with self._lock:
+            height = self.by_hash.get(block_hash)
+            if height is None:
+                return None
+            return self._chain[height], len(self._chain)
+
+    def transactions_by(self, field: str, address: str, offset: int, limit: int,
+                        descending: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get a page of the transactions sent or received by an address.
+
+        Args:
+            field: 'sender' or 'recipient'
+            address: Sender or recipient ID
+            offset: Number of transactions to skip
+            limit: Maximum number of transactions
+            descending: Newest first instead of chain order
+
+        Returns:
+            tuple: (transactions of the page, total matching transactions)
+        """
+        index = self.by_sender if field == 'sender' else self.by_recipient
+        with self._lock:
+            entries = index.get(address, [])
+            total = len(entries)
+            if descending:
+                end = max(0, total - offset)
+                page = reversed(entries[max(0, end - limit):end])
+            else:
+                page = entries[offset:offset + limit]
+            return [self._entry(height, position) for height, position in page], total
+
+    def transactions_between(self, start: Optional[float], end: Optional[float], offset: int,
+                             limit: int, descending: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get a page of the transactions in blocks within a timestamp range.
+        Both ends of the range and the start of the page are found by binary search.
+
+        Args:
+            start: Range start timestamp (inclusive; open if None)
+            end: Range end timestamp (exclusive; open if None)
+            offset: Number of transactions to skip
+            limit: Maximum number of transactions
+            descending: Newest first instead of oldest first
+
+        Returns:
+            tuple: (transactions of the page, total transactions in the range)
+        """
+        with self._lock:
+            lo = 0 if start is None else bisect.bisect_left(self.by_time, (start,))
+            hi = len(self.by_time) if end is None else bisect.bisect_left(self.by_time, (end,))
+            hi = max(lo, hi)
+            first, last = self._time_counts[lo], self._time_counts[hi]
+            if descending:
+                numbers = range(last - 1 - offset, max(first, last - offset - limit) - 1, -1)
+            else:
+                numbers = range(first + offset, min(last, first + offset + limit))
+            results = []
+            for number in numbers:
+                # The block holding the number-th transaction in time order
+                i = bisect.bisect_right(self._time_counts, number) - 1
+                results.append(self._entry(self.by_time[i][1], number - self._time_counts[i]))
+            return results, last - first
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get index sizes.
+
+        Returns:
+            Dict with indexed blocks, transactions, addresses and update counters
+        """
+        with self._lock:
+            return {
+                'blocks': len(self.by_time),
+                'transactions': self._time_counts[-1],
+                'senders': len(self.by_sender),
+                'recipients': len(self.by_recipient),
+                'stats': dict(self.stats)
+            }
+
 class Blockchain:
     """
     Blockchain class managing the chain of blocks.
     Handles block creation, validation, and difficulty adjustment.
+    
+    Concurrency: `chain` is an immutable ChainView snapshot. Writers
+    (append_block, replace_chain, mine_pending_transactions, add_transaction,
+    prune_pending) serialize on `lock` and publish a new snapshot with a single
+    attribute assignment, so readers never lock: they take `chain` once and
+    work on that snapshot.
     """
     
     def __init__(self):
         """
         Initialize blockchain with genesis block and default parameters.
         """
+        # Writer lock; readers use snapshots instead
+        self.lock = threading.RLock()
         self.chain = []
         self.pending_transactions = []
         self.difficulty = 4
@@ -19,6 +307,16 @@ class Blockchain:
         self.block_times = []
         self.adjustment_interval = 10
         self.time_tolerance = 0.1
+        # Bumped whenever pending transactions change
+        self.mempool_version = 0
+        # Bumped whenever a block already in the chain is modified in place
+        self.edit_revision = 0
+        self._json_cache = {}
+        self.listeners = []
+        # One vote per voter across the chain and the pending pool
+        self.vote_guard = DoubleVoteGuard()
+        # Explorer lookups by hash, address and time
+        self.chain_index = ChainIndex()
         self.create_genesis_block()
 
     def create_genesis_block(self) -> None:
@@ -33,7 +331,87 @@ class Blockchain:
             difficulty=self.difficulty
         )
         genesis_block.mine_block()
-        self.chain.append(genesis_block)
+        with self.lock:
+            self._publish_chain(self.chain.appended(genesis_block))
+
+    @property
+    def chain(self) -> ChainView:
+        """Current chain snapshot; safe to use without locking."""
+        return self._chain
+
+    @chain.setter
+    def chain(self, blocks: Sequence[Block]) -> None:
+        self._chain = blocks if isinstance(blocks, ChainView) else ChainView(list(blocks))
+
+    def subscribe(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register a listener for chain and pending pool changes.
+        Listeners run under the writer lock, so they see changes in order and
+        must return quickly. Events:
+        - 'chain': {'old': ChainView, 'new': ChainView, 'fork': shared leading blocks}
+        - 'mempool': {'size': pending count, 'version': mempool_version}
+        - 'edit': {'block': block modified in place}
+        
+        Args:
+            listener: Function taking (event name, event data)
+        """
+        with self.lock:
+            self.listeners.append(listener)
+
+    def _notify(self, event: str, data: Dict[str, Any]) -> None:
+        """Call listeners. Caller holds the writer lock."""
+        for listener in self.listeners:
+            try:
+                listener(event, data)
+            except Exception:
+                logging.getLogger(__name__).exception(f"Blockchain listener failed on {event}")
+
+    def _publish_chain(self, new_chain: Sequence[Block]) -> None:
+        """Replace the chain snapshot and notify listeners. Caller holds the writer lock."""
+        old = self.chain
+        self.chain = new_chain
+        if self.listeners or self.vote_guard is not None or self.chain_index is not None:
+            new = self.chain
+            fork = common_prefix_length(old, new)
+            if self.vote_guard is not None:
+                self.vote_guard.chain_changed(old, new, fork)
+            if self.chain_index is not None:
+                self.chain_index.chain_changed(old, new, fork)
+            self._notify('chain', {'old': old, 'new': new, 'fork': fork})
+
+    def use_vote_guard(self, guard: DoubleVoteGuard) -> None:
+        """
+        Replace the double-vote guard, building it from the current chain and pending pool.
+        
+        Args:
+            guard: Guard to use (e.g. one in Bloom mode)
+        """
+        with self.lock:
+            guard.rebuild(self.chain, self.pending_transactions)
+            self.vote_guard = guard
+
+    def find_double_vote(self, new_chain: Sequence[Block]) -> Block:
+        """
+        Check a chain that would replace the local one for double votes.
+        Only blocks above the common prefix are checked.
+        
+        Args:
+            new_chain: Candidate chain
+            
+        Returns:
+            The first block containing a double vote, or None
+        """
+        if self.vote_guard is None:
+            return None
+        with self.lock:
+            fork = common_prefix_length(self.chain, new_chain)
+            return self.vote_guard.check_branch(new_chain[fork:], fork)
+
+    def _mempool_changed(self) -> None:
+        """Bump the pending pool version and notify listeners. Caller holds the writer lock."""
+        self.mempool_version += 1
+        if self.listeners:
+            self._notify('mempool', {'size': len(self.pending_transactions), 'version': self.mempool_version})
 
     def get_latest_block(self) -> Block:
         """
@@ -51,7 +429,95 @@ class Blockchain:
         Args:
             transaction: Transaction data to add
         """
-        self.pending_transactions.append(transaction)
+        with self.lock:
+            self.pending_transactions.append(transaction)
+            if self.vote_guard is not None:
+                self.vote_guard.add_pending(transaction)
+            self._mempool_changed()
+
+    def add_transactions(self, transactions: List[Dict[str, Any]]) -> None:
+        """
+        Add several transactions to pending transactions with a single pool update.
+        
+        Args:
+            transactions: Transactions to add, in order
+        """
+        if not transactions:
+            return
+        with self.lock:
+            self.pending_transactions.extend(transactions)
+            if self.vote_guard is not None:
+                for transaction in transactions:
+                    self.vote_guard.add_pending(transaction)
+            self._mempool_changed()
+
+    def append_block(self, block: Block) -> None:
+        """
+        Append a validated block received from a peer.
+        
+        Args:
+            block: Block extending the current tip
+        """
+        with self.lock:
+            self._publish_chain(self.chain.appended(block))
+            self.prune_pending([block])
+
+    def replace_chain(self, new_chain: Sequence[Block]) -> None:
+        """
+        Replace the local chain with a better one from a peer.
+        
+        Args:
+            new_chain: Blocks of the adopted chain
+        """
+        with self.lock:
+            known = {block.hash for block in self.chain}
+            self._publish_chain(new_chain)
+            self.prune_pending([block for block in self.chain if block.hash not in known])
+
+    def prune_pending(self, blocks: List[Block]) -> int:
+        """
+        Remove pending transactions that are already included in the given blocks.
+        
+        Args:
+            blocks: Blocks newly added to the chain
+            
+        Returns:
+            Number of transactions removed
+        """
+        confirmed = {tx_hash(tx) for block in blocks for tx in block.transactions}
+        if not confirmed:
+            return 0
+        with self.lock:
+            remaining = []
+            for tx in self.pending_transactions:
+                if tx_hash(tx) not in confirmed:
+                    remaining.append(tx)
+                elif self.vote_guard is not None:
+                    self.vote_guard.remove_pending(tx)
+            removed = len(self.pending_transactions) - len(remaining)
+            if removed:
+                self.pending_transactions = remaining
+                self._mempool_changed()
+        return removed
+
+    def _drop_double_votes(self) -> int:
+        """
+        Remove pending votes by voters who already voted. Caller holds the writer lock.
+        
+        Returns:
+            Number of transactions removed
+        """
+        if self.vote_guard is None:
+            return 0
+        invalid = set(self.vote_guard.invalid_votes(self.pending_transactions, len(self.chain)))
+        if not invalid:
+            return 0
+        for i in invalid:
+            self.vote_guard.remove_pending(self.pending_transactions[i])
+        self.pending_transactions = [tx for i, tx in enumerate(self.pending_transactions) if i not in invalid]
+        self._mempool_changed()
+        logging.getLogger(__name__).warning(f"Dropped {len(invalid)} double votes from pending transactions")
+        return len(invalid)
 
     def adjust_difficulty(self) -> None:
         """
@@ -73,6 +539,9 @@ class Blockchain:
     def mine_pending_transactions(self) -> Block:
         """
         Mine pending transactions into a new block.
+        Proof of work runs without holding the writer lock; the block is only
+        appended if the tip is still the one it was mined on, otherwise mining
+        restarts on the new tip with the transactions that are still pending.
         
         Returns:
             Newly mined block
@@ -80,27 +549,37 @@ class Blockchain:
         Raises:
             ValueError: If no pending transactions
         """
-        if not self.pending_transactions:
-            raise ValueError("No pending transactions to mine")
+        while True:
+            with self.lock:
+                # Never seal a double vote, e.g. one returned to the pool by a reorg
+                self._drop_double_votes()
+                if not self.pending_transactions:
+                    raise ValueError("No pending transactions to mine")
+                latest_block = self.get_latest_block()
+                transactions = list(self.pending_transactions)
+                difficulty = self.difficulty
 
-        latest_block = self.get_latest_block()
-        new_block = Block(
-            index=latest_block.index + 1,
-            transactions=self.pending_transactions,
-            timestamp=time.time(),
-            previous_hash=latest_block.hash,
-            difficulty=self.difficulty
-        )
+            new_block = Block(
+                index=latest_block.index + 1,
+                transactions=transactions,
+                timestamp=time.time(),
+                previous_hash=latest_block.hash,
+                difficulty=difficulty
+            )
 
-        start_time = time.time()
-        new_block.mine_block()
-        block_time = time.time() - start_time
-        self.block_times.append(block_time)
-        self.adjust_difficulty()
+            start_time = time.time()
+            new_block.mine_block()
+            block_time = time.time() - start_time
 
-        self.chain.append(new_block)
-        self.pending_transactions = []
-        return new_block
+            with self.lock:
+                if self.get_latest_block() is not latest_block:
+                    continue
+                self.block_times.append(block_time)
+                self.adjust_difficulty()
+                self._publish_chain(self.chain.appended(new_block))
+                # Transactions that arrived while mining stay pending
+                self.prune_pending([new_block])
+                return new_block
 
     def is_chain_valid(self) -> bool:
         """
@@ -109,19 +588,33 @@ class Blockchain:
         Returns:
             True if chain is valid, False otherwise
         """
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-
-            if current_block.hash != current_block.calculate_hash():
+        chain = self.chain
+        for i in range(1, len(chain)):
+            if not self.is_valid_successor(chain[i-1], chain[i]):
                 return False
 
-            if current_block.previous_hash != previous_block.hash:
-                return False
+        return True
 
-            prefix = '0' * self.difficulty
-            if not current_block.hash.startswith(prefix):
-                return False
+    def is_valid_successor(self, previous_block: Block, current_block: Block) -> bool:
+        """
+        Validate a single block against its predecessor.
+        
+        Args:
+            previous_block: Block preceding current_block
+            current_block: Block to validate
+            
+        Returns:
+            True if hash, linkage and proof of work are valid
+        """
+        if current_block.hash != current_block.calculate_hash():
+            return False
+
+        if current_block.previous_hash != previous_block.hash:
+            return False
+
+        prefix = '0' * self.difficulty
+        if not current_block.hash.startswith(prefix):
+            return False
 
         return True
     
@@ -134,24 +627,109 @@ class Blockchain:
                     False if it does not, or None if this is the chain tip
         Returns a dict with 'previous_link' and 'next_link'.
         """
+        chain = self.chain
         prev_ok = None
         next_ok = None
 
         # Check link to previous block
         if index > 0:
-            prev_ok = (self.chain[index].previous_hash
-                    == self.chain[index-1].hash)
+            prev_ok = (chain[index].previous_hash
+                    == chain[index-1].hash)
 
         # Check link to next block
-        if index < len(self.chain) - 1:
-            next_ok = (self.chain[index+1].previous_hash
-                    == self.chain[index].hash)
+        if index < len(chain) - 1:
+            next_ok = (chain[index+1].previous_hash
+                    == chain[index].hash)
 
         return {
             'previous_link': prev_ok,
             'next_link': next_ok
         }
 
+    def block_edited(self, block: Block) -> None:
+        """
+        Record that a block in the chain was modified in place (testing endpoints).
+        
+        Args:
+            block: The modified block
+        """
+        with self.lock:
+            block.invalidate_cache()
+            self.edit_revision += 1
+            if self.vote_guard is not None:
+                self.vote_guard.rebuild(self.chain, self.pending_transactions)
+            if self.chain_index is not None:
+                self.chain_index.rebuild(self.chain)
+            self._notify('edit', {'block': block})
+
+    def chain_etag(self, include_pending: bool = True, chain: Sequence[Block] = None) -> str:
+        """
+        Get an entity tag for the serialized chain.
+        Derived from the tip hash; also covers in-place block edits, difficulty
+        and, when included, the pending pool and other mining parameters.
+        
+        Args:
+            include_pending: Whether the response carries pending transactions and parameters
+            chain: Snapshot to tag (defaults to the current chain)
+            
+        Returns:
+            Entity tag string (unquoted)
+        """
+        if chain is None:
+            chain = self.chain
+        tag = f"{chain[-1].hash[:16]}-{len(chain)}-{self.edit_revision}-{self.difficulty}"
+        if include_pending:
+            state = (self.mempool_version, len(self.pending_transactions),
+                     self.target_block_time, self.adjustment_interval, self.time_tolerance)
+            tag += '-' + hashlib.sha1(repr(state).encode()).hexdigest()[:12]
+        return tag
+
+    def to_json(self, include_pending: bool = True) -> bytes:
+        """
+        Serialize the chain as JSON bytes, assembled from cached per-block fragments.
+        The full result is cached under its entity tag.
+        
+        Args:
+            include_pending: Whether to include pending transactions and parameters
+            
+        Returns:
+            JSON encoding equivalent to to_dict() (or only its "chain" and "difficulty" keys)
+        """
+        return self.tagged_json(include_pending)[1]
+
+    def tagged_json(self, include_pending: bool = True) -> Tuple[str, bytes]:
+        """
+        Serialize the chain as in to_json(), together with the matching entity tag.
+        
+        Args:
+            include_pending: Whether to include pending transactions and parameters
+            
+        Returns:
+            tuple: (entity tag, JSON bytes) describing the same snapshot
+        """
+        cached = self._json_cache.get(include_pending)
+        if cached is not None and cached[0] == self.chain_etag(include_pending):
+            return cached
+        
+        # Read the snapshot and the pending pool together so the body matches its tag
+        with self.lock:
+            chain = self.chain
+            etag = self.chain_etag(include_pending, chain)
+            # Difficulty is always included since peers validate proof of work against it
+            tail = {"difficulty": self.difficulty}
+            if include_pending:
+                tail.update({
+                    "pending_transactions": list(self.pending_transactions),
+                    "target_block_time": self.target_block_time,
+                    "adjustment_interval": self.adjustment_interval,
+                    "time_tolerance": self.time_tolerance
+                })
+        parts = [b'{"chain":[', b','.join(block.to_json() for block in chain), b'],',
+                 json.dumps(tail, separators=(',', ':')).encode()[1:-1], b'}']
+        result = (etag, b''.join(parts))
+        self._json_cache[include_pending] = result
+        return result
+
     def calculate_work(self) -> int:
         """
         Calculate the total work done in the blockchain.
@@ -170,7 +748,7 @@ class Blockchain:
         """
         return {
             "chain": [block.to_dict() for block in self.chain],
-            "pending_transactions": self.pending_transactions,
+            "pending_transactions": list(self.pending_transactions),
             "difficulty": self.difficulty,
             "target_block_time": self.target_block_time,
             "adjustment_interval": self.adjustment_interval,
@@ -189,11 +767,19 @@ class Blockchain:
             Blockchain instance
         """
         blockchain = object.__new__(cls)
+        blockchain.lock = threading.RLock()
         blockchain.chain = [Block.from_dict(block_data) for block_data in data['chain']]
-        blockchain.pending_transactions = data['pending_transactions']
+        blockchain.pending_transactions = data.get('pending_transactions', [])
         blockchain.difficulty = data.get('difficulty', 4)
         blockchain.target_block_time = data.get('target_block_time', 10)
         blockchain.adjustment_interval = data.get('adjustment_interval', 10)
         blockchain.time_tolerance = data.get('time_tolerance', 0.1)
         blockchain.block_times = []
+        blockchain.mempool_version = 0
+        blockchain.edit_revision = 0
+        blockchain._json_cache = {}
+        blockchain.listeners = []
+        # Peer chains are only inspected, never voted on
+        blockchain.vote_guard = None
+        blockchain.chain_index = None
         return blockchain
\ No newline at end of file
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Sequence
+
+from .block import Block
+
+class ChainFollower:
+    """
+    Base for state derived block by block from the chain (tallies, indexes,
+    columns, the vote guard).
+    Subclasses implement _push and _pop for a single block; this class keeps
+    the list of applied blocks and replays chain changes onto it: on a reorg
+    the blocks above the fork are popped newest first and the new ones
+    pushed, and after an in-place edit the edited block and everything above
+    it are popped and pushed again. Caller provides locking.
+    """
+
+    def __init__(self):
+        """Initialize with no blocks applied."""
+        self._applied: List[Block] = []
+
+    def _push(self, height: int, block: Block) -> None:
+        """Apply a block on top."""
+        raise NotImplementedError
+
+    def _pop(self, height: int, block: Block) -> None:
+        """Undo the top block."""
+        raise NotImplementedError
+
+    def _truncate(self, height: int) -> None:
+        """
+        Undo blocks down to a height, newest first.
+        Subclasses that can cut back in one step may override this.
+
+        Args:
+            height: Number of blocks to keep
+        """
+        while len(self._applied) > height:
+            block = self._applied.pop()
+            self._pop(len(self._applied), block)
+
+    def _append(self, block: Block) -> None:
+        """Apply a block on top and record it."""
+        self._push(len(self._applied), block)
+        self._applied.append(block)
+
+    def _replay(self, chain: Sequence[Block]) -> None:
+        """
+        Apply a whole chain from scratch; the subclass has reset its own state.
+
+        Args:
+            chain: Blocks to apply
+        """
+        self._applied = []
+        for block in chain:
+            self._append(block)
+
+    def _follow_chain(self, new: Sequence[Block], fork: int) -> None:
+        """
+        Follow a chain change.
+
+        Args:
+            new: New chain
+            fork: Number of leading blocks shared with the applied ones
+        """
+        if len(self._applied) > fork:
+            self._truncate(fork)
+        # Index instead of slicing; slicing a ChainView copies the whole chain
+        for height in range(len(self._applied), len(new)):
+            self._append(new[height])
+
+    def _follow_edit(self, block: Block) -> bool:
+        """
+        Re-apply an edited block and everything above it.
+        Only valid if _pop does not read the block's (already edited) contents.
+
+        Args:
+            block: Block modified in place
+
+        Returns:
+            False if the block is not one of the applied blocks
+        """
+        index = block.index
+        if not (0 <= index < len(self._applied) and self._applied[index] is block):
+            return False
+        above = self._applied[index:]
+        self._truncate(index)
+        for edited in above:
+            self._append(edited)
+        return True
+
+    def _follow(self, kind: str, data: Dict[str, Any]) -> None:
+        """
+        Dispatch a blockchain event ('chain' or 'edit'); other events are ignored.
+
+        Args:
+            kind: Blockchain event name
+            data: Blockchain event data
+        """
+        if kind == 'chain':
+            self._follow_chain(data['new'], data['fork'])
+        elif kind == 'edit':
+            self._follow_edit(data['block'])
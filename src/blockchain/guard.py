@@ -0,0 +1,299 @@
+import math
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .block import Block
+from .follow import ChainFollower
+
+# Expected number of voters a Bloom-mode guard is sized for
+BLOOM_CAPACITY = 1_000_000
+# Target false-positive rate of the Bloom filter
+BLOOM_ERROR_RATE = 0.01
+
+def is_vote(transaction: Dict[str, Any]) -> bool:
+    """
+    Check whether a transaction is a vote (amount of exactly 1 with a sender).
+
+    Args:
+        transaction: Transaction dictionary
+
+    Returns:
+        True if the transaction is a vote
+    """
+    return transaction.get('amount') == 1 and 'sender' in transaction
+
+class BloomFilter:
+    """
+    Fixed-size set membership with false positives but no false negatives.
+    Items cannot be removed; the filter is rebuilt instead.
+    """
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        """
+        Initialize an empty filter.
+
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False-positive rate at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Bit positions of an item (double hashing over one BLAKE2b digest)."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def nbytes(self) -> int:
+        return len(self._array)
+
+class DoubleVoteGuard(ChainFollower):
+    """
+    Tracks who has voted, on the chain and in the pending pool, so a voter
+    can vote only once.
+
+    In 'exact' mode confirmed voters are kept in a dictionary with the height
+    of their first vote. In 'bloom' mode a fixed-size Bloom filter answers
+    "definitely not voted" and only possible matches are confirmed by an
+    exact index (the fallback, e.g. the tally's voter index), which bounds the
+    guard's own memory for very large electorates; the chain is scanned only
+    when no index can answer. Pending voters are always tracked exactly; their
+    number is bounded by the pending pool. Caller provides locking (the
+    blockchain writer lock).
+    """
+
+    def __init__(self, mode: str = 'exact', capacity: int = BLOOM_CAPACITY,
+                 error_rate: float = BLOOM_ERROR_RATE,
+                 fallback: Callable[[str, int], Optional[bool]] = None):
+        """
+        Initialize an empty guard.
+
+        Args:
+            mode: 'exact' or 'bloom'
+            capacity: Bloom mode: expected number of voters
+            error_rate: Bloom mode: target false-positive rate
+            fallback: Bloom mode: exact index lookup (voter, height) telling whether
+                      the voter has a vote below that height in the current chain, or
+                      None if it cannot tell; the chain is scanned only then
+        """
+        if mode not in ('exact', 'bloom'):
+            raise ValueError(f"Unknown vote guard mode: {mode}")
+        super().__init__()
+        self.mode = mode
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.fallback = fallback
+        self._chain: Sequence[Block] = []
+        self._first_vote: Dict[str, int] = {}
+        self._bloom = BloomFilter(capacity, error_rate) if mode == 'bloom' else None
+        self._pending: Dict[str, int] = {}
+        self.stats = {'rejected': 0, 'bloom_checks': 0, 'bloom_positives': 0,
+                      'false_positives': 0, 'scans': 0, 'rebuilds': 0}
+
+    def rebuild(self, chain: Sequence[Block], pending: Iterable[Dict[str, Any]] = ()) -> None:
+        """
+        Recompute the guard from a chain and pending pool.
+
+        Args:
+            chain: Current chain
+            pending: Pending transactions
+        """
+        self._chain = chain
+        self._first_vote = {}
+        if self.mode == 'bloom':
+            self._bloom = BloomFilter(max(self.capacity, self._bloom.count), self.error_rate)
+        self._replay(chain)
+        self._pending = {}
+        for tx in pending:
+            self.add_pending(tx)
+        self.stats['rebuilds'] += 1
+
+    def _push(self, height: int, block: Block) -> None:
+        """Record the votes of a block on top."""
+        for tx in block.transactions:
+            if is_vote(tx):
+                if self._bloom is not None:
+                    self._bloom.add(tx['sender'])
+                else:
+                    self._first_vote.setdefault(tx['sender'], height)
+
+    def _pop(self, height: int, block: Block) -> None:
+        """Forget the votes first cast in the top block (bits stay set in Bloom mode)."""
+        if self._bloom is None:
+            for tx in block.transactions:
+                if is_vote(tx) and self._first_vote.get(tx['sender'], -1) >= height:
+                    del self._first_vote[tx['sender']]
+
+    def chain_changed(self, old: Sequence[Block], new: Sequence[Block], fork: int) -> None:
+        """
+        Follow a chain change: forget votes of blocks that left, add the new ones.
+
+        Args:
+            old: Previous chain
+            new: New chain
+            fork: Number of leading blocks the chains share
+        """
+        self._chain = new
+        if self._bloom is not None and self._bloom.count > self._bloom.capacity:
+            # Over capacity the false-positive rate climbs; size up and rebuild
+            self.capacity = self._bloom.count * 2
+            self.rebuild(new, self._pending_transactions())
+            return
+        # Bits of removed votes stay set in Bloom mode; the exact check clears them up
+        self._follow_chain(new, fork)
+
+    def _pending_transactions(self) -> List[Dict[str, Any]]:
+        """Pending voters as minimal vote transactions (for rebuilds)."""
+        return [{'sender': voter, 'amount': 1} for voter, count in self._pending.items() for _ in range(count)]
+
+    def confirmed_below(self, voter: str, height: int) -> bool:
+        """
+        Check whether a voter has a vote in the current chain below a height.
+
+        Args:
+            voter: Voter ID
+            height: Height bound (exclusive)
+
+        Returns:
+            True if such a vote exists
+        """
+        if self._bloom is None:
+            return self._first_vote.get(voter, height) < height
+        self.stats['bloom_checks'] += 1
+        if voter not in self._bloom:
+            return False
+        self.stats['bloom_positives'] += 1
+        found = self.fallback(voter, height) if self.fallback is not None else None
+        if found is None:
+            self.stats['scans'] += 1
+            found = self._scan(voter, height)
+        if not found:
+            self.stats['false_positives'] += 1
+        return found
+
+    def _scan(self, voter: str, height: int) -> bool:
+        """Exact check by scanning the chain below a height (last resort; O(total votes))."""
+        for block in self._chain[:height]:
+            for tx in block.transactions:
+                if is_vote(tx) and tx['sender'] == voter:
+                    return True
+        return False
+
+    def has_voted(self, voter: str) -> bool:
+        """
+        Check whether a voter has a confirmed or pending vote.
+
+        Args:
+            voter: Voter ID
+
+        Returns:
+            True if another vote by this voter must be refused
+        """
+        return voter in self._pending or self.confirmed_below(voter, len(self._chain))
+
+    def add_pending(self, transaction: Dict[str, Any]) -> None:
+        """Record a transaction entering the pending pool."""
+        if is_vote(transaction):
+            voter = transaction['sender']
+            self._pending[voter] = self._pending.get(voter, 0) + 1
+
+    def remove_pending(self, transaction: Dict[str, Any]) -> None:
+        """Record a transaction leaving the pending pool."""
+        if is_vote(transaction):
+            voter = transaction['sender']
+            count = self._pending.get(voter, 0) - 1
+            if count > 0:
+                self._pending[voter] = count
+            else:
+                self._pending.pop(voter, None)
+
+    def invalid_votes(self, transactions: Sequence[Dict[str, Any]], height: int,
+                      seen: Optional[set] = None) -> List[int]:
+        """
+        Find double votes among the transactions of a block.
+
+        Args:
+            transactions: Transactions of a block at the given height
+            height: Height of the block; votes confirmed below it count
+            seen: Voters already voting in earlier blocks of the same branch
+                  (updated in place)
+
+        Returns:
+            Indexes of the transactions that are double votes
+        """
+        seen = set() if seen is None else seen
+        invalid = []
+        for i, tx in enumerate(transactions):
+            if not is_vote(tx):
+                continue
+            voter = tx['sender']
+            if voter in seen or self.confirmed_below(voter, height):
+                invalid.append(i)
+            else:
+                seen.add(voter)
+        if invalid:
+            self.stats['rejected'] += len(invalid)
+        return invalid
+
+    def check_branch(self, blocks: Sequence[Block], fork: int) -> Optional[Block]:
+        """
+        Check blocks that would replace the current chain above a fork point.
+
+        Args:
+            blocks: New blocks from height `fork` upwards
+            fork: Number of leading blocks shared with the current chain
+
+        Returns:
+            The first block containing a double vote, or None if all are valid
+        """
+        seen = set()
+        for block in blocks:
+            if self.invalid_votes(block.transactions, fork, seen):
+                return block
+        return None
+
+    def pending_count(self) -> int:
+        """Number of distinct voters with a pending vote."""
+        return len(self._pending)
+
+    def pending_voters(self) -> List[str]:
+        """Distinct voters with a pending vote."""
+        return list(self._pending)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get guard state.
+
+        Returns:
+            Dict with mode, sizes and counters
+        """
+        data = {
+            'mode': self.mode,
+            'pending_voters': len(self._pending),
+            'stats': dict(self.stats)
+        }
+        if self._bloom is None:
+            data['confirmed_voters'] = len(self._first_vote)
+        else:
+            data['bloom'] = {
+                'capacity': self._bloom.capacity,
+                'error_rate': self._bloom.error_rate,
+                'items': self._bloom.count,
+                'hashes': self._bloom.hashes,
+                'bytes': self._bloom.nbytes()
+            }
+        return data
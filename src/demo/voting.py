@@ -43,12 +43,21 @@ def send_vote(voter: str, candidate: str):
         print(f"Failed to send vote: {e}")
 
 
-def trigger_mine():
-    """Trigger mining via HTTP POST to the client."""
+def trigger_mine(timeout: float = 60):
+    """Queue a mining job on the client and wait for it to finish."""
     try:
         r = requests.post(f"{BASE_URL}/mine", timeout=10)
         r.raise_for_status()
-        print(f"Mining result: {r.json()}")
+        job_id = r.json()['job_id']
+        print(f"Mining job queued: {job_id}")
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(f"{BASE_URL}/mine/{job_id}", timeout=5).json()['job']
+            if job['status'] in ('done', 'failed'):
+                print(f"Mining result: {job}")
+                return
+            time.sleep(0.5)
+        print(f"Mining job {job_id} still running after {timeout}s")
     except Exception as e:
         print(f"Mining failed: {e}")
 
@@ -0,0 +1,171 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Pending pool size at which new submissions are refused...
+HIGH_WATERMARK = 50000
+# ...until mining drains it back down to this size
+LOW_WATERMARK = 40000
+# Sustained votes per second and burst size allowed per client
+CLIENT_RATE = 1000
+CLIENT_BURST = 10000
+# Seconds a client is told to wait while the pool is saturated
+SATURATED_RETRY_AFTER = 5
+# Clients tracked for rate limiting; the least recently seen are forgotten
+MAX_CLIENTS = 10000
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, n: float) -> float:
+        """
+        Take tokens if available.
+
+        Args:
+            n: Tokens needed (at most the burst size)
+
+        Returns:
+            0 if taken, otherwise seconds until enough tokens will be available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if n <= self.tokens:
+            self.tokens -= n
+            return 0
+        return (n - self.tokens) / self.rate
+
+class AdmissionController:
+    """
+    Admission control for vote submission.
+    The pending pool is treated as a bounded ingest queue: once it reaches the
+    high watermark new votes are refused until mining drains it to the low
+    watermark. Each client also has a token bucket limiting its vote rate.
+    Refusals carry a Retry-After hint so clients back off instead of retrying
+    in a loop.
+    """
+
+    def __init__(self, high: int = HIGH_WATERMARK, low: int = LOW_WATERMARK,
+                 rate: float = CLIENT_RATE, burst: float = CLIENT_BURST):
+        """
+        Initialize controller.
+
+        Args:
+            high: Pending pool size at which submissions are refused
+            low: Pending pool size at which submissions are admitted again
+            rate: Votes per second allowed per client
+            burst: Votes a client may submit at once
+        """
+        if low > high:
+            raise ValueError("Low watermark must not exceed the high watermark")
+        self.high = high
+        self.low = low
+        self.rate = rate
+        self.burst = burst
+        self.saturated = False
+        self.depth = 0
+        self._clients: Dict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'admitted': 0, 'rejected_saturated': 0, 'rejected_rate_limited': 0,
+                      'rejected_too_large': 0, 'relayed_dropped': 0, 'saturations': 0}
+
+    def admit(self, client: str, n: int, depth: int) -> Tuple[bool, Optional[str], Optional[int]]:
+        """
+        Decide whether to accept a submission.
+        Call under the blockchain writer lock so depth cannot change before the votes are added.
+
+        Args:
+            client: Client identifier (e.g. remote address)
+            n: Number of votes submitted
+            depth: Current pending pool size
+
+        Returns:
+            tuple: (admitted, reason if refused, seconds to wait before retrying)
+        """
+        with self._lock:
+            self.depth = depth
+            if self.saturated and depth <= self.low:
+                self.saturated = False
+            if n > self.high or n > self.burst:
+                # Could never be admitted; waiting would not help
+                self.stats['rejected_too_large'] += n
+                return False, 'too_large', None
+            if not self.saturated and depth + n > self.high and depth >= self.low:
+                self.saturated = True
+                self.stats['saturations'] += 1
+            # A batch that does not fit below the low watermark waits without
+            # closing admission for everyone else
+            if self.saturated or depth + n > self.high:
+                self.stats['rejected_saturated'] += n
+                return False, 'saturated', SATURATED_RETRY_AFTER
+
+            bucket = self._clients.get(client)
+            if bucket is None:
+                bucket = self._clients[client] = TokenBucket(self.rate, self.burst)
+                while len(self._clients) > MAX_CLIENTS:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client)
+            wait = bucket.take(n)
+            if wait:
+                self.stats['rejected_rate_limited'] += n
+                return False, 'rate_limited', max(1, math.ceil(wait))
+
+            self.stats['admitted'] += n
+            return True, None, None
+
+    def admit_relayed(self, depth: int) -> bool:
+        """
+        Decide whether to accept a transaction relayed by a peer.
+        Peers are not rate limited, but nothing is added while the pool is saturated.
+
+        Args:
+            depth: Current pending pool size
+
+        Returns:
+            True if the transaction may be added
+        """
+        with self._lock:
+            if self.saturated or depth >= self.high:
+                self.stats['relayed_dropped'] += 1
+                return False
+            return True
+
+    def pending_changed(self, size: int) -> None:
+        """
+        Track the pending pool so saturation clears as soon as mining drains it.
+
+        Args:
+            size: Current number of pending transactions
+        """
+        with self._lock:
+            self.depth = size
+            if self.saturated and size <= self.low:
+                self.saturated = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get admission metrics.
+
+        Returns:
+            Dict with queue depth, watermarks, saturation state, limits and counters
+        """
+        with self._lock:
+            return {
+                'queue_depth': self.depth,
+                'high_watermark': self.high,
+                'low_watermark': self.low,
+                'saturated': self.saturated,
+                'client_rate': self.rate,
+                'client_burst': self.burst,
+                'tracked_clients': len(self._clients),
+                'stats': dict(self.stats)
+            }
@@ -0,0 +1,408 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from flask import jsonify, request
+
+from src.blockchain.block import Block
+from src.blockchain.follow import ChainFollower
+from src.blockchain.guard import is_vote
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; the analytics endpoints answer 503 without it
+    np = None
+
+# Rows allocated up front; capacity doubles when full
+INITIAL_CAPACITY = 1024
+# Largest histogram or block range a single request may ask for
+MAX_BINS = 10000
+
+class ColumnSnapshot:
+    """Read-only view of the vote columns at one point in time."""
+
+    def __init__(self, voter, candidate, height, timestamp, candidates: List[str], voters: int, blocks: int):
+        self.voter = voter
+        self.candidate = candidate
+        self.height = height
+        self.timestamp = timestamp
+        self.candidates = candidates
+        self.voters = voters
+        self.blocks = blocks
+
+    def __len__(self) -> int:
+        return len(self.candidate)
+
+class VoteColumns(ChainFollower):
+    """
+    Confirmed votes stored column-wise in NumPy arrays.
+    Voter and candidate names are interned to integer IDs, so counts come
+    from np.bincount instead of dictionary loops. Rows are appended as blocks
+    are added; on a reorg the columns are cut back to the fork point into
+    fresh arrays, so snapshots taken earlier never change under a reader.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        """
+        Initialize empty columns.
+
+        Args:
+            capacity: Initial number of rows allocated
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for vote analytics")
+        super().__init__()
+        self._lock = threading.Lock()
+        self._allocate(capacity, 0)
+        self.size = 0
+        # Row offset of every counted block, in chain order
+        self._block_rows: List[int] = []
+        self.voter_ids: Dict[str, int] = {}
+        self.candidate_ids: Dict[str, int] = {}
+        self.candidate_names: List[str] = []
+        self.stats = {'blocks_applied': 0, 'blocks_reverted': 0, 'reallocations': 0}
+
+    def _allocate(self, capacity: int, keep: int) -> None:
+        """Move the first `keep` rows into new arrays of the given capacity. Caller holds the lock."""
+        columns = {
+            'voter': np.empty(capacity, dtype=np.int32),
+            'candidate': np.empty(capacity, dtype=np.int32),
+            'height': np.empty(capacity, dtype=np.int32),
+            'timestamp': np.empty(capacity, dtype=np.float64)
+        }
+        for name, column in columns.items():
+            if keep:
+                column[:keep] = getattr(self, name)[:keep]
+            setattr(self, name, column)
+
+    def attach(self, blockchain) -> None:
+        """
+        Load the current chain and follow its changes from now on.
+
+        Args:
+            blockchain: Blockchain to follow
+        """
+        with blockchain.lock:
+            with self._lock:
+                self._follow_chain(blockchain.chain, 0)
+            blockchain.subscribe(self.on_change)
+
+    def on_change(self, kind: str, data: Dict[str, Any]) -> None:
+        """
+        Blockchain listener; runs under the writer lock.
+
+        Args:
+            kind: Blockchain event name
+            data: Blockchain event data
+        """
+        with self._lock:
+            self._follow(kind, data)
+
+    def _intern(self, ids: Dict[str, int], name: str, names: Optional[List[str]] = None) -> int:
+        """Get the integer ID of a name, assigning the next one if new. Caller holds the lock."""
+        value = ids.get(name)
+        if value is None:
+            value = ids[name] = len(ids)
+            if names is not None:
+                names.append(name)
+        return value
+
+    def _push(self, height: int, block: Block) -> None:
+        """Append the votes of a block. Caller holds the lock."""
+        votes = [tx for tx in block.transactions if is_vote(tx)]
+        start, end = self.size, self.size + len(votes)
+        if end > len(self.candidate):
+            capacity = len(self.candidate)
+            while capacity < end:
+                capacity *= 2
+            self._allocate(capacity, start)
+            self.stats['reallocations'] += 1
+        if votes:
+            self.voter[start:end] = [self._intern(self.voter_ids, tx['sender']) for tx in votes]
+            self.candidate[start:end] = [
+                self._intern(self.candidate_ids, tx['recipient'], self.candidate_names) for tx in votes
+            ]
+            self.height[start:end] = block.index
+            self.timestamp[start:end] = block.timestamp
+        self._block_rows.append(start)
+        self.size = end
+        self.stats['blocks_applied'] += 1
+
+    def _truncate(self, blocks: int) -> None:
+        """
+        Keep only the first `blocks` blocks. Caller holds the lock.
+        Rows are copied into new arrays because snapshots may still view the old ones.
+        """
+        keep = self._block_rows[blocks] if blocks < len(self._block_rows) else self.size
+        self.stats['blocks_reverted'] += len(self._applied) - blocks
+        del self._block_rows[blocks:]
+        del self._applied[blocks:]
+        self._allocate(len(self.candidate), keep)
+        self.size = keep
+
+    def snapshot(self) -> ColumnSnapshot:
+        """
+        Get a consistent view of the columns.
+
+        Returns:
+            Snapshot sharing the column memory (no copy)
+        """
+        with self._lock:
+            n = self.size
+            return ColumnSnapshot(self.voter[:n], self.candidate[:n], self.height[:n], self.timestamp[:n],
+                                  list(self.candidate_names), len(self.voter_ids), len(self._applied))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get storage state.
+
+        Returns:
+            Dict with row count, capacity, interned name counts and counters
+        """
+        with self._lock:
+            return {
+                'rows': self.size,
+                'capacity': len(self.candidate),
+                'blocks': len(self._applied),
+                'interned_voters': len(self.voter_ids),
+                'interned_candidates': len(self.candidate_ids),
+                'bytes': sum(getattr(self, name).nbytes for name in ('voter', 'candidate', 'height', 'timestamp')),
+                'stats': dict(self.stats)
+            }
+
+def summarize(snap: ColumnSnapshot) -> Dict[str, Any]:
+    """
+    Compute vote totals, participation and per-block distribution.
+
+    Args:
+        snap: Column snapshot
+
+    Returns:
+        Dictionary of statistics
+    """
+    total = len(snap)
+    per_candidate = np.bincount(snap.candidate, minlength=len(snap.candidates))
+    per_voter = np.bincount(snap.voter, minlength=snap.voters)
+    per_block = np.bincount(snap.height, minlength=snap.blocks)[:snap.blocks]
+    order = np.argsort(-per_candidate, kind='stable')
+    voters = int(np.count_nonzero(per_voter))
+    return {
+        'total_votes': total,
+        'candidates': [
+            {
+                'candidate': snap.candidates[i],
+                'votes': int(per_candidate[i]),
+                'percentage': round(float(per_candidate[i]) / total * 100, 2) if total else 0
+            }
+            for i in order if per_candidate[i]
+        ],
+        'distinct_voters': voters,
+        'repeat_voters': int(np.count_nonzero(per_voter > 1)),
+        'votes_per_voter': round(total / voters, 4) if voters else 0,
+        'blocks': snap.blocks,
+        'votes_per_block': {
+            'mean': round(float(per_block.mean()), 2) if snap.blocks else 0,
+            'median': float(np.median(per_block)) if snap.blocks else 0,
+            'p95': float(np.percentile(per_block, 95)) if snap.blocks else 0,
+            'max': int(per_block.max()) if snap.blocks else 0,
+            'empty_blocks': int(np.count_nonzero(per_block == 0))
+        },
+        # Block timestamps come from different clocks and need not increase with height
+        'first_vote': float(snap.timestamp.min()) if total else None,
+        'last_vote': float(snap.timestamp.max()) if total else None
+    }
+
+def histogram(snap: ColumnSnapshot, bucket: float, start: float = None, end: float = None,
+              candidate: str = None) -> Dict[str, Any]:
+    """
+    Count votes per fixed-width time bucket.
+
+    Args:
+        snap: Column snapshot
+        bucket: Bucket width in seconds
+        start: Start timestamp (defaults to the earliest vote)
+        end: End timestamp, exclusive (defaults to just after the latest vote)
+        candidate: Only count votes for this candidate (optional)
+
+    Returns:
+        Dict with the range, bucket width and counts
+
+    Raises:
+        ValueError: If the range needs more than MAX_BINS buckets
+    """
+    timestamps = snap.timestamp
+    if candidate is not None:
+        cid = snap.candidates.index(candidate) if candidate in snap.candidates else -1
+        timestamps = timestamps[snap.candidate == cid]
+    # Rows are in chain order, not time order
+    if start is None:
+        start = float(snap.timestamp.min()) if len(snap) else 0.0
+    if end is None:
+        end = float(snap.timestamp.max()) + bucket if len(snap) else start
+    bins = max(0, int(np.ceil((end - start) / bucket)))
+    if bins > MAX_BINS:
+        raise ValueError(f"Range needs {bins} buckets; at most {MAX_BINS} allowed")
+    in_range = timestamps[(timestamps >= start) & (timestamps < end)]
+    counts = np.bincount(((in_range - start) // bucket).astype(np.int64), minlength=bins)[:bins]
+    return {
+        'start': start,
+        'end': end,
+        'bucket_seconds': bucket,
+        'candidate': candidate,
+        'counts': counts.tolist(),
+        'total_votes': int(counts.sum())
+    }
+
+def block_distribution(snap: ColumnSnapshot, first: int, last: int) -> Dict[str, Any]:
+    """
+    Count votes per candidate in each block of a height range.
+
+    Args:
+        snap: Column snapshot
+        first: First block height
+        last: Last block height (inclusive)
+
+    Returns:
+        Dict with per-block totals and per-candidate counts
+
+    Raises:
+        ValueError: If the range covers more than MAX_BINS blocks
+    """
+    last = min(last, snap.blocks - 1)
+    blocks = max(0, last - first + 1)
+    if blocks > MAX_BINS:
+        raise ValueError(f"Range covers {blocks} blocks; at most {MAX_BINS} allowed")
+    # Heights are non-decreasing, so the range is a contiguous slice of rows
+    lo, hi = np.searchsorted(snap.height, [first, last + 1])
+    heights = snap.height[lo:hi] - first
+    candidates = snap.candidate[lo:hi]
+    width = len(snap.candidates)
+    matrix = np.bincount(heights.astype(np.int64) * width + candidates,
+                         minlength=blocks * width)[:blocks * width].reshape(blocks, width)
+    result = []
+    for offset, row in enumerate(matrix):
+        nonzero = np.flatnonzero(row)
+        result.append({
+            'height': first + offset,
+            'votes': int(row.sum()),
+            'candidates': {snap.candidates[i]: int(row[i]) for i in nonzero}
+        })
+    return {'from': first, 'to': last, 'blocks': result}
+
+def setup_analytics_routes(app, blockchain, client_logger) -> Optional[VoteColumns]:
+    """
+    Setup vote analytics routes for the Flask app.
+    Without NumPy the routes exist but answer 503.
+
+    Args:
+        app: Flask application instance
+        blockchain: Blockchain instance
+        client_logger: Logger instance
+
+    Returns:
+        The VoteColumns store, or None if NumPy is not installed
+    """
+    columns = None
+    if np is not None:
+        columns = VoteColumns()
+        columns.attach(blockchain)
+    else:
+        client_logger.warning("NumPy is not installed; /analytics endpoints are disabled")
+
+    def unavailable():
+        return jsonify({
+            'status': 'error',
+            'message': 'Vote analytics require NumPy (pip install numpy)'
+        }), 503
+
+    def bad_request(message: str):
+        return jsonify({'status': 'error', 'message': message}), 400
+
+    @app.route('/analytics/summary', methods=['GET'])
+    def analytics_summary():
+        """
+        Get vote totals, participation and per-block distribution statistics.
+
+        Returns:
+            JSON response with the statistics
+        """
+        if columns is None:
+            return unavailable()
+        try:
+            data = summarize(columns.snapshot())
+            data['last_updated'] = time.time()
+            return jsonify({'status': 'success', 'data': data})
+        except Exception as e:
+            client_logger.error(f"Failed to compute vote analytics: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': f'Failed to compute vote analytics: {str(e)}'
+            }), 500
+
+    @app.route('/analytics/histogram', methods=['GET'])
+    def analytics_histogram():
+        """
+        Get votes per fixed-width time bucket.
+
+        Query parameters:
+        - bucket: float  # Bucket width in seconds (default 3600)
+        - start: float  # Start timestamp (optional)
+        - end: float  # End timestamp, exclusive (optional)
+        - candidate: str  # Only count this candidate (optional)
+
+        Returns:
+            JSON response with bucket counts
+        """
+        if columns is None:
+            return unavailable()
+        bucket = request.args.get('bucket', 3600, type=float)
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        if not bucket or bucket <= 0:
+            return bad_request('bucket must be a positive number of seconds')
+        if ('start' in request.args and start is None) or ('end' in request.args and end is None):
+            return bad_request('start and end must be Unix timestamps')
+        try:
+            data = histogram(columns.snapshot(), bucket, start, end, request.args.get('candidate'))
+        except ValueError as e:
+            return bad_request(str(e))
+        return jsonify({'status': 'success', 'data': data})
+
+    @app.route('/analytics/blocks', methods=['GET'])
+    def analytics_blocks():
+        """
+        Get per-candidate vote counts for each block in a height range.
+
+        Query parameters:
+        - from: int  # First block height (default: 100 blocks below the tip)
+        - to: int  # Last block height, inclusive (default: the tip)
+
+        Returns:
+            JSON response with per-block distributions
+        """
+        if columns is None:
+            return unavailable()
+        snap = columns.snapshot()
+        last = request.args.get('to', snap.blocks - 1, type=int)
+        first = request.args.get('from', max(0, last - 99), type=int)
+        if first < 0 or last < first:
+            return bad_request('Invalid block range')
+        try:
+            data = block_distribution(snap, first, last)
+        except ValueError as e:
+            return bad_request(str(e))
+        return jsonify({'status': 'success', 'data': data})
+
+    @app.route('/analytics/stats', methods=['GET'])
+    def analytics_stats():
+        """
+        Get column storage statistics.
+
+        Returns:
+            JSON response with row count, memory use and update counters
+        """
+        if columns is None:
+            return unavailable()
+        return jsonify({'status': 'success', 'data': columns.to_dict()})
+
+    return columns
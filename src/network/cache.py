@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+# Responses kept; the least recently used are evicted first
+MAX_ENTRIES = 256
+# Total size of cached bodies in bytes (whole-chain responses can be large)
+MAX_BYTES = 64 * 1024 * 1024
+
+def size_of(value: Any) -> int:
+    """Approximate memory of a cached value: the length of its bytes parts."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(size_of(v) for v in value)
+    return 0
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses for read-only endpoints, bounded by
+    entry count and total body size.
+    Callers build keys from the endpoint, its parameters and the chain state
+    the response depends on (tip hash, edit revision, and mempool version where
+    relevant). Entries are dropped when the chain changes, and a value whose
+    computation overlapped an invalidation is returned but not stored, so a
+    body computed from the old state cannot outlive the change.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Number of responses kept
+            max_bytes: Total size of cached bodies
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        # Bumped by invalidate(); values computed under an older generation are not stored
+        self.generation = 0
+        self._entries: Dict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'discarded': 0}
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+        The value is not stored if the cache was invalidated while it was computed.
+
+        Args:
+            key: Cache key
+            compute: Function producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key]
+            self.stats['misses'] += 1
+            generation = self.generation
+
+        # Computed outside the lock; concurrent misses of one key both compute
+        value = compute()
+        size = size_of(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if generation != self.generation:
+                self.stats['discarded'] += 1
+                return value
+            if key in self._entries:
+                self.bytes -= size_of(self._entries[key])
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= size_of(evicted)
+                self.stats['evictions'] += 1
+        return value
+
+    def invalidate(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self.generation += 1
+            if self._entries:
+                self._entries.clear()
+                self.bytes = 0
+                self.stats['invalidations'] += 1
+
+    def on_change(self, kind: str, data: Dict[str, Any]) -> None:
+        """
+        Blockchain listener; drops entries when blocks are appended, reorganized or edited.
+
+        Args:
+            kind: Blockchain event name
+            data: Blockchain event data
+        """
+        if kind in ('chain', 'edit'):
+            self.invalidate()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with size, capacity, hit/miss/discard counters and hit rate
+        """
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                bytes=self.bytes,
+                max_bytes=self.max_bytes,
+                hit_rate=round(self.stats['hits'] / lookups, 4) if lookups else None
+            )
@@ -6,13 +6,27 @@ import argparse
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from src.blockchain.chain import Blockchain
-from src.blockchain.block import Block
-import threading, requests, json, time, os
+from src.blockchain.block import Block, tx_hash
+from src.blockchain.guard import DoubleVoteGuard, BLOOM_CAPACITY, BLOOM_ERROR_RATE, is_vote
+import threading, json, time, os
 from src.utils.logger import setup_logger
-from src.network.voting import setup_voting_routes
-from typing import List, Dict, Any
+from src.network.voting import setup_voting_routes, refused, vote_delta
+from src.network.admission import AdmissionController, HIGH_WATERMARK, LOW_WATERMARK, CLIENT_RATE, CLIENT_BURST
+from src.network.analytics import setup_analytics_routes
+from src.network.explorer import setup_explorer_routes
+from src.network.fanout import fan_out, quorum
+from src.network import session
+from src.network.relay import BlockRelay
+from src.network.gossip import InventoryGossip
+from src.network.compact import make_compact, match_mempool, build_block
+from src.network import codec
+from src.network.sync import SingleFlight, SyncScheduler
+from src.network.events import EventBus, format_sse, KEEPALIVE_INTERVAL
+from src.network.miner import MiningService, AUTO_MIN_TRANSACTIONS, AUTO_MAX_AGE
+from src.network.cache import ResponseCache
+from typing import List, Dict, Any, Optional
 
 app = Flask(__name__)
 
@@ -30,8 +44,31 @@ parser.add_argument('--tracker-url', type=str, default='http://localhost:6000',
                     help='URL of the tracker server (default: http://localhost:6000)')
 parser.add_argument('--host', type=str, default='0.0.0.0',
                     help='Host IP to bind to (default: 0.0.0.0)')
+parser.add_argument('--auto-mine', action='store_true',
+                    help='Mine automatically when the pending pool is large or old enough')
+parser.add_argument('--auto-mine-txs', type=int, default=AUTO_MIN_TRANSACTIONS,
+                    help=f'Auto-mine once this many transactions are pending (default: {AUTO_MIN_TRANSACTIONS})')
+parser.add_argument('--auto-mine-age', type=float, default=AUTO_MAX_AGE,
+                    help=f'Auto-mine once a transaction has waited this many seconds (default: {AUTO_MAX_AGE})')
+parser.add_argument('--vote-guard', choices=['exact', 'bloom'], default='exact',
+                    help='Double-vote guard: exact index, or Bloom filter with exact fallback for large electorates')
+parser.add_argument('--vote-guard-capacity', type=int, default=BLOOM_CAPACITY,
+                    help=f'Bloom guard: expected number of voters (default: {BLOOM_CAPACITY})')
+parser.add_argument('--vote-guard-error-rate', type=float, default=BLOOM_ERROR_RATE,
+                    help=f'Bloom guard: false-positive rate (default: {BLOOM_ERROR_RATE})')
+parser.add_argument('--max-pending', type=int, default=HIGH_WATERMARK,
+                    help=f'Refuse new votes once this many transactions are pending (default: {HIGH_WATERMARK})')
+parser.add_argument('--pending-low-watermark', type=int, default=LOW_WATERMARK,
+                    help=f'Accept votes again once the pending pool drains to this size (default: {LOW_WATERMARK})')
+parser.add_argument('--client-rate', type=float, default=CLIENT_RATE,
+                    help=f'Votes per second allowed per client (default: {CLIENT_RATE})')
+parser.add_argument('--client-burst', type=int, default=CLIENT_BURST,
+                    help=f'Votes a client may submit at once (default: {CLIENT_BURST})')
 args = parser.parse_args()
 
+if args.vote_guard == 'bloom':
+    blockchain.use_vote_guard(DoubleVoteGuard('bloom', args.vote_guard_capacity, args.vote_guard_error_rate))
+
 # Set port from command line argument if provided
 if args.port:
     os.environ['PORT'] = str(args.port)
@@ -56,6 +93,16 @@ def get_base_url():
 
 # seconds between heartbeats to tracker
 HEARTBEAT_INTERVAL = 30
+# /mine skips its pre-mining sync if a sync finished within this many milliseconds
+MINE_SYNC_MAX_AGE_MS = 2000
+# Longest time POST /mine?wait=1 blocks before answering with the job status
+MINE_WAIT_TIMEOUT = 60
+# Overall deadline for streaming peer chains during sync; large chains take longer
+# than a regular fan-out budget, while each read keeps its own timeout
+CHAIN_SYNC_BUDGET = 600
+# Timeout for fetching a compact block's missing transactions; well under the
+# sender's relay delivery timeout, which covers the whole /compact_block request
+COMPACT_FETCH_TIMEOUT = 1
 mining_params = {
     "difficulty": blockchain.difficulty,
     "target_block_time": blockchain.target_block_time,
@@ -66,51 +113,208 @@ mining_params = {
 # Create logger with port information
 client_logger = None
 
-def verify_with_peers(blockchain: Blockchain, index: int, peers: List[str]) -> Dict[str, Any]:
+def other_peers() -> List[str]:
+    """
+    Get all known peers except this node, best first.
+    Peers dropped for repeated failures or invalid data are left out.
+    
+    Returns:
+        List of peer URLs
+    """
+    me = get_base_url()
+    return session.peer_table.rank(peer for peer in list(peers) if peer != me)
+
+# Last entity tag seen per peer for its chain-only /chain response
+peer_chain_etags: Dict[str, str] = {}
+
+def fetch_peer_chain(peer: str, timeout: float, conditional: bool = False) -> Blockchain:
+    """
+    Download and validate a peer's chain.
+    
+    Args:
+        peer: Peer URL
+        timeout: Request timeout in seconds
+        conditional: Send the last seen entity tag and return None if unchanged
+        
+    Returns:
+        Peer's blockchain, or None if conditional and the chain is unchanged
+        
+    Raises:
+        ValueError: If the peer's chain is invalid
+    """
+    headers = {}
+    if conditional and peer in peer_chain_etags:
+        headers['If-None-Match'] = peer_chain_etags[peer]
+    headers['Accept'] = f"{codec.BINARY_MIMETYPE}, application/json"
+    resp = session.get(f"{peer}/chain", params={'chain_only': 1}, headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        return None
+    try:
+        if resp.headers.get('Content-Type', '').startswith(codec.BINARY_MIMETYPE):
+            data = codec.decode_chain(resp.content)
+            other_chain = Blockchain.from_dict({'chain': [], 'difficulty': data['difficulty']})
+            other_chain.chain = data['chain']
+        else:
+            other_chain = Blockchain.from_dict(resp.json())
+        if not other_chain.is_chain_valid():
+            raise ValueError("invalid chain")
+    except (ValueError, KeyError) as e:
+        session.peer_table.record_invalid(peer, f"chain: {e}")
+        raise
+    if conditional and resp.headers.get('ETag'):
+        peer_chain_etags[peer] = resp.headers['ETag']
+    return other_chain
+
+def fetch_changed_peer_chain(peer: str, timeout: float) -> Blockchain:
+    """
+    Download a peer's chain only if it changed since the last successful fetch.
+    
+    Args:
+        peer: Peer URL
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Peer's blockchain, or None if unchanged
+    """
+    return fetch_peer_chain(peer, timeout, conditional=True)
+
+def stream_peer_chain(peer: str, timeout: float) -> Blockchain:
+    """
+    Stream a peer's chain as NDJSON and validate it block by block.
+    Stops early when the peer's chain is unchanged, shorter than ours or
+    invalid, so neither side holds the whole chain as one JSON document.
+    
+    Args:
+        peer: Peer URL
+        timeout: Per-read timeout in seconds
+        
+    Returns:
+        Peer's blockchain, or None if it cannot be better than ours or is unchanged
+        
+    Raises:
+        ValueError: If a streamed block is invalid
+    """
+    local_chain = blockchain.chain
+    local_length = len(local_chain)
+    headers = {}
+    if peer in peer_chain_etags:
+        headers['If-None-Match'] = peer_chain_etags[peer]
+    
+    with session.get(f"{peer}/chain/stream", headers=headers, stream=True, timeout=timeout) as resp:
+        if resp.status_code == 404:
+            # Peer without the streaming endpoint
+            return fetch_changed_peer_chain(peer, timeout)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        
+        try:
+            lines = resp.iter_lines()
+            meta = json.loads(next(lines))
+            if meta['length'] < local_length or meta['tip'] == local_chain[-1].hash:
+                return None
+            
+            other_chain = Blockchain.from_dict({'chain': [], 'difficulty': meta.get('difficulty', 4)})
+            blocks = []
+            for line in lines:
+                if not line:
+                    continue
+                block = Block.from_dict(json.loads(line))
+                if blocks and not other_chain.is_valid_successor(blocks[-1], block):
+                    raise ValueError(f"invalid block #{block.index}")
+                i = len(blocks)
+                if i < local_length and local_chain[i].hash == block.hash:
+                    # Share the block object we already hold
+                    block = local_chain[i]
+                blocks.append(block)
+            
+            if len(blocks) != meta['length']:
+                raise ValueError(f"stream ended after {len(blocks)} of {meta['length']} blocks")
+        except (ValueError, KeyError, StopIteration) as e:
+            reason = str(e) or "empty stream"
+            session.peer_table.record_invalid(peer, f"chain stream: {reason}")
+            raise ValueError(reason)
+        other_chain.chain = blocks
+        if resp.headers.get('ETag'):
+            peer_chain_etags[peer] = resp.headers['ETag']
+        return other_chain
+
+def fetch_peer_block(peer: str, index: int, timeout: float) -> Block:
+    """
+    Download a single block from a peer.
+    
+    Args:
+        peer: Peer URL
+        index: Block index (negative values count from the tip)
+        timeout: Request timeout in seconds
+        
+    Returns:
+        The peer's block, or None if the peer has no block at that index
+    """
+    resp = session.get(f"{peer}/block/{index}", headers={'Accept': f"{codec.BINARY_MIMETYPE}, application/json"},
+                       timeout=timeout)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    try:
+        if resp.headers.get('Content-Type', '').startswith(codec.BINARY_MIMETYPE):
+            return codec.decode_block_message(resp.content)
+        return Block.from_dict(resp.json())
+    except (ValueError, KeyError) as e:
+        session.peer_table.record_invalid(peer, f"block: {e}")
+        raise
+
+def verify_with_peers(blockchain: Blockchain, index: int, peers: List[str],
+                      quorum_size: int = None) -> Dict[str, Any]:
     """
     Verify a block with all peers in the network.
     
     Args:
         blockchain: Local blockchain instance
         index: Index of block to verify
-        peers: List of peer URLs
+        peers: List of peer URLs, best first
+        quorum_size: Stop once this many peers report a matching hash (optional);
+                     only this many peers are queried at a time
         
     Returns:
         Dict containing verification results from all peers
     """
-    if index >= len(blockchain.chain):
+    chain = blockchain.chain
+    if index >= len(chain):
         return {'error': 'Block index out of range'}
         
-    block = blockchain.chain[index]
-    results = {}
+    block = chain[index]
     
-    for peer in peers:
-        if peer == get_base_url():
-            continue
-        try:
-            # Get block from peer
-            resp = requests.get(f"{peer}/chain", timeout=5)
-            peer_chain = Blockchain.from_dict(resp.json())
-            
-            if index >= len(peer_chain.chain):
-                results[peer] = {'error': 'Block not found on peer'}
-                continue
-                
-            peer_block = peer_chain.chain[index]
-            
-            # Compare block hashes
-            results[peer] = {
-                'hash_match': block.hash == peer_block.hash,
-                'previous_hash_match': block.previous_hash == peer_block.previous_hash,
-                'merkle_root_match': block.merkle_root == peer_block.merkle_root,
-                'difficulty_match': True,
-                'transactions_match': block.transactions == peer_block.transactions
-            }
-            
-        except Exception as e:
-            results[peer] = {'error': str(e)}
-            
-    return results
+    def compare(peer, timeout):
+        # Get only this block from the peer
+        peer_block = fetch_peer_block(peer, index, timeout)
+        
+        if peer_block is None:
+            return {'error': 'Block not found on peer'}
+        
+        # Compare block hashes
+        return {
+            'hash_match': block.hash == peer_block.hash,
+            'previous_hash_match': block.previous_hash == peer_block.previous_hash,
+            'merkle_root_match': block.merkle_root == peer_block.merkle_root,
+            'difficulty_match': True,
+            'transactions_match': block.transactions == peer_block.transactions
+        }
+    
+    until = None
+    concurrency = None
+    if quorum_size:
+        until = quorum(quorum_size, lambda r: r.get('hash_match', False))
+        # Ask the best-ranked peers first; others only if they fail or disagree
+        concurrency = quorum_size
+    
+    me = get_base_url()
+    outcomes = fan_out([peer for peer in peers if peer != me], compare, until=until,
+                       concurrency=concurrency)
+    return {
+        peer: outcome['value'] if outcome['ok'] else {'error': outcome['error']}
+        for peer, outcome in outcomes.items()
+    }
 
 @app.route('/new_block', methods=['POST'])
 def receive_block():
@@ -121,88 +325,251 @@ def receive_block():
     Returns:
         JSON response with status and reason if rejected
     """
-    block_data = request.get_json()
     client_logger.info(f"Received new block from peer")
 
     try:
-        new_block = Block.from_dict(block_data)
-        # Preserve the original difficulty from the received block
-        new_block.difficulty = block_data.get('difficulty', new_block.difficulty)
+        new_block = read_block_payload()
     except Exception as e:
         client_logger.error(f"Invalid block format: {e}")
         return jsonify({'status': 'rejected', 'reason': f'invalid_format: {e}'}), 400
 
-    latest_block = blockchain.get_latest_block()
-    if new_block.previous_hash != latest_block.hash:
-        client_logger.warning(f"Previous hash mismatch. Expected: {latest_block.hash}, Got: {new_block.previous_hash}")
-        # Handle forks by fetching chains from peers
-        for peer in peers:
-            if peer == get_base_url():
-                continue
+    body, status = process_block(new_block)
+    if status == 200:
+        # Relay onward; peers that already have it decline the announcement
+        broadcast_block(new_block)
+    return jsonify(body), status
+
+def read_block_payload() -> Block:
+    """
+    Decode the block in the current request body.
+    Accepts JSON or the binary wire format, optionally gzip/deflate compressed.
+    
+    Returns:
+        Decoded block
+    """
+    body = codec.decompress(request.get_data(), request.headers.get('Content-Encoding'))
+    if request.mimetype == codec.BINARY_MIMETYPE:
+        return codec.decode_block_message(body)
+    block_data = json.loads(body)
+    new_block = Block.from_dict(block_data)
+    # Preserve the original difficulty from the received block
+    new_block.difficulty = block_data.get('difficulty', new_block.difficulty)
+    return new_block
+
+@app.route('/compact_block', methods=['POST'])
+def receive_compact_block():
+    """
+    Receive a compact block (header plus short transaction IDs) from a peer.
+    The block is rebuilt from the pending pool; only missing transactions
+    are fetched, and only from a known peer. A block that does not extend
+    the local tip needs fork resolution with other peers, which can take
+    longer than the sender waits, so it is processed in the background.
+    
+    Request body:
+    {
+        "header": dict,      # Block header fields
+        "short_ids": [str],  # Short transaction IDs in block order
+        "origin": str        # Sending peer URL
+    }
+    
+    Returns:
+        JSON response with status and reason if rejected; 202 if the block
+        is being processed in the background
+    """
+    data = request.get_json() or {}
+    try:
+        transactions, missing = match_mempool(data, list(blockchain.pending_transactions))
+        if missing:
+            origin = data.get('origin')
+            # Never fetch from a URL a request names unless it is a known peer
+            if origin not in peers or origin == get_base_url():
+                raise ValueError("missing transactions and no known peer to fetch them from")
+            resp = session.get(
+                f"{origin}/block_txs",
+                params={'hash': data['header']['hash'], 'indexes': ','.join(map(str, missing))},
+                timeout=COMPACT_FETCH_TIMEOUT
+            )
+            resp.raise_for_status()
+            fetched = resp.json()['transactions']
+            for i, tx in zip(missing, fetched):
+                transactions[i] = tx
+            compact_stats['missing_fetched'] += len(missing)
+        new_block = build_block(data, transactions)
+    except Exception as e:
+        client_logger.warning(f"Compact block reconstruction failed: {e}")
+        compact_stats['reconstruction_failed'] += 1
+        return jsonify({'status': 'rejected', 'reason': 'reconstruction_failed'}), 409
+    
+    compact_stats['reconstructed'] += 1
+    client_logger.info(f"Rebuilt compact block #{new_block.index} ({len(missing)} of {len(transactions)} transactions fetched)")
+    with blockchain.lock:
+        extends_tip = new_block.previous_hash == blockchain.get_latest_block().hash
+        if extends_tip:
+            body, status = append_received_block(new_block)
+    if not extends_tip:
+        threading.Thread(target=process_block_in_background, args=(new_block,), daemon=True).start()
+        return jsonify({'status': 'queued'}), 202
+    if status == 200:
+        broadcast_block(new_block)
+    return jsonify(body), status
+
+def process_block_in_background(new_block: Block) -> None:
+    """
+    Process a received block that needs fork resolution, then relay it if accepted.
+    
+    Args:
+        new_block: Block received from a peer
+    """
+    try:
+        body, status = process_block(new_block)
+        if status == 200:
+            broadcast_block(new_block)
+        else:
+            client_logger.info(f"Block #{new_block.index} not adopted: {body.get('reason')}")
+    except Exception as e:
+        client_logger.error(f"Failed to process block #{new_block.index}: {e}")
+
+@app.route('/block_txs', methods=['GET'])
+def get_block_transactions():
+    """
+    Get selected transactions of a block, used to complete compact blocks.
+    
+    Query parameters:
+    - hash: str      # Block hash
+    - indexes: str   # Comma-separated transaction indexes
+    
+    Returns:
+        JSON response with the requested transactions in order
+    """
+    block_hash = request.args.get('hash')
+    try:
+        indexes = [int(i) for i in request.args.get('indexes', '').split(',') if i]
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid indexes'}), 400
+    
+    for block in reversed(blockchain.chain):
+        if block.hash == block_hash:
             try:
-                resp = requests.get(f"{peer}/chain", timeout=5)
-                data = resp.json()
-                other_chain = Blockchain.from_dict(data)
+                return jsonify({
+                    'status': 'success',
+                    'transactions': [block.transactions[i] for i in indexes]
+                }), 200
+            except IndexError:
+                return jsonify({'status': 'error', 'message': 'Transaction index out of range'}), 400
+    return jsonify({'status': 'error', 'message': 'Block not found'}), 404
+
+def process_block(new_block: Block):
+    """
+    Validate a block received from a peer and append it to the chain.
+    Handles chain synchronization and fork resolution.
+    
+    Args:
+        new_block: Block received from a peer
+        
+    Returns:
+        tuple: (response body dict, HTTP status code)
+    """
+    with blockchain.lock:
+        latest_block = blockchain.get_latest_block()
+        if new_block.previous_hash == latest_block.hash:
+            return append_received_block(new_block)
+    
+    client_logger.warning(f"Previous hash mismatch. Expected: {latest_block.hash}, Got: {new_block.previous_hash}")
+    # Handle forks by fetching chains from peers concurrently, stopping
+    # as soon as one peer offers a longer chain the new block extends.
+    # Peers are queried without holding the writer lock.
+    local_length = len(blockchain.chain)
+    def extends_longer(results):
+        return any(
+            r['ok'] and len(r['value'].chain) > local_length
+            and r['value'].get_latest_block().hash == new_block.previous_hash
+            for r in results.values()
+        )
+    
+    outcomes = fan_out(other_peers(), fetch_peer_chain, until=extends_longer)
+    with blockchain.lock:
+        for peer, outcome in outcomes.items():
+            if not outcome['ok']:
+                client_logger.warning(f"Failed to sync with {peer}: {outcome['error']}")
+                continue
+            other_chain = outcome['value']
+            if blockchain.find_double_vote(other_chain.chain) is not None:
+                client_logger.warning(f"Chain from {peer} contains a double vote; ignored")
+                continue
+            
+            temp_block = new_block
+            
+            if len(other_chain.chain) > len(blockchain.chain):
+                # Save transactions from the last block of current chain
+                discarded_txs = blockchain.chain[-1].transactions
+                # Switch to the longer chain
+                blockchain.replace_chain(other_chain.chain)
+                client_logger.info(f"Replaced local chain with longer one from {peer}")
+                # Return discarded transactions to the pending transaction pool
+                for tx in discarded_txs:
+                    if tx not in blockchain.pending_transactions:
+                        blockchain.add_transaction(tx)
+                        client_logger.info(f"Returned discarded transaction to pool: {tx}")
                 
-                temp_block = new_block
+                if (temp_block.previous_hash == blockchain.get_latest_block().hash
+                        and not blockchain.vote_guard.invalid_votes(temp_block.transactions, temp_block.index)):
+                    blockchain.append_block(temp_block)
+                    client_logger.info(f"New block added: {temp_block.hash}")
+                    return {'status': 'accepted'}, 200
+            
+            elif len(other_chain.chain) == len(blockchain.chain):
+                current_work = sum(int(block.hash, 16) for block in blockchain.chain)
+                other_work = sum(int(block.hash, 16) for block in other_chain.chain)
                 
-                if other_chain.is_chain_valid() and len(other_chain.chain) > len(blockchain.chain):
+                if other_work < current_work:
                     # Save transactions from the last block of current chain
                     discarded_txs = blockchain.chain[-1].transactions
-                    # Switch to the longer chain
-                    blockchain.chain = other_chain.chain
-                    client_logger.info(f"Replaced local chain with longer one from {peer}")
+                    # Switch to the chain with greater work
+                    blockchain.replace_chain(other_chain.chain)
+                    client_logger.info(f"Replaced local chain with one of equal length but greater work from {peer}")
                     # Return discarded transactions to the pending transaction pool
                     for tx in discarded_txs:
                         if tx not in blockchain.pending_transactions:
-                            blockchain.pending_transactions.append(tx)
+                            blockchain.add_transaction(tx)
                             client_logger.info(f"Returned discarded transaction to pool: {tx}")
                     
-                    if temp_block.previous_hash == blockchain.get_latest_block().hash:
-                        blockchain.chain.append(temp_block)
+                    if (temp_block.previous_hash == blockchain.get_latest_block().hash
+                            and not blockchain.vote_guard.invalid_votes(temp_block.transactions, temp_block.index)):
+                        blockchain.append_block(temp_block)
                         client_logger.info(f"New block added: {temp_block.hash}")
-                        return jsonify({'status': 'accepted'}), 200
-                
-                elif other_chain.is_chain_valid() and len(other_chain.chain) == len(blockchain.chain):
-                    current_work = sum(int(block.hash, 16) for block in blockchain.chain)
-                    other_work = sum(int(block.hash, 16) for block in other_chain.chain)
-                    
-                    if other_work < current_work:
-                        # Save transactions from the last block of current chain
-                        discarded_txs = blockchain.chain[-1].transactions
-                        # Switch to the chain with greater work
-                        blockchain.chain = other_chain.chain
-                        client_logger.info(f"Replaced local chain with one of equal length but greater work from {peer}")
-                        # Return discarded transactions to the pending transaction pool
-                        for tx in discarded_txs:
-                            if tx not in blockchain.pending_transactions:
-                                blockchain.pending_transactions.append(tx)
-                                client_logger.info(f"Returned discarded transaction to pool: {tx}")
-                        
-                        if temp_block.previous_hash == blockchain.get_latest_block().hash:
-                            blockchain.chain.append(temp_block)
-                            client_logger.info(f"New block added: {temp_block.hash}")
-                            return jsonify({'status': 'accepted'}), 200
-                            
-            except Exception as e:
-                client_logger.warning(f"Failed to sync with {peer}: {e}")
-                continue
-        return jsonify({'status': 'rejected', 'reason': 'previous_hash_mismatch'}), 400
+                        return {'status': 'accepted'}, 200
+    return {'status': 'rejected', 'reason': 'previous_hash_mismatch'}, 400
 
+def append_received_block(new_block: Block):
+    """
+    Validate a block that extends the local tip and append it.
+    Caller holds the blockchain writer lock.
+    
+    Args:
+        new_block: Block received from a peer
+        
+    Returns:
+        tuple: (response body dict, HTTP status code)
+    """
     # Validate proof of work using block's own difficulty
     prefix = '0' * new_block.difficulty  # 使用区块自己的难度值
     if not new_block.hash.startswith(prefix):
         client_logger.warning(f"Invalid proof of work. Hash: {new_block.hash}, Required prefix: {prefix}")
-        return jsonify({'status': 'rejected', 'reason': 'invalid_proof_of_work'}), 400
+        return {'status': 'rejected', 'reason': 'invalid_proof_of_work'}, 400
 
     # Validate hash integrity
     if new_block.hash != new_block.calculate_hash():
         client_logger.warning(f"Hash mismatch. Calculated: {new_block.calculate_hash()}, Received: {new_block.hash}")
-        return jsonify({'status': 'rejected', 'reason': 'hash_mismatch'}), 400
+        return {'status': 'rejected', 'reason': 'hash_mismatch'}, 400
+
+    double_votes = blockchain.vote_guard.invalid_votes(new_block.transactions, new_block.index)
+    if double_votes:
+        client_logger.warning(f"Block {new_block.hash} contains {len(double_votes)} double votes")
+        return {'status': 'rejected', 'reason': 'double_vote'}, 400
 
-    blockchain.chain.append(new_block)
+    blockchain.append_block(new_block)
     client_logger.info(f"New block added: {new_block.hash}")
-    return jsonify({'status': 'accepted'}), 200
+    return {'status': 'accepted'}, 200
 
 @app.route('/transaction', methods=['POST'])
 def new_transaction():
@@ -216,52 +583,329 @@ def new_transaction():
     if not data:
         client_logger.error("No transaction data provided")
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
-    blockchain.add_transaction(data)
+    with blockchain.lock:
+        if is_vote(data) and blockchain.vote_guard.has_voted(data['sender']):
+            return jsonify({'status': 'error', 'message': 'User has already voted'}), 400
+        admitted, reason, retry_after = admission.admit(request.remote_addr, 1, len(blockchain.pending_transactions))
+        if not admitted:
+            return refused(reason, retry_after)
+        blockchain.add_transaction(data)
+    publish_transaction(data)
     client_logger.info(f"Added transaction: {data}")
     return jsonify({'status': 'success', 'message': 'Transaction added'}), 200
 
+@app.route('/inv', methods=['POST'])
+def inventory():
+    """
+    Receive an inventory announcement from a peer.
+    
+    Request body:
+    {
+        "type": "tx" | "block",
+        "ids": [str],  # Transaction IDs or block hashes
+        "origin": str  # Announcing peer URL (optional)
+    }
+    
+    Returns:
+        JSON response listing the IDs this node wants
+    """
+    data = request.get_json() or {}
+    kind = data.get('type')
+    ids = data.get('ids') or []
+    if kind not in ('tx', 'block') or not isinstance(ids, list):
+        return jsonify({'status': 'error', 'message': 'Invalid inventory'}), 400
+    
+    want = gossip.wanted(kind, ids)
+    if kind == 'block' and want:
+        known = {block.hash for block in blockchain.chain}
+        want = [h for h in want if h not in known]
+        # Sync if the announced blocks are not relayed to us shortly
+        sync_scheduler.announced(want)
+    client_logger.debug(f"Inventory of {len(ids)} {kind} IDs, want {len(want)}")
+    resp = jsonify({'status': 'success', 'want': want})
+    if kind == 'block':
+        # Advertise the block formats and encodings /new_block accepts
+        resp.headers['Accept-Post'] = f"{codec.BINARY_MIMETYPE}, application/json"
+        resp.headers['Accept-Encoding'] = 'gzip, deflate'
+    return resp, 200
+
+@app.route('/txs', methods=['POST'])
+def receive_transactions():
+    """
+    Receive a batch of transactions requested after an inventory announcement.
+    
+    Request body:
+    {
+        "transactions": [dict],
+        "origin": str  # Sending peer URL (optional)
+    }
+    
+    Returns:
+        JSON response with the number of transactions accepted
+    """
+    data = request.get_json() or {}
+    transactions = data.get('transactions') or []
+    accepted = []
+    for tx in transactions:
+        txid = tx_hash(tx)
+        with blockchain.lock:
+            # Already pending or confirmed (see mark_confirmed_seen)
+            if txid in gossip.seen['tx']:
+                continue
+            # Same double-voting rule as /vote
+            if is_vote(tx) and blockchain.vote_guard.has_voted(tx['sender']):
+                continue
+            # Relayed transactions are not rate limited but respect the pool bound;
+            # a refused transaction stays unseen so a later announcement can deliver it
+            if not admission.admit_relayed(len(blockchain.pending_transactions)):
+                continue
+            blockchain.add_transaction(tx)
+            gossip.mark_seen('tx', [txid])
+        accepted.append(txid)
+    
+    # Pass new transactions on to everyone except the sender
+    gossip.announce('tx', accepted, data.get('origin'))
+    client_logger.info(f"Accepted {len(accepted)} of {len(transactions)} gossiped transactions")
+    return jsonify({'status': 'success', 'accepted': len(accepted)}), 200
+
+def mine_block(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sync, mine pending transactions and broadcast the block.
+    Runs on the mining service thread.
+    
+    Args:
+        options: Job options; 'max_sync_age_ms' skips the pre-mining sync if
+                 the chain was synced within that many milliseconds (0 always syncs)
+        
+    Returns:
+        The mined block as a dictionary
+        
+    Raises:
+        ValueError: If there are no pending transactions
+    """
+    # Sync chain before mining, unless a recent sync makes it redundant
+    max_age_ms = options.get('max_sync_age_ms', MINE_SYNC_MAX_AGE_MS)
+    sync_chain(max_age=max_age_ms / 1000 if max_age_ms > 0 else None)
+    new_block = blockchain.mine_pending_transactions()
+    # After mining locally, hand the block to the relay; delivery happens in the background
+    broadcast_block(new_block)
+    client_logger.info(f"Mined new block #{new_block.index}: {new_block.hash}")
+    return new_block.to_dict()
+
 @app.route('/mine', methods=['POST'])
 def mine():
     """
-    Mine pending transactions into new block.
+    Queue a job that mines pending transactions into a new block.
+    Returns immediately with the job ID unless `wait` is given.
+    
+    Query parameters:
+    - max_sync_age_ms: int (optional, skip the pre-mining sync if the chain was
+      synced within this many milliseconds; 0 always syncs)
+    - wait: int (optional, 1 to block until the block is mined and return it)
     
     Returns:
-        JSON response with mined block or error
+        202 JSON response with the job ID and status, or with wait=1 the
+        mined block or an error
     """
-    try:
-        # Sync chain before mining
-        sync_chain()
-        new_block = blockchain.mine_pending_transactions()
-        if not new_block:
-            client_logger.warning("No transactions to mine")
-            return jsonify({'status': 'error', 'message': 'No transactions to mine'}), 400
-            
-        client_logger.info(f"Starting to mine block #{new_block.index}")
-        # After mining locally, broadcast to peers
-        for peer in peers:
-            if peer == get_base_url():
-                continue
-            try:
-                requests.post(f"{peer}/new_block", json=new_block.to_dict())
-                client_logger.debug(f"Block broadcasted to {peer}")
-            except Exception as e:
-                client_logger.warning(f"Failed to broadcast to {peer}: {str(e)}")
-        client_logger.info(f"Mined new block: {new_block.hash}")
-        return jsonify({'status': 'success', 'block': new_block.to_dict()}), 200
-    except Exception as e:
-        client_logger.error(f"Error mining block: {str(e)}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    options = {'max_sync_age_ms': request.args.get('max_sync_age_ms', default=MINE_SYNC_MAX_AGE_MS, type=int)}
+    job = miner.submit('api', options)
+    client_logger.info(f"Mining job {job.id} queued")
+    
+    if request.args.get('wait', default=0, type=int):
+        job.done.wait(MINE_WAIT_TIMEOUT)
+        if job.status == 'done':
+            return jsonify({'status': 'success', 'job_id': job.id, 'block': job.block}), 200
+        if job.status == 'failed':
+            client_logger.error(f"Error mining block: {job.error}")
+            return jsonify({'status': 'error', 'job_id': job.id, 'message': job.error}), 500
+        return jsonify({'status': 'pending', 'job_id': job.id, 'job': job.to_dict()}), 202
+    
+    resp = jsonify({'status': 'accepted', 'job_id': job.id, 'job': job.to_dict()})
+    resp.status_code = 202
+    resp.headers['Location'] = f"/mine/{job.id}"
+    return resp
+
+@app.route('/mine/<job_id>', methods=['GET'])
+def mining_job_status(job_id):
+    """
+    Get the status of a mining job.
+    
+    Args:
+        job_id: ID returned by POST /mine
+    
+    Returns:
+        JSON response with the job status ('queued', 'running', 'done' or
+        'failed'), timings and, when done, the mined block
+    """
+    job = miner.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown mining job'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict()}), 200
+
+@app.route('/mine/auto', methods=['GET', 'POST'])
+def auto_mine():
+    """
+    Get or change auto-mine mode.
+    In auto mode a block is mined whenever the pending pool reaches
+    min_transactions or its oldest transaction is max_age seconds old.
+    
+    Request body (POST, all optional):
+    {
+        "enabled": bool,
+        "min_transactions": int,
+        "max_age": float
+    }
+    
+    Returns:
+        JSON response with the mining service state
+    """
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        try:
+            min_transactions = data.get('min_transactions')
+            max_age = data.get('max_age')
+            if min_transactions is not None and int(min_transactions) < 1:
+                raise ValueError("min_transactions must be at least 1")
+            if max_age is not None and float(max_age) <= 0:
+                raise ValueError("max_age must be positive")
+            miner.configure(
+                auto=bool(data['enabled']) if 'enabled' in data else None,
+                min_transactions=int(min_transactions) if min_transactions is not None else None,
+                max_age=float(max_age) if max_age is not None else None
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        client_logger.info(f"Auto-mine settings updated: {data}")
+    return jsonify({'status': 'success', 'data': miner.to_dict()}), 200
+
+def matching_etag(etag: str) -> Optional[str]:
+    """
+    Match the request's If-None-Match against an entity tag and its compressed variants.
+    
+    Args:
+        etag: Entity tag of the uncompressed body (unquoted)
+        
+    Returns:
+        The matching tag, or None
+    """
+    for tag in (etag, codec.encoded_etag(etag, 'gzip'), codec.encoded_etag(etag, 'deflate')):
+        if request.if_none_match.contains(tag):
+            return tag
+    return None
 
 @app.route('/chain', methods=['GET'])
 def get_chain():
     """
     Get current blockchain.
+    The body is assembled from cached per-block JSON fragments and carries an
+    ETag; a matching If-None-Match returns 304 without serializing anything.
+    Peers sending `Accept: application/x-blockchain-binary` get the binary wire format.
+    
+    Query parameters:
+    - chain_only: int (optional, 1 to return only the chain and difficulty)
     
     Returns:
         JSON response with blockchain data
     """
     client_logger.debug("Chain requested")
-    return jsonify(blockchain.to_dict()), 200
+    include_pending = not request.args.get('chain_only', default=0, type=int)
+    etag = blockchain.chain_etag(include_pending)
+    matched = matching_etag(etag)
+    if matched:
+        resp = Response(status=304)
+        etag = matched
+    elif codec.accepts_binary(request.headers.get('Accept')):
+        pending, params = None, None
+        with blockchain.lock:
+            chain = blockchain.chain
+            etag = blockchain.chain_etag(include_pending, chain)
+            difficulty = blockchain.difficulty
+            if include_pending:
+                pending = list(blockchain.pending_transactions)
+                params = {
+                    'target_block_time': blockchain.target_block_time,
+                    'adjustment_interval': blockchain.adjustment_interval,
+                    'time_tolerance': blockchain.time_tolerance
+                }
+        # The entity tag identifies the exact state encoded, so it keys the cache
+        body = response_cache.get_or_compute(
+            ('chain.bin', etag), lambda: codec.encode_chain(chain, difficulty, pending, params))
+        resp = Response(body, status=200, mimetype=codec.BINARY_MIMETYPE)
+    else:
+        # tagged_json keeps the serialized chain per entity tag itself
+        etag, body = blockchain.tagged_json(include_pending)
+        resp = Response(body, status=200, mimetype='application/json')
+    resp.set_etag(etag)
+    resp.vary.add('Accept')
+    return resp
+
+@app.route('/chain/stream', methods=['GET'])
+def stream_chain():
+    """
+    Stream the current blockchain as NDJSON.
+    The first line holds metadata (length, tip hash, difficulty); each
+    following line is one block, oldest first. Supports If-None-Match
+    with the same entity tag as /chain?chain_only=1.
+    
+    Returns:
+        Streaming NDJSON response
+    """
+    chain = blockchain.chain
+    difficulty = blockchain.difficulty
+    etag = blockchain.chain_etag(False, chain)
+    if matching_etag(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+    
+    def generate():
+        meta = {'length': len(chain), 'tip': chain[-1].hash, 'difficulty': difficulty}
+        yield json.dumps(meta).encode() + b'\n'
+        for block in chain:
+            yield block.to_json() + b'\n'
+    
+    client_logger.debug("Chain stream requested")
+    resp = Response(generate(), status=200, mimetype='application/x-ndjson')
+    resp.set_etag(etag)
+    return resp
+
+@app.route('/block/<int(signed=True):index>', methods=['GET'])
+def get_block(index):
+    """
+    Get a single block.
+    
+    Args:
+        index: Block index; negative values count from the tip (-1 is the latest block)
+    
+    Returns:
+        JSON (or binary, if accepted) response with the block
+    """
+    chain = blockchain.chain
+    if not -len(chain) <= index < len(chain):
+        return jsonify({'status': 'error', 'message': 'Block index out of range'}), 404
+    block = chain[index]
+    if codec.accepts_binary(request.headers.get('Accept')):
+        resp = Response(codec.encode_block_message(block), status=200, mimetype=codec.BINARY_MIMETYPE)
+    else:
+        resp = Response(block.to_json(), status=200, mimetype='application/json')
+    resp.vary.add('Accept')
+    return resp
+
+@app.route('/block_header/<int(signed=True):index>', methods=['GET'])
+def get_block_header(index):
+    """
+    Get the header of a single block (no transactions or Merkle tree).
+    
+    Args:
+        index: Block index; negative values count from the tip (-1 is the latest block)
+    
+    Returns:
+        JSON response with the block header and current chain length
+    """
+    chain = blockchain.chain
+    if not -len(chain) <= index < len(chain):
+        return jsonify({'status': 'error', 'message': 'Block index out of range'}), 404
+    return jsonify({'status': 'success', 'header': chain[index].header(), 'length': len(chain)}), 200
 
 @app.route('/mining_params', methods=['GET', 'POST'])
 def mining_params_endpoint():
@@ -330,48 +974,460 @@ def mining_params_endpoint():
             client_logger.error(f"Invalid parameter value: {str(e)}")
             return jsonify({'status': 'error', 'message': f'Invalid parameter value: {str(e)}'}), 400
 
+@app.route('/relay_stats', methods=['GET'])
+def relay_stats():
+    """
+    Get outbound block relay statistics.
+    
+    Returns:
+        JSON response with per-peer queue depth, delivery counts and latency
+    """
+    return jsonify({'status': 'success', 'peers': relay.stats()}), 200
+
+def event_stream_state() -> Dict[str, Any]:
+    """Current tip and pending pool state sent when a client subscribes."""
+    chain = blockchain.chain
+    tip = chain[-1]
+    return {
+        'height': tip.index,
+        'hash': tip.hash,
+        'length': len(chain),
+        'mempool': {'size': len(blockchain.pending_transactions), 'version': blockchain.mempool_version}
+    }
+
+def requested_event_types():
+    """Parse the optional comma-separated `types` query parameter."""
+    types = request.args.get('types')
+    return [t for t in types.split(',') if t] if types else None
+
+@app.route('/events', methods=['GET'])
+def events():
+    """
+    Push node events as Server-Sent Events.
+    The stream starts with a "snapshot" event holding the current state, then
+    sends events as they happen:
+    - tip: {height, hash, previous_hash, length, reorg, fork_height}
+    - tally: {height, hash, reverted, delta: {candidate: +/-votes}} per block
+    - mempool: {size, version}, at most twice a second
+    - edit: {height, hash} of a block modified in place
+    A "reset" event means events were missed and state should be re-read.
+    
+    Query parameters:
+    - types: str (optional, comma-separated event types to receive)
+    
+    Headers:
+    - Last-Event-ID: resume after this event ID (sent by EventSource on reconnect)
+    
+    Returns:
+        text/event-stream response
+    """
+    kinds = requested_event_types()
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = event_bus.last_id()
+    snapshot = event_stream_state()
+    
+    def generate():
+        cursor = last_id
+        yield "retry: 3000\n\n"
+        yield format_sse({'type': 'snapshot', 'data': snapshot})
+        while True:
+            batch, missed = event_bus.events_after(cursor, kinds, timeout=KEEPALIVE_INTERVAL)
+            if missed:
+                yield format_sse({'type': 'reset', 'data': event_stream_state()})
+            if batch:
+                cursor = batch[-1]['id']
+                yield ''.join(format_sse(event) for event in batch)
+            elif missed:
+                cursor = event_bus.last_id()
+            else:
+                yield ": keepalive\n\n"
+    
+    client_logger.debug("Event stream opened")
+    resp = Response(generate(), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
+@app.route('/events/poll', methods=['GET'])
+def poll_events():
+    """
+    Long-poll alternative to /events.
+    
+    Query parameters:
+    - since: int (optional, last event ID seen; omit to get the current state and cursor)
+    - timeout: float (optional, seconds to wait for new events, default 25, max 60)
+    - types: str (optional, comma-separated event types)
+    
+    Returns:
+        JSON response with events, the cursor for the next call and, if
+        events were missed or no cursor was given, the current state
+    """
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'status': 'success', 'events': [], 'last_id': event_bus.last_id(),
+                        'state': event_stream_state()}), 200
+    timeout = min(max(request.args.get('timeout', default=25, type=float), 0), 60)
+    batch, missed = event_bus.events_after(since, requested_event_types(), timeout=timeout)
+    body = {
+        'status': 'success',
+        'events': batch,
+        'last_id': batch[-1]['id'] if batch else max(since, event_bus.last_id())
+    }
+    if missed:
+        body['state'] = event_stream_state()
+    return jsonify(body), 200
+
+@app.route('/sync_stats', methods=['GET'])
+def sync_stats():
+    """
+    Get chain synchronization statistics.
+    
+    Returns:
+        JSON response with sync run, coalesce and skip counters, the current
+        poll interval and per-peer backoff
+    """
+    return jsonify({
+        'status': 'success',
+        'sync': chain_sync.to_dict(),
+        'scheduler': sync_scheduler.to_dict()
+    }), 200
+
+@app.route('/admission_stats', methods=['GET'])
+def admission_stats():
+    """
+    Get vote admission control metrics.
+    
+    Returns:
+        JSON response with pending queue depth, watermarks, saturation state
+        and rejection counters
+    """
+    return jsonify({'status': 'success', 'data': admission.to_dict()}), 200
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """
+    Get response cache statistics.
+    
+    Returns:
+        JSON response with entry count, hits, misses, evictions and hit rate
+    """
+    return jsonify({'status': 'success', 'data': response_cache.to_dict()}), 200
+
+@app.route('/gossip_stats', methods=['GET'])
+def gossip_stats():
+    """
+    Get inventory gossip statistics.
+    
+    Returns:
+        JSON response with announcement counters and seen-set sizes
+    """
+    return jsonify({
+        'status': 'success',
+        'stats': gossip.stats,
+        'compact_blocks': compact_stats,
+        'seen': {kind: len(cache) for kind, cache in gossip.seen.items()}
+    }), 200
+
 @app.route('/peers', methods=['GET'])
 def get_peers():
     """
-    Get list of all peers.
+    Get list of all peers with their quality scores.
     
     Returns:
-        JSON response with list of peers
+        JSON response with list of peers, healthy peers ranked best first
+        and per-peer scores (RTT, throughput, failures, invalid data)
     """
     client_logger.debug("Peers list requested")
-    return jsonify({'peers': list(peers)}), 200
+    return jsonify({
+        'peers': list(peers),
+        'ranked': other_peers(),
+        'scores': session.peer_table.to_dict(peer for peer in list(peers) if peer != get_base_url())
+    }), 200
+
+# Compressed bodies of recent responses carrying an ETag, by (etag, content type, encoding)
+compressed_cache: Dict[tuple, bytes] = {}
+COMPRESSED_CACHE_SIZE = 8
+
+@app.after_request
+def compress_response(resp):
+    """
+    Compress response bodies for clients that accept gzip or deflate.
+    Streamed, small and already encoded responses are left alone.
+    """
+    encoding = codec.choose_encoding(request.headers.get('Accept-Encoding'))
+    if (encoding is None or resp.status_code != 200 or resp.is_streamed
+            or resp.direct_passthrough or 'Content-Encoding' in resp.headers):
+        return resp
+    data = resp.get_data()
+    if len(data) < codec.MIN_COMPRESS_SIZE:
+        return resp
+    
+    etag, weak = resp.get_etag()
+    key = (etag, resp.mimetype, encoding)
+    compressed = compressed_cache.get(key) if etag else None
+    if compressed is None:
+        compressed = codec.compress(data, encoding)
+        if etag:
+            if len(compressed_cache) >= COMPRESSED_CACHE_SIZE:
+                compressed_cache.pop(next(iter(compressed_cache)), None)
+            compressed_cache[key] = compressed
+    resp.set_data(compressed)
+    resp.headers['Content-Encoding'] = encoding
+    if etag:
+        # A compressed body is a different representation with its own tag
+        resp.set_etag(codec.encoded_etag(etag, encoding), weak)
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+def deliver_block(peer: str, block: Block, timeout: float) -> bool:
+    """
+    Announce a block to a single peer and send it as a compact block if the peer lacks it.
+    
+    Args:
+        peer: Peer URL
+        block: Block to send
+        timeout: Request timeout in seconds
+        
+    Returns:
+        bool: True if the peer accepted the block, False if it already had it or rejected it
+        
+    Raises:
+        Exception: On transport errors or server errors, so the relay retries
+    """
+    resp = session.post(f"{peer}/inv", json={'type': 'block', 'ids': [block.hash], 'origin': get_base_url()},
+                        timeout=timeout)
+    if resp.status_code >= 500:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    if block.hash not in resp.json().get('want', []):
+        return False
+    # The announcement reply tells which block formats the peer accepts
+    accepts = resp.headers
+    
+    # Send the compact form first; fall back to the full block if the peer cannot rebuild it
+    compact = make_compact(block)
+    compact['origin'] = get_base_url()
+    payload = json.dumps(compact)
+    resp = session.post(f"{peer}/compact_block", data=payload,
+                        headers={'Content-Type': 'application/json'}, timeout=timeout)
+    compact_stats['compact_sent'] += 1
+    compact_stats['compact_bytes'] += len(payload)
+    if resp.status_code == 409:
+        compact_stats['full_fallbacks'] += 1
+        resp = post_full_block(peer, block, timeout, accepts)
+    if resp.status_code >= 500:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    # 202: the peer took the block and resolves the fork in the background
+    return resp.status_code in (200, 202)
+
+def post_full_block(peer: str, block: Block, timeout: float, accepts=None):
+    """
+    Send a full block in the format the peer advertised.
+    The binary format and compression are only used if the peer listed them
+    (Accept-Post and Accept-Encoding on its /inv reply); otherwise, or if the
+    peer cannot decode the body (400 or 415), plain JSON is sent.
+    
+    Args:
+        peer: Peer URL
+        block: Block to send
+        timeout: Request timeout in seconds
+        accepts: Headers of the peer's /inv reply (optional)
+        
+    Returns:
+        HTTP response of the peer
+    """
+    accepts = accepts or {}
+    body = None
+    if codec.BINARY_MIMETYPE in accepts.get('Accept-Post', ''):
+        try:
+            body = codec.encode_block_message(block)
+            headers = {'Content-Type': codec.BINARY_MIMETYPE}
+        except codec.CodecError as e:
+            client_logger.warning(f"Block #{block.index} not encodable in binary, sending JSON: {e}")
+    if body is None:
+        body = json.dumps(block.to_dict()).encode()
+        headers = {'Content-Type': 'application/json'}
+    encoding = codec.choose_encoding(accepts.get('Accept-Encoding'))
+    if encoding and len(body) >= codec.MIN_COMPRESS_SIZE:
+        body = codec.compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    resp = session.post(f"{peer}/new_block", data=body, headers=headers, timeout=timeout)
+    if resp.status_code in (400, 415) and headers != {'Content-Type': 'application/json'}:
+        resp = session.post(f"{peer}/new_block", json=block.to_dict(), timeout=timeout)
+    return resp
+
+def send_inventory(peer: str, kind: str, ids: List[str], timeout: float) -> int:
+    """
+    Announce transaction IDs to a peer and send the transactions it wants.
+    
+    Args:
+        peer: Peer URL
+        kind: Inventory type
+        ids: Transaction IDs to announce
+        timeout: Request timeout in seconds
+        
+    Returns:
+        int: Number of transactions sent
+    """
+    resp = session.post(f"{peer}/inv", json={'type': kind, 'ids': ids, 'origin': get_base_url()}, timeout=timeout)
+    resp.raise_for_status()
+    want = set(resp.json().get('want', []))
+    if not want:
+        return 0
+    # Transactions mined in the meantime reach the peer inside their block
+    txs = [tx for tx in list(blockchain.pending_transactions) if tx_hash(tx) in want]
+    if txs:
+        session.post(f"{peer}/txs", json={'transactions': txs, 'origin': get_base_url()},
+                     timeout=timeout).raise_for_status()
+    return len(txs)
+
+relay = BlockRelay(deliver_block)
+compact_stats = {
+    'compact_sent': 0,
+    'compact_bytes': 0,
+    'full_fallbacks': 0,
+    'reconstructed': 0,
+    'missing_fetched': 0,
+    'reconstruction_failed': 0
+}
+gossip = InventoryGossip(send_inventory, other_peers)
+event_bus = EventBus()
+miner = MiningService(mine_block, auto=args.auto_mine, min_transactions=args.auto_mine_txs,
+                      max_age=args.auto_mine_age)
+# Serialized responses of read-only endpoints, keyed by the chain state they reflect
+response_cache = ResponseCache()
+# Bounds the pending pool and rate-limits vote submission per client
+admission = AdmissionController(args.max_pending, args.pending_low_watermark, args.client_rate, args.client_burst)
+
+def track_pending_pool(kind: str, data: Dict[str, Any]) -> None:
+    """
+    Feed pending pool changes to the auto-miner and admission control.
+    
+    Args:
+        kind: Blockchain event name
+        data: Blockchain event data
+    """
+    if kind == 'mempool':
+        miner.pending_changed(data['size'])
+        admission.pending_changed(data['size'])
+
+def mark_confirmed_seen(kind: str, data: Dict[str, Any]) -> None:
+    """
+    Mark the transactions of blocks joining the chain as seen, so gossip
+    neither requests nor re-adds transactions that are already confirmed.
+    Runs under the blockchain writer lock.
+    
+    Args:
+        kind: Blockchain event name
+        data: Blockchain event data
+    """
+    if kind == 'chain':
+        new = data['new']
+        gossip.mark_seen('tx', [tx_hash(tx) for height in range(data['fork'], len(new))
+                                for tx in new[height].transactions])
+
+def publish_chain_event(kind: str, data: Dict[str, Any]) -> None:
+    """
+    Translate blockchain changes into events for /events subscribers.
+    Runs under the blockchain writer lock.
+    
+    Args:
+        kind: Blockchain event name ('chain', 'mempool' or 'edit')
+        data: Blockchain event data
+    """
+    if kind == 'chain':
+        old, new, fork = data['old'], data['new'], data['fork']
+        # Undo the tallies of blocks that left the chain, newest first
+        for block in reversed(old[fork:]):
+            delta = vote_delta(block)
+            if delta:
+                event_bus.publish('tally', {
+                    'height': block.index, 'hash': block.hash, 'reverted': True,
+                    'delta': {candidate: -count for candidate, count in delta.items()}
+                })
+        for block in new[fork:]:
+            delta = vote_delta(block)
+            if delta:
+                event_bus.publish('tally', {
+                    'height': block.index, 'hash': block.hash, 'reverted': False, 'delta': delta
+                })
+        tip = new[-1]
+        event_bus.publish('tip', {
+            'height': tip.index, 'hash': tip.hash, 'previous_hash': tip.previous_hash,
+            'length': len(new), 'reorg': fork < len(old), 'fork_height': fork - 1
+        })
+    elif kind == 'mempool':
+        event_bus.publish_latest('mempool', data)
+    elif kind == 'edit':
+        block = data['block']
+        event_bus.publish('edit', {'height': block.index, 'hash': block.hash})
+
+def publish_transaction(tx: Dict[str, Any]) -> None:
+    """
+    Announce a locally submitted transaction to peers.
+    
+    Args:
+        tx: Transaction added to the pending pool
+    """
+    gossip.announce('tx', gossip.mark_seen('tx', [tx_hash(tx)]))
+
+def publish_transactions(txs: List[Dict[str, Any]]) -> None:
+    """
+    Announce a batch of locally submitted transactions to peers.
+    
+    Args:
+        txs: Transactions added to the pending pool
+    """
+    gossip.announce('tx', gossip.mark_seen('tx', [tx_hash(tx) for tx in txs]))
 
 def broadcast_block(block):
     """
-    Broadcast new block to all peers.
+    Queue a new block for background delivery to all peers.
     
     Args:
         block: Block to broadcast
     """
-    payload = block.to_dict()
-    for peer in peers:
-        if peer == get_base_url():
-            continue
-        try:
-            requests.post(f"{peer}/new_block", json=payload, timeout=3)
-            client_logger.debug(f"Block broadcasted to {peer}")
-        except Exception as e:
-            client_logger.warning(f"Failed to broadcast to {peer}: {e}")
+    gossip.mark_seen('block', [block.hash])
+    queued = relay.enqueue(block, other_peers())
+    client_logger.debug(f"Block {block.hash} queued for {queued} peers")
 
 def run_server():
     """
     Start Flask server.
     """
+    # Only peers are scored; tracker calls and requests to ourselves are not
+    session.pool.exclude(TRACKER_URL, get_base_url())
     if not register_with_tracker():
         client_logger.error("Failed to register with tracker, exiting")
         return
 
     # Setup voting routes
-    setup_voting_routes(app, blockchain, client_logger)
+    tally = setup_voting_routes(app, blockchain, client_logger, on_transaction=publish_transaction,
+                                on_transactions=publish_transactions, admission=admission,
+                                cache=response_cache)
+    # Bloom-mode guard: confirm possible matches with the tally's voter index, not a chain scan
+    with blockchain.lock:
+        blockchain.vote_guard.fallback = tally.voted_below
+    blockchain.subscribe(response_cache.on_change)
+    setup_analytics_routes(app, blockchain, client_logger)
+    setup_explorer_routes(app, blockchain, client_logger)
+    blockchain.subscribe(publish_chain_event)
+    blockchain.subscribe(track_pending_pool)
+    blockchain.subscribe(mark_confirmed_seen)
+    miner.logger = client_logger
+    miner.pending_changed(len(blockchain.pending_transactions))
+    admission.pending_changed(len(blockchain.pending_transactions))
+    miner.start()
 
     # Start background threads
+    relay.logger = client_logger
+    relay.start()
+    gossip.logger = client_logger
+    gossip.start()
+    session.peer_table.logger = client_logger
+    sync_scheduler.logger = client_logger
+    sync_scheduler.start()
     threading.Thread(target=send_heartbeat, daemon=True).start()
-    threading.Thread(target=periodic_sync, daemon=True).start()
 
     client_logger.info("Starting client server...")
     app.run(host='0.0.0.0', port=get_port())
@@ -381,7 +1437,7 @@ def register_with_tracker():
     Register with tracker server and sync blockchain.
     """
     try:
-        response = requests.post(
+        response = session.post(
             f"{TRACKER_URL}/register",
             json={
                 "address": get_base_url()
@@ -404,9 +1460,23 @@ def register_with_tracker():
         client_logger.error(f"Error registering with tracker: {str(e)}")
         return False
 
-def sync_chain():
+def sync_chain(max_age: float = None) -> bool:
     """
     Synchronize blockchain with peers.
+    Concurrent callers share one in-flight sync instead of each downloading
+    every peer's chain.
+    
+    Args:
+        max_age: Skip the sync if one finished less than this many seconds ago (optional)
+        
+    Returns:
+        bool: True if chain was updated, False otherwise
+    """
+    return bool(chain_sync.do(max_age))
+
+def sync_with_peers() -> bool:
+    """
+    Run one chain synchronization with peers.
     Updates to longest valid chain.
     
     Returns:
@@ -417,43 +1487,74 @@ def sync_chain():
     client_logger.info(f"Current chain length: {len(blockchain.chain)}")
     
     longest_chain = None
+    longest_peer = None
     max_length = len(blockchain.chain)
     max_work = blockchain.calculate_work()
     
-    for peer in peers:
-        if peer == get_base_url():
+    # Chains are streamed block by block; peers whose chain did not change
+    # since the last sync, or cannot beat ours, are skipped early.
+    # Peers in backoff are left out until their retry time.
+    outcomes = fan_out(sync_scheduler.eligible(other_peers()), stream_peer_chain,
+                       budget=CHAIN_SYNC_BUDGET)
+    for peer, outcome in outcomes.items():
+        if not outcome['ok']:
+            client_logger.warning(f"Failed to sync with {peer}: {outcome['error']}")
+            sync_scheduler.record(peer, outcome['elapsed'], error=outcome['error'])
             continue
-        try:
-            client_logger.info(f"Attempting to sync with peer: {peer}")
-            resp = requests.get(f"{peer}/chain", timeout=5)
-            data = resp.json()
-            other_chain = Blockchain.from_dict(data)
-            
-            if other_chain.is_chain_valid():
-                peer_length = len(other_chain.chain)
-                peer_work = other_chain.calculate_work()
-                client_logger.info(f"Peer {peer} chain length: {peer_length}, work: {peer_work}")
-                
-                if peer_length > max_length or (peer_length == max_length and peer_work > max_work):
-                    longest_chain = other_chain
-                    max_length = peer_length
-                    max_work = peer_work
-                    client_logger.info(f"Found longer valid chain from {peer}")
-            else:
-                client_logger.warning(f"Invalid chain received from {peer}")
-                    
-        except Exception as e:
-            client_logger.warning(f"Failed to sync with {peer}: {e}")
+        other_chain = outcome['value']
+        if other_chain is None:
+            client_logger.debug(f"Chain of {peer} unchanged or not longer")
+            sync_scheduler.record(peer, outcome['elapsed'])
             continue
+        peer_length = len(other_chain.chain)
+        peer_work = other_chain.calculate_work()
+        client_logger.info(f"Peer {peer} chain length: {peer_length}, work: {peer_work}")
+        
+        if peer_length > max_length or (peer_length == max_length and peer_work > max_work):
+            longest_chain = other_chain
+            longest_peer = peer
+            max_length = peer_length
+            max_work = peer_work
+            client_logger.info(f"Found longer valid chain from {peer}")
+        sync_scheduler.record(peer, outcome['elapsed'])
     
     if longest_chain:
-        blockchain.chain = longest_chain.chain
-        client_logger.info(f"Successfully synced blockchain. New length: {len(blockchain.chain)}")
-        return True
+        with blockchain.lock:
+            # The local chain may have grown while peers were queried
+            current_length = len(blockchain.chain)
+            better = max_length > current_length or (max_length == current_length and max_work > blockchain.calculate_work())
+            if better and blockchain.find_double_vote(longest_chain.chain) is not None:
+                client_logger.warning(f"Chain from {longest_peer} contains a double vote; not adopted")
+                session.peer_table.record_invalid(longest_peer, "chain with double vote")
+                return False
+            if better:
+                blockchain.replace_chain(longest_chain.chain)
+                sync_scheduler.supplied(longest_peer)
+                client_logger.info(f"Successfully synced blockchain. New length: {len(blockchain.chain)}")
+                return True
+        client_logger.info("Local chain advanced during sync; kept it")
+        return False
     else:
         client_logger.info("No valid longer chain found during sync")
         return False
 
+def has_block(block_hash: str) -> bool:
+    """
+    Check whether a block is in the local chain, searching from the tip.
+    
+    Args:
+        block_hash: Block hash
+        
+    Returns:
+        True if the block is in the chain
+    """
+    return any(block.hash == block_hash for block in reversed(blockchain.chain))
+
+# Single-flight wrapper shared by every sync trigger
+chain_sync = SingleFlight(sync_with_peers)
+# Decides when background syncs run and which peers they contact
+sync_scheduler = SyncScheduler(chain_sync.do, has_block)
+
 def send_heartbeat():
     """
     Send periodic heartbeat to tracker.
@@ -462,7 +1563,7 @@ def send_heartbeat():
     while True:
         time.sleep(HEARTBEAT_INTERVAL)
         try:
-            response = requests.post(
+            response = session.post(
                 f"{TRACKER_URL}/heartbeat",
                 json={
                     "address": get_base_url()
@@ -473,19 +1574,19 @@ def send_heartbeat():
                 client_logger.warning("Heartbeat failed, attempting to re-register")
                 register_with_tracker()
             else:
+                latest = set(response.json()['peers'])
+                joined = latest - peers
                 peers.clear()
-                peers.update(response.json()['peers'])
+                peers.update(latest)
+                sync_scheduler.forget(latest)
+                for peer in joined:
+                    session.peer_table.rejoined(peer)
+                if joined - {get_base_url()}:
+                    # New peers may hold a better chain
+                    sync_scheduler.trigger()
         except Exception as e:
             client_logger.error(f"Heartbeat error: {e}")
 
-def periodic_sync():
-    """
-    Periodically sync blockchain with peers.
-    """
-    while True:
-        time.sleep(10)
-        sync_chain()
-
 @app.route('/edit_block', methods=['POST'])
 def edit_block():
     """
@@ -509,18 +1610,21 @@ def edit_block():
     block_index = data['block_index']
     tx_index = data['transaction_index']
     
-    if block_index >= len(blockchain.chain):
+    chain = blockchain.chain
+    if block_index >= len(chain):
         return jsonify({'status': 'error', 'message': 'Block index out of range'}), 400
         
-    block = blockchain.chain[block_index]
+    block = chain[block_index]
     try:
-        original_tx, original_merkle = block.edit_transaction(
-            tx_index=tx_index,
-            field=data.get('field'),
-            new_value=data.get('new_value'),
-            new_transaction=data.get('new_transaction')
-        )
-        
+        # In-place edits are writes; serialize them with other writers
+        with blockchain.lock:
+            original_tx, original_merkle = block.edit_transaction(
+                tx_index=tx_index,
+                field=data.get('field'),
+                new_value=data.get('new_value'),
+                new_transaction=data.get('new_transaction')
+            )
+            blockchain.block_edited(block)
         client_logger.info(f"Block {block_index} transaction {tx_index} edited")
         return jsonify({
             'status': 'success',
@@ -539,22 +1643,25 @@ def verify_block():
     
     Query parameters:
     - block_index: int (optional, defaults to latest block)
+    - quorum: int (optional, return once this many peers agree)
     
     Returns:
         JSON response with verification results from all peers
     """
+    chain = blockchain.chain
     block_index = request.args.get('block_index', type=int)
     if block_index is None:
-        block_index = len(blockchain.chain) - 1
+        block_index = len(chain) - 1
         
-    if block_index >= len(blockchain.chain):
+    if block_index >= len(chain):
         return jsonify({'status': 'error', 'message': 'Block index out of range'}), 400
         
-    # Verify with all peers
-    peer_results = verify_with_peers(blockchain, block_index, list(peers))
+    # Verify with all peers, optionally returning once a quorum agrees
+    quorum_size = request.args.get('quorum', type=int)
+    peer_results = verify_with_peers(blockchain, block_index, other_peers(), quorum_size)
     
     # Local verification
-    block = blockchain.chain[block_index]
+    block = chain[block_index]
     local_verification = block.verify_self()
     
     # Check if hash meets difficulty requirement
@@ -593,30 +1700,31 @@ def verify_transaction():
                 'message': 'Missing required parameters: block_index and tx_index'
             }), 400
             
-        if block_index >= len(blockchain.chain):
+        chain = blockchain.chain
+        if block_index >= len(chain):
             return jsonify({
                 'status': 'error',
                 'message': f'Block index {block_index} out of range'
             }), 400
             
-        block = blockchain.chain[block_index]
+        block = chain[block_index]
         verification_result = block.verify_transaction(tx_index)
         
         # Add verification results from peers
+        def verify_on_peer(peer, timeout):
+            resp = session.get(
+                f"{peer}/verify_transaction_internal",  # Use internal endpoint
+                params={'block_index': block_index, 'tx_index': tx_index},
+                timeout=timeout
+            )
+            return resp.json() if resp.status_code == 200 else None
+        
         peer_results = {}
-        for peer in peers:
-            if peer == get_base_url():
-                continue
-            try:
-                resp = requests.get(
-                    f"{peer}/verify_transaction_internal",  # Use internal endpoint
-                    params={'block_index': block_index, 'tx_index': tx_index},
-                    timeout=5
-                )
-                if resp.status_code == 200:
-                    peer_results[peer] = resp.json()
-            except Exception as e:
-                peer_results[peer] = {'error': str(e)}
+        for peer, outcome in fan_out(other_peers(), verify_on_peer).items():
+            if not outcome['ok']:
+                peer_results[peer] = {'error': outcome['error']}
+            elif outcome['value'] is not None:
+                peer_results[peer] = outcome['value']
         
         return jsonify({
             'status': 'success',
@@ -661,13 +1769,14 @@ def verify_transaction_internal():
                 'message': 'Missing required parameters: block_index and tx_index'
             }), 400
             
-        if block_index >= len(blockchain.chain):
+        chain = blockchain.chain
+        if block_index >= len(chain):
             return jsonify({
                 'status': 'error',
                 'message': f'Block index {block_index} out of range'
             }), 400
             
-        block = blockchain.chain[block_index]
+        block = chain[block_index]
         verification_result = block.verify_transaction(tx_index)
         
         return jsonify({
@@ -713,22 +1822,24 @@ def edit_transaction_only():
     block_index = data['block_index']
     tx_index = data['transaction_index']
     
-    if block_index >= len(blockchain.chain):
+    chain = blockchain.chain
+    if block_index >= len(chain):
         return jsonify({'status': 'error', 'message': 'Block index out of range'}), 400
         
-    block = blockchain.chain[block_index]
+    block = chain[block_index]
     try:
         # Store original transaction
         original_tx = block.transactions[tx_index].copy()
         
         # Modify transaction
-        if 'field' in data and 'new_value' in data:
-            block.transactions[tx_index][data['field']] = data['new_value']
-        elif 'new_transaction' in data:
-            block.transactions[tx_index] = data['new_transaction']
-        else:
-            return jsonify({'status': 'error', 'message': 'No modification specified'}), 400
-        
+        with blockchain.lock:
+            if 'field' in data and 'new_value' in data:
+                block.transactions[tx_index][data['field']] = data['new_value']
+            elif 'new_transaction' in data:
+                block.transactions[tx_index] = data['new_transaction']
+            else:
+                return jsonify({'status': 'error', 'message': 'No modification specified'}), 400
+            blockchain.block_edited(block)
         client_logger.info(f"Block {block_index} transaction {tx_index} edited without hash recalculation")
         return jsonify({
             'status': 'success',
@@ -753,10 +1864,6 @@ def main():
     # Start HTTP server
     run_server()
     
-    # Start periodic sync thread
-    sync_thread = threading.Thread(target=periodic_sync, daemon=True)
-    sync_thread.start()
-    
     # Start heartbeat thread
     heartbeat_thread = threading.Thread(target=send_heartbeat, daemon=True)
     heartbeat_thread.start()
@@ -776,9 +1883,14 @@ def main():
                 print("Invalid JSON.")
         elif cmd == 'mine':
             try:
-                resp = requests.post(f"{get_base_url()}/mine", timeout=10).json()
-                client_logger.info("Block mined via CLI")
-                print("Mined and broadcast block:", resp.get('block'))
+                job = miner.submit('cli')
+                print(f"Mining job {job.id} queued...")
+                job.done.wait(MINE_WAIT_TIMEOUT)
+                if job.status == 'done':
+                    client_logger.info("Block mined via CLI")
+                    print("Mined and broadcast block:", job.block)
+                else:
+                    print(f"Mining job {job.id} is {job.status}: {job.error or 'still running'}")
             except Exception as e:
                 client_logger.error(f"Mining error: {e}")
                 print(f"Mining error: {e}")
@@ -793,7 +1905,7 @@ def main():
                 print(f"Block #{b['index']} hash={b['hash']}")
         elif cmd == 'set_params':
             try:
-                resp = requests.get(f"{get_base_url()}/mining_params")
+                resp = session.get(f"{get_base_url()}/mining_params")
                 current_params = resp.json()
                 client_logger.debug("Mining parameters displayed via CLI")
                 print("\nCurrent mining parameters:")
@@ -820,7 +1932,7 @@ def main():
                     new_params['time_tolerance'] = float(tolerance)
                 
                 if new_params:
-                    resp = requests.post(f"{get_base_url()}/mining_params", json=new_params)
+                    resp = session.post(f"{get_base_url()}/mining_params", json=new_params)
                     client_logger.info(f"Mining parameters updated via CLI: {new_params}")
                     print("\nUpdate result:", resp.json())
                 else:
@@ -832,7 +1944,7 @@ def main():
                 print(f"Error setting parameters: {e}")
         elif cmd == 'exit':
             try:
-                requests.post(f"{TRACKER_URL}/unregister", json={'address': get_base_url()}, timeout=5)
+                session.post(f"{TRACKER_URL}/unregister", json={'address': get_base_url()}, timeout=5)
                 client_logger.info("Client unregistered from tracker")
             except:
                 client_logger.error("Failed to unregister from tracker")
@@ -0,0 +1,400 @@
+import gzip
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.blockchain.block import Block
+
+# Media type of the binary wire format
+BINARY_MIMETYPE = 'application/x-blockchain-binary'
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+# Compression level for gzip and zlib (1 = fastest)
+COMPRESS_LEVEL = 6
+
+CHAIN_MAGIC = b'BCH1'
+BLOCK_MAGIC = b'BLK1'
+
+_BLOCK_HEADER = struct.Struct('>IdQB')  # index, timestamp, nonce, difficulty
+# Set on the difficulty byte when the timestamp is an int; the block hash
+# covers the timestamp's text form, so 1700000000 must not come back as 1700000000.0
+_INT_TIMESTAMP = 0x80
+_CHAIN_PARAMS = struct.Struct('>dId')   # target_block_time, adjustment_interval, time_tolerance
+
+_TX_VOTE = 0     # {"sender": str, "recipient": str, "amount": int}
+_TX_JSON = 1     # Any other transaction, as compact JSON
+
+class CodecError(ValueError):
+    """Raised when data cannot be encoded to or decoded from the binary format."""
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 integer."""
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 integer; returns (value, new position)."""
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise CodecError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def _write_bytes(out: bytearray, value: bytes) -> None:
+    _write_varint(out, len(value))
+    out += value
+
+def _read_bytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    length, pos = _read_varint(data, pos)
+    if pos + length > len(data):
+        raise CodecError("truncated field")
+    return data[pos:pos + length], pos + length
+
+def _write_hash(out: bytearray, value: str) -> None:
+    """Append a 64-character hex hash as 32 raw bytes."""
+    if len(value) != 64:
+        raise CodecError(f"hash must be 64 hex characters: {value!r}")
+    try:
+        out += bytes.fromhex(value)
+    except ValueError:
+        raise CodecError(f"hash is not hex: {value!r}")
+
+def _read_hash(data: bytes, pos: int) -> Tuple[str, int]:
+    if pos + 32 > len(data):
+        raise CodecError("truncated hash")
+    return data[pos:pos + 32].hex(), pos + 32
+
+def _is_vote(tx: Dict[str, Any]) -> bool:
+    """Check whether a transaction fits the compact vote layout."""
+    return (
+        len(tx) == 3
+        and isinstance(tx.get('sender'), str)
+        and isinstance(tx.get('recipient'), str)
+        and type(tx.get('amount')) is int
+        and tx['amount'] >= 0
+    )
+
+def encode_transaction(out: bytearray, tx: Dict[str, Any]) -> None:
+    """
+    Append one transaction to a buffer.
+
+    Args:
+        out: Output buffer
+        tx: Transaction dictionary
+    """
+    if _is_vote(tx):
+        out.append(_TX_VOTE)
+        _write_bytes(out, tx['sender'].encode())
+        _write_bytes(out, tx['recipient'].encode())
+        _write_varint(out, tx['amount'])
+    else:
+        out.append(_TX_JSON)
+        _write_bytes(out, json.dumps(tx, separators=(',', ':')).encode())
+
+def decode_transaction(data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Read one transaction.
+
+    Args:
+        data: Encoded bytes
+        pos: Read position
+
+    Returns:
+        tuple: (transaction dictionary, new position)
+    """
+    if pos >= len(data):
+        raise CodecError("truncated transaction")
+    tag = data[pos]
+    pos += 1
+    if tag == _TX_VOTE:
+        sender, pos = _read_bytes(data, pos)
+        recipient, pos = _read_bytes(data, pos)
+        amount, pos = _read_varint(data, pos)
+        return {'sender': sender.decode(), 'recipient': recipient.decode(), 'amount': amount}, pos
+    if tag == _TX_JSON:
+        raw, pos = _read_bytes(data, pos)
+        return json.loads(raw), pos
+    raise CodecError(f"unknown transaction tag {tag}")
+
+def _encode_block_uncached(block: Block) -> bytes:
+    timestamp = block.timestamp
+    flags = 0
+    if type(timestamp) is int:
+        if float(timestamp) != timestamp:
+            raise CodecError(f"integer timestamp too large: {timestamp}")
+        flags = _INT_TIMESTAMP
+    elif type(timestamp) is not float:
+        raise CodecError(f"timestamp must be int or float: {timestamp!r}")
+    if not 0 <= block.difficulty < _INT_TIMESTAMP:
+        raise CodecError(f"difficulty out of range: {block.difficulty}")
+    out = bytearray()
+    out += _BLOCK_HEADER.pack(block.index, timestamp, block.nonce, block.difficulty | flags)
+    _write_hash(out, block.previous_hash)
+    _write_hash(out, block.hash)
+    _write_hash(out, block.merkle_root)
+    _write_varint(out, len(block.transactions))
+    for tx in block.transactions:
+        encode_transaction(out, tx)
+    # The Merkle tree is only sent when it cannot be rebuilt from the
+    # transactions (a tampered block), so verification still sees it
+    if block.merkle_tree == block._build_merkle_tree():
+        out.append(0)
+    else:
+        out.append(1)
+        _write_varint(out, len(block.merkle_tree))
+        for level in block.merkle_tree:
+            _write_varint(out, len(level))
+            for node in level:
+                _write_hash(out, node)
+    return bytes(out)
+
+def encode_block(block: Block) -> bytes:
+    """
+    Encode a block in the binary format (cached per block hash).
+
+    Args:
+        block: Block to encode
+
+    Returns:
+        Encoded bytes
+    """
+    return block.cached('binary', lambda: _encode_block_uncached(block))
+
+def decode_block(data: bytes, pos: int = 0) -> Tuple[Block, int]:
+    """
+    Decode a block.
+
+    Args:
+        data: Encoded bytes
+        pos: Read position
+
+    Returns:
+        tuple: (block, new position)
+    """
+    if pos + _BLOCK_HEADER.size > len(data):
+        raise CodecError("truncated block header")
+    index, timestamp, nonce, difficulty = _BLOCK_HEADER.unpack_from(data, pos)
+    pos += _BLOCK_HEADER.size
+    if difficulty & _INT_TIMESTAMP:
+        timestamp = int(timestamp)
+        difficulty &= ~_INT_TIMESTAMP
+    previous_hash, pos = _read_hash(data, pos)
+    block_hash, pos = _read_hash(data, pos)
+    merkle_root, pos = _read_hash(data, pos)
+    count, pos = _read_varint(data, pos)
+    transactions = []
+    for _ in range(count):
+        tx, pos = decode_transaction(data, pos)
+        transactions.append(tx)
+
+    # Bypass __init__, which would recompute the hash we already have
+    block = Block.__new__(Block)
+    block.index = index
+    block.transactions = transactions
+    block.timestamp = timestamp
+    block.previous_hash = previous_hash
+    block.difficulty = difficulty
+    block.nonce = nonce
+    block.hash = block_hash
+    block.merkle_root = merkle_root
+    block._cache = {}
+
+    if pos >= len(data):
+        raise CodecError("truncated block")
+    has_tree = data[pos]
+    pos += 1
+    if has_tree:
+        levels, pos = _read_varint(data, pos)
+        tree = []
+        for _ in range(levels):
+            width, pos = _read_varint(data, pos)
+            level = []
+            for _ in range(width):
+                node, pos = _read_hash(data, pos)
+                level.append(node)
+            tree.append(level)
+        block.merkle_tree = tree
+    else:
+        block.merkle_tree = block._build_merkle_tree()
+    return block, pos
+
+def encode_block_message(block: Block) -> bytes:
+    """Encode a standalone block message (e.g. a POST /new_block body)."""
+    return BLOCK_MAGIC + encode_block(block)
+
+def decode_block_message(data: bytes) -> Block:
+    """Decode a standalone block message."""
+    if not data.startswith(BLOCK_MAGIC):
+        raise CodecError("not a binary block message")
+    block, _ = decode_block(data, len(BLOCK_MAGIC))
+    return block
+
+def encode_chain(chain: List[Block], difficulty: int,
+                 pending: Optional[List[Dict[str, Any]]] = None,
+                 params: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Encode a chain, optionally with the pending pool and mining parameters.
+
+    Args:
+        chain: Blocks, oldest first
+        difficulty: Chain difficulty
+        pending: Pending transactions (optional)
+        params: Dict with target_block_time, adjustment_interval and
+                time_tolerance; required when pending is given
+
+    Returns:
+        Encoded bytes
+    """
+    out = bytearray(CHAIN_MAGIC)
+    out.append(difficulty)
+    out.append(1 if pending is not None else 0)
+    _write_varint(out, len(chain))
+    for block in chain:
+        _write_bytes(out, encode_block(block))
+    if pending is not None:
+        _write_varint(out, len(pending))
+        for tx in pending:
+            encode_transaction(out, tx)
+        out += _CHAIN_PARAMS.pack(params['target_block_time'], params['adjustment_interval'],
+                                  params['time_tolerance'])
+    return bytes(out)
+
+def decode_chain(data: bytes) -> Dict[str, Any]:
+    """
+    Decode a chain into the dictionary layout of Blockchain.to_dict(),
+    with Block objects instead of block dictionaries in "chain".
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Dict with "chain", "difficulty" and, if present, pending transactions and parameters
+    """
+    if not data.startswith(CHAIN_MAGIC) or len(data) < len(CHAIN_MAGIC) + 2:
+        raise CodecError("not a binary chain")
+    pos = len(CHAIN_MAGIC)
+    difficulty = data[pos]
+    has_pending = data[pos + 1]
+    pos += 2
+    count, pos = _read_varint(data, pos)
+    chain = []
+    for _ in range(count):
+        raw, pos = _read_bytes(data, pos)
+        block, _ = decode_block(raw)
+        chain.append(block)
+    result = {'chain': chain, 'difficulty': difficulty}
+    if has_pending:
+        pending_count, pos = _read_varint(data, pos)
+        pending = []
+        for _ in range(pending_count):
+            tx, pos = decode_transaction(data, pos)
+            pending.append(tx)
+        if pos + _CHAIN_PARAMS.size > len(data):
+            raise CodecError("truncated chain parameters")
+        target, interval, tolerance = _CHAIN_PARAMS.unpack_from(data, pos)
+        result.update({
+            'pending_transactions': pending,
+            'target_block_time': target,
+            'adjustment_interval': interval,
+            'time_tolerance': tolerance
+        })
+    return result
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Get the entity tag of a compressed representation.
+    Each content encoding is a different representation, so it gets its own tag.
+
+    Args:
+        etag: Entity tag of the uncompressed body (unquoted)
+        encoding: 'gzip' or 'deflate'
+
+    Returns:
+        Entity tag for the compressed body
+    """
+    return f"{etag}-{encoding}"
+
+def accepts_binary(accept_header: Optional[str]) -> bool:
+    """
+    Check whether an Accept header asks for the binary format.
+
+    Args:
+        accept_header: Value of the Accept header
+
+    Returns:
+        True if the binary media type is listed
+    """
+    return bool(accept_header) and BINARY_MIMETYPE in accept_header
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a compression method from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding header
+
+    Returns:
+        'gzip', 'deflate' or None
+    """
+    if not accept_encoding:
+        return None
+    offered = {}
+    for item in accept_encoding.split(','):
+        name, _, q = item.strip().partition(';q=')
+        try:
+            offered[name.strip().lower()] = float(q) if q else 1.0
+        except ValueError:
+            continue
+    for name in ('gzip', 'deflate'):
+        if offered.get(name, 0) > 0:
+            return name
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data with the given content encoding.
+
+    Args:
+        data: Raw bytes
+        encoding: 'gzip' or 'deflate' (zlib stream)
+
+    Returns:
+        Compressed bytes
+    """
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+    if encoding == 'deflate':
+        return zlib.compress(data, COMPRESS_LEVEL)
+    raise CodecError(f"unsupported encoding {encoding}")
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Undo a content encoding.
+
+    Args:
+        data: Possibly compressed bytes
+        encoding: Value of the Content-Encoding header (or None)
+
+    Returns:
+        Raw bytes
+    """
+    if not encoding or encoding == 'identity':
+        return data
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'deflate':
+        return zlib.decompress(data)
+    raise CodecError(f"unsupported encoding {encoding}")
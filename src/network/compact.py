@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.blockchain.block import Block, tx_hash
+
+# Hex characters of the transaction hash used as short ID (48 bits)
+SHORT_ID_LEN = 12
+
+def short_id(txid: str) -> str:
+    """
+    Get the short ID of a transaction.
+
+    Args:
+        txid: Full transaction hash
+
+    Returns:
+        Short transaction ID
+    """
+    return txid[:SHORT_ID_LEN]
+
+def make_compact(block: Block) -> Dict[str, Any]:
+    """
+    Build a compact block: the header plus short transaction IDs.
+    The Merkle tree is omitted; the receiver rebuilds it from the transactions.
+
+    Args:
+        block: Block to compact
+
+    Returns:
+        Compact block dictionary
+    """
+    return {
+        'header': block.header(),
+        'short_ids': [short_id(tx_hash(tx)) for tx in block.transactions]
+    }
+
+def match_mempool(compact: Dict[str, Any], pending: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+    """
+    Fill a compact block's transactions from the local pending pool.
+
+    Args:
+        compact: Compact block dictionary
+        pending: Local pending transactions
+
+    Returns:
+        tuple: (transactions with None where missing, indexes of missing transactions)
+    """
+    by_short_id = {short_id(tx_hash(tx)): tx for tx in pending}
+    transactions = [by_short_id.get(sid) for sid in compact['short_ids']]
+    missing = [i for i, tx in enumerate(transactions) if tx is None]
+    return transactions, missing
+
+def build_block(compact: Dict[str, Any], transactions: List[Dict[str, Any]]) -> Block:
+    """
+    Rebuild a full block from a compact header and its transactions.
+
+    Args:
+        compact: Compact block dictionary
+        transactions: Complete transaction list in block order
+
+    Returns:
+        Reconstructed block
+
+    Raises:
+        ValueError: If the rebuilt Merkle root does not match the header
+                    (a short ID collision or a wrong transaction)
+    """
+    header = compact['header']
+    block = Block(
+        index=header['index'],
+        transactions=transactions,
+        previous_hash=header['previous_hash'],
+        timestamp=header['timestamp'],
+        difficulty=header.get('difficulty', 2)
+    )
+    if block.merkle_root != header['merkle_root']:
+        raise ValueError("Merkle root mismatch after reconstruction")
+    block.nonce = header['nonce']
+    block.hash = header['hash']
+    return block
@@ -0,0 +1,128 @@
+import json
+import time
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Number of recent events kept for reconnecting and long-polling clients
+HISTORY_SIZE = 1000
+# Seconds between merged publications of high-frequency state (e.g. mempool size)
+COALESCE_INTERVAL = 0.5
+# Seconds of silence after which an SSE stream sends a keep-alive comment
+KEEPALIVE_INTERVAL = 15
+
+class EventBus:
+    """
+    In-process publish/subscribe of node events with a bounded history.
+    Every event gets an increasing ID; readers wait for events after the
+    last ID they saw, so SSE streams and long-poll requests share one buffer
+    and a reconnecting client resumes where it left off.
+    """
+
+    def __init__(self, history: int = HISTORY_SIZE, coalesce_interval: float = COALESCE_INTERVAL):
+        """
+        Initialize an empty bus.
+
+        Args:
+            history: Number of events retained
+            coalesce_interval: Seconds between publications of coalesced state
+        """
+        self.coalesce_interval = coalesce_interval
+        self._events = deque(maxlen=history)
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._latest: Dict[str, Any] = {}
+        self._flusher = None
+
+    def publish(self, kind: str, data: Dict[str, Any]) -> int:
+        """
+        Publish an event to all readers.
+
+        Args:
+            kind: Event type
+            data: JSON-serializable payload
+
+        Returns:
+            Event ID
+        """
+        with self._cond:
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append({'id': event_id, 'type': kind, 'time': time.time(), 'data': data})
+            self._cond.notify_all()
+            return event_id
+
+    def publish_latest(self, kind: str, data: Dict[str, Any]) -> None:
+        """
+        Publish state that changes often; only the latest value per interval is sent.
+
+        Args:
+            kind: Event type
+            data: JSON-serializable payload
+        """
+        with self._cond:
+            self._latest[kind] = data
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='events', daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """Publish coalesced state once per interval."""
+        while True:
+            time.sleep(self.coalesce_interval)
+            with self._cond:
+                latest, self._latest = self._latest, {}
+            for kind, data in latest.items():
+                self.publish(kind, data)
+
+    def last_id(self) -> int:
+        """Get the ID of the newest event (0 if none)."""
+        with self._cond:
+            return self._next_id - 1
+
+    def events_after(self, last_id: int, kinds: Optional[Iterable[str]] = None,
+                     timeout: float = 0) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get events newer than an ID, waiting up to a timeout for the first one.
+
+        Args:
+            last_id: ID of the last event the reader has seen
+            kinds: Event types of interest (all if omitted)
+            timeout: Seconds to wait if there is nothing new
+
+        Returns:
+            tuple: (matching events oldest first, whether events after
+                    last_id were already evicted from the history)
+        """
+        kinds = set(kinds) if kinds else None
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                missed = bool(self._events) and self._events[0]['id'] > last_id + 1
+                events = [e for e in self._events
+                          if e['id'] > last_id and (kinds is None or e['type'] in kinds)]
+                if events or missed:
+                    return events, missed
+                # Skip past events of other types so the reader does not rescan them
+                last_id = max(last_id, self._next_id - 1)
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return [], False
+                self._cond.wait(timeout=remaining)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Format an event as a Server-Sent Events message.
+
+    Args:
+        event: Event with 'type', 'data' and optionally 'id'
+
+    Returns:
+        SSE message text
+    """
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event['data'], separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
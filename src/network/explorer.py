@@ -0,0 +1,170 @@
+import time
+from typing import Optional, Tuple
+
+from flask import jsonify, request
+
+# Transactions per page when no limit is given
+DEFAULT_PAGE_SIZE = 50
+# Largest page a single request may ask for
+MAX_PAGE_SIZE = 1000
+
+def page_args() -> Tuple[Optional[Tuple[int, int, bool]], Optional[str]]:
+    """
+    Read the paging parameters of the current request.
+
+    Returns:
+        tuple: ((offset, limit, descending), None), or (None, error message)
+    """
+    # Unparseable values come back as None
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    order = request.args.get('order', 'asc')
+    if offset is None or offset < 0:
+        return None, 'offset must be a non-negative integer'
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        return None, f'limit must be an integer between 1 and {MAX_PAGE_SIZE}'
+    if order not in ('asc', 'desc'):
+        return None, "Invalid order, expected 'asc' or 'desc'"
+    return (offset, limit, order == 'desc'), None
+
+def setup_explorer_routes(app, blockchain, client_logger) -> None:
+    """
+    Setup block explorer query routes for the Flask app.
+    Queries are answered from the indexes the blockchain maintains
+    (Blockchain.chain_index), so no request scans or transfers the chain.
+
+    Args:
+        app: Flask application instance
+        blockchain: Blockchain instance
+        client_logger: Logger instance
+    """
+    index = blockchain.chain_index
+
+    def bad_request(message: str):
+        return jsonify({'status': 'error', 'message': message}), 400
+
+    def page_response(transactions, total, offset, limit, descending, **query):
+        return jsonify({
+            'status': 'success',
+            'data': dict(
+                query,
+                transactions=transactions,
+                total=total,
+                offset=offset,
+                limit=limit,
+                order='desc' if descending else 'asc',
+                last_updated=time.time()
+            )
+        })
+
+    @app.route('/explorer/block/<block_hash>', methods=['GET'])
+    def explorer_block(block_hash):
+        """
+        Get a block of the current chain by hash.
+
+        Args:
+            block_hash: Block hash
+
+        Returns:
+            JSON response with the block, its height and confirmations
+        """
+        found = index.block_by_hash(block_hash)
+        if found is None:
+            return jsonify({'status': 'error', 'message': 'Block not found in the current chain'}), 404
+        block, length = found
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'block': block.to_dict(),
+                'height': block.index,
+                'confirmations': length - block.index
+            }
+        })
+
+    def address_transactions(field: str, address: str):
+        paging, error = page_args()
+        if error:
+            return bad_request(error)
+        offset, limit, descending = paging
+        try:
+            transactions, total = index.transactions_by(field, address, offset, limit, descending)
+            return page_response(transactions, total, offset, limit, descending, **{field: address})
+        except Exception as e:
+            client_logger.error(f"Failed to query transactions by {field}: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': f'Failed to query transactions by {field}: {str(e)}'
+            }), 500
+
+    @app.route('/explorer/transactions/sender/<sender>', methods=['GET'])
+    def explorer_sender(sender):
+        """
+        Get transactions sent by an address.
+
+        Query parameters:
+        - offset: int  # Transactions to skip (default 0)
+        - limit: int  # Page size (default 50, at most 1000)
+        - order: str  # 'asc' (chain order, default) or 'desc' (newest first)
+
+        Returns:
+            JSON response with one page of transactions and the total count
+        """
+        return address_transactions('sender', sender)
+
+    @app.route('/explorer/transactions/recipient/<recipient>', methods=['GET'])
+    def explorer_recipient(recipient):
+        """
+        Get transactions received by an address.
+
+        Query parameters:
+        - offset: int  # Transactions to skip (default 0)
+        - limit: int  # Page size (default 50, at most 1000)
+        - order: str  # 'asc' (chain order, default) or 'desc' (newest first)
+
+        Returns:
+            JSON response with one page of transactions and the total count
+        """
+        return address_transactions('recipient', recipient)
+
+    @app.route('/explorer/transactions', methods=['GET'])
+    def explorer_time_range():
+        """
+        Get transactions in blocks within a timestamp range.
+
+        Query parameters:
+        - start: float  # Range start timestamp, inclusive (optional)
+        - end: float  # Range end timestamp, exclusive (optional)
+        - offset: int  # Transactions to skip (default 0)
+        - limit: int  # Page size (default 50, at most 1000)
+        - order: str  # 'asc' (oldest first, default) or 'desc'
+
+        Returns:
+            JSON response with one page of transactions and the total count
+        """
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        if ('start' in request.args and start is None) or ('end' in request.args and end is None):
+            return bad_request('start and end must be Unix timestamps')
+        paging, error = page_args()
+        if error:
+            return bad_request(error)
+        offset, limit, descending = paging
+        try:
+            transactions, total = index.transactions_between(start, end, offset, limit, descending)
+            return page_response(transactions, total, offset, limit, descending, start=start, end=end)
+        except Exception as e:
+            client_logger.error(f"Failed to query transactions by time: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': f'Failed to query transactions by time: {str(e)}'
+            }), 500
+
+    @app.route('/explorer/stats', methods=['GET'])
+    def explorer_stats():
+        """
+        Get explorer index sizes.
+
+        Returns:
+            JSON response with indexed blocks, transactions and addresses
+        """
+        return jsonify({'status': 'success', 'data': index.to_dict()})
@@ -0,0 +1,117 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Default per-peer request timeout in seconds
+CALL_TIMEOUT = 5
+# Default overall time budget for one fan-out in seconds
+FANOUT_BUDGET = 8
+# Upper bound on concurrent outbound peer requests
+MAX_WORKERS = 32
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazily create the shared worker pool used for all fan-outs."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fanout')
+        return _executor
+
+def fan_out(peers: Iterable[str], call: Callable[[str, float], Any],
+            timeout: float = CALL_TIMEOUT, budget: float = FANOUT_BUDGET,
+            until: Optional[Callable[[Dict[str, Dict[str, Any]]], bool]] = None,
+            concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run a request against many peers concurrently.
+
+    Args:
+        peers: Peer URLs to contact
+        call: Function taking (peer, timeout) and returning the peer's result
+        timeout: Deadline for a single peer call in seconds
+        budget: Overall deadline for the whole fan-out in seconds
+        until: Optional predicate over the results collected so far;
+               returning True stops waiting for the remaining peers
+        concurrency: Maximum peers contacted at once (optional); peers are
+                     started in the given order, so pass them best first
+
+    Returns:
+        Dict mapping peer URL to {'ok': True, 'value': ..., 'elapsed': float}
+        or {'ok': False, 'error': str, 'elapsed': float}. Peers that did not
+        answer before the budget ran out (or before `until` was satisfied)
+        are reported with error 'timeout' or 'skipped'.
+    """
+    peers = list(dict.fromkeys(peers))
+    results = {}
+    if not peers:
+        return results
+
+    start = time.time()
+    deadline = start + budget
+    executor = _get_executor()
+
+    def run(peer):
+        call_start = time.time()
+        per_call = max(0.1, min(timeout, deadline - call_start))
+        try:
+            return {'ok': True, 'value': call(peer, per_call), 'elapsed': time.time() - call_start}
+        except Exception as e:
+            return {'ok': False, 'error': str(e), 'elapsed': time.time() - call_start}
+
+    waiting = list(reversed(peers))
+    futures = {}
+    pending = set()
+    stopped = False
+
+    def launch():
+        while waiting and (concurrency is None or len(pending) < concurrency):
+            peer = waiting.pop()
+            future = executor.submit(run, peer)
+            futures[future] = peer
+            pending.add(future)
+
+    launch()
+    while pending:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[futures[future]] = future.result()
+        if until is not None and until(results):
+            stopped = True
+            break
+        launch()
+
+    # Whatever is still running keeps its own per-call timeout; we just stop waiting
+    for future in pending:
+        future.cancel()
+        results[futures[future]] = {
+            'ok': False,
+            'error': 'skipped' if stopped else 'timeout',
+            'elapsed': time.time() - start
+        }
+    for peer in waiting:
+        results[peer] = {'ok': False, 'error': 'skipped' if stopped else 'timeout', 'elapsed': 0.0}
+
+    return results
+
+def quorum(count: int, predicate: Callable[[Any], bool]) -> Callable[[Dict[str, Dict[str, Any]]], bool]:
+    """
+    Build an `until` predicate that is satisfied once `count` peers
+    returned a value for which `predicate` holds.
+
+    Args:
+        count: Number of agreeing peers required
+        predicate: Test applied to each successful peer value
+
+    Returns:
+        Predicate suitable for fan_out(until=...)
+    """
+    def reached(results):
+        agreeing = sum(1 for r in results.values() if r['ok'] and predicate(r['value']))
+        return agreeing >= count
+    return reached
@@ -0,0 +1,182 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.network.fanout import fan_out
+
+# Seconds to collect transaction IDs before announcing them as one batch
+FLUSH_INTERVAL = 0.5
+# Maximum IDs in a single inventory message
+MAX_BATCH = 1000
+# Number of recently seen IDs remembered per inventory type
+SEEN_CAPACITY = 100000
+
+class SeenCache:
+    """
+    Bounded set of recently seen IDs with least-recently-used eviction.
+    """
+
+    def __init__(self, capacity: int = SEEN_CAPACITY):
+        """
+        Initialize cache.
+
+        Args:
+            capacity: Maximum number of IDs remembered
+        """
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str) -> bool:
+        """
+        Mark an ID as seen.
+
+        Args:
+            key: ID to add
+
+        Returns:
+            True if the ID was not seen before
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return False
+            self._items[key] = None
+            if len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+            return True
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+class InventoryGossip:
+    """
+    Inventory-based gossip (inv/getdata).
+    Nodes announce batches of IDs; peers answer with the IDs they lack and
+    only those objects are transferred. Seen-sets stop rebroadcast storms.
+    """
+
+    def __init__(self, send_inv: Callable[[str, str, List[str], float], int],
+                 peers: Callable[[], Iterable[str]], logger=None,
+                 flush_interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH,
+                 seen_capacity: int = SEEN_CAPACITY):
+        """
+        Initialize gossip.
+
+        Args:
+            send_inv: Function taking (peer, kind, ids, timeout); announces the
+                      IDs, transfers whatever the peer wants and returns the
+                      number of objects sent
+            peers: Function returning the current peer URLs
+            logger: Logger instance (optional)
+            flush_interval: Seconds between batched announcements
+            max_batch: Maximum IDs per announcement
+            seen_capacity: Number of IDs remembered per inventory type
+        """
+        self.send_inv = send_inv
+        self.peers = peers
+        self.logger = logger
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.seen = {
+            'tx': SeenCache(seen_capacity),
+            'block': SeenCache(seen_capacity)
+        }
+        self._outbox: Dict[str, Dict[str, Optional[str]]] = {'tx': OrderedDict(), 'block': OrderedDict()}
+        self._cond = threading.Condition()
+        self._started = False
+        self.stats = {'announced': 0, 'sent': 0, 'fresh': 0, 'duplicates': 0}
+
+    def start(self) -> None:
+        """Start the announcement thread (idempotent)."""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._flush_loop, name='gossip', daemon=True).start()
+
+    def mark_seen(self, kind: str, ids: Iterable[str]) -> List[str]:
+        """
+        Record IDs as seen.
+
+        Args:
+            kind: Inventory type ('tx' or 'block')
+            ids: IDs to record
+
+        Returns:
+            The IDs that were new
+        """
+        fresh = [i for i in ids if self.seen[kind].add(i)]
+        self.stats['fresh'] += len(fresh)
+        return fresh
+
+    def wanted(self, kind: str, ids: Iterable[str]) -> List[str]:
+        """
+        Filter an announcement down to the IDs this node lacks.
+
+        Args:
+            kind: Inventory type ('tx' or 'block')
+            ids: Announced IDs
+
+        Returns:
+            IDs not seen before
+        """
+        ids = list(ids)
+        want = [i for i in ids if i not in self.seen[kind]]
+        self.stats['duplicates'] += len(ids) - len(want)
+        return want
+
+    def announce(self, kind: str, ids: Iterable[str], origin: str = None) -> None:
+        """
+        Queue IDs for announcement to all peers except their origin.
+
+        Args:
+            kind: Inventory type ('tx' or 'block')
+            ids: IDs to announce
+            origin: Peer the objects came from (optional)
+        """
+        self.start()
+        with self._cond:
+            outbox = self._outbox[kind]
+            for i in ids:
+                outbox.setdefault(i, origin)
+            if sum(len(o) for o in self._outbox.values()) >= self.max_batch:
+                self._cond.notify()
+
+    def _flush_loop(self) -> None:
+        """Send queued announcements every flush interval."""
+        while True:
+            with self._cond:
+                self._cond.wait(timeout=self.flush_interval)
+                batches = {kind: list(outbox.items()) for kind, outbox in self._outbox.items() if outbox}
+                for kind in batches:
+                    self._outbox[kind] = OrderedDict()
+            for kind, items in batches.items():
+                for i in range(0, len(items), self.max_batch):
+                    self._flush(kind, items[i:i + self.max_batch])
+
+    def _flush(self, kind: str, items: List) -> None:
+        """Announce one batch to every peer, skipping each ID's origin."""
+        def announce_to(peer, timeout):
+            ids = [i for i, origin in items if origin != peer]
+            if not ids:
+                return 0
+            return self.send_inv(peer, kind, ids, timeout)
+
+        start = time.time()
+        outcomes = fan_out(self.peers(), announce_to)
+        sent = sum(o['value'] for o in outcomes.values() if o['ok'])
+        self.stats['announced'] += len(items)
+        self.stats['sent'] += sent
+        if self.logger:
+            failed = [peer for peer, o in outcomes.items() if not o['ok']]
+            self.logger.debug(f"Announced {len(items)} {kind} IDs to {len(outcomes)} peers, "
+                              f"sent {sent} objects in {time.time() - start:.3f}s")
+            for peer in failed:
+                self.logger.warning(f"Failed to announce inventory to {peer}: {outcomes[peer]['error']}")
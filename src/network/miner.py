@@ -0,0 +1,246 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+# Finished jobs remembered for status queries; older ones are forgotten
+MAX_JOBS = 256
+# Auto-mine seals a block once this many transactions are pending...
+AUTO_MIN_TRANSACTIONS = 10
+# ...or once the oldest pending transaction has waited this many seconds
+AUTO_MAX_AGE = 5.0
+
+class MiningJob:
+    """One request to mine a block."""
+
+    def __init__(self, source: str, options: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:16]
+        self.source = source
+        self.options = options
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.block = None
+        self.error = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'source': self.source,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'duration': self.finished - self.started if self.finished and self.started else None,
+            'block': self.block,
+            'error': self.error
+        }
+
+class MiningService:
+    """
+    Background miner owned by the node.
+    Jobs are queued and run one at a time on a dedicated thread, so HTTP
+    requests return immediately. In auto mode the service queues a job by
+    itself whenever the pending pool is large enough or old enough.
+    """
+
+    def __init__(self, mine: Callable[[Dict[str, Any]], Dict[str, Any]], logger=None,
+                 auto: bool = False, min_transactions: int = AUTO_MIN_TRANSACTIONS,
+                 max_age: float = AUTO_MAX_AGE):
+        """
+        Initialize service.
+
+        Args:
+            mine: Function taking job options, mining one block and returning
+                  it as a dictionary; raises ValueError if there is nothing to mine
+            logger: Logger instance (optional)
+            auto: Whether auto-mine mode starts enabled
+            min_transactions: Auto-mine pending pool size threshold
+            max_age: Auto-mine pending transaction age threshold in seconds
+        """
+        self.mine = mine
+        self.logger = logger
+        self.auto = auto
+        self.min_transactions = min_transactions
+        self.max_age = max_age
+        self._queue = deque()
+        self._jobs: Dict[str, MiningJob] = OrderedDict()
+        self._running: Optional[MiningJob] = None
+        self._pending_size = 0
+        self._pending_since = None
+        self._auto_retry_at = 0.0
+        self._cond = threading.Condition()
+        self._started = False
+        self.stats = {'submitted': 0, 'auto_submitted': 0, 'mined': 0, 'failed': 0}
+
+    def start(self) -> None:
+        """Start the mining thread (idempotent)."""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._worker, name='miner', daemon=True).start()
+
+    def submit(self, source: str = 'api', options: Dict[str, Any] = None) -> MiningJob:
+        """
+        Queue a mining job.
+        While a job is still waiting in the queue, further requests join it
+        instead of queueing another one, since it will mine everything pending.
+
+        Args:
+            source: Who asked for the job ('api', 'cli' or 'auto')
+            options: Options passed to the mine function
+
+        Returns:
+            The queued job
+        """
+        self.start()
+        with self._cond:
+            if self._queue:
+                return self._queue[-1]
+            job = self._enqueue(source, options or {})
+            self._cond.notify_all()
+            return job
+
+    def _enqueue(self, source: str, options: Dict[str, Any]) -> MiningJob:
+        """Create and queue a job, forgetting the oldest finished ones. Caller holds the condition."""
+        job = MiningJob(source, options)
+        self._queue.append(job)
+        self._jobs[job.id] = job
+        while len(self._jobs) > MAX_JOBS:
+            oldest = next(iter(self._jobs))
+            if not self._jobs[oldest].done.is_set():
+                break
+            del self._jobs[oldest]
+        self.stats['auto_submitted' if source == 'auto' else 'submitted'] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[MiningJob]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job, or None if unknown or forgotten
+        """
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def pending_changed(self, size: int) -> None:
+        """
+        Track the pending pool for auto-mine mode.
+
+        Args:
+            size: Current number of pending transactions
+        """
+        with self._cond:
+            if size and not self._pending_size:
+                self._pending_since = time.time()
+            elif not size:
+                self._pending_since = None
+            self._pending_size = size
+            self._cond.notify_all()
+
+    def configure(self, auto: bool = None, min_transactions: int = None, max_age: float = None) -> None:
+        """
+        Change auto-mine settings.
+
+        Args:
+            auto: Enable or disable auto-mine mode
+            min_transactions: Pending pool size threshold
+            max_age: Pending transaction age threshold in seconds
+        """
+        with self._cond:
+            if auto is not None:
+                self.auto = auto
+            if min_transactions is not None:
+                self.min_transactions = min_transactions
+            if max_age is not None:
+                self.max_age = max_age
+            self._cond.notify_all()
+        if self.auto:
+            self.start()
+
+    def _auto_due(self, now: float) -> Optional[float]:
+        """
+        Check the auto-mine thresholds. Caller holds the condition.
+
+        Returns:
+            0 if a job should be queued now, seconds until the age threshold
+            is reached, or None if auto mode has nothing to wait for
+        """
+        if not self.auto or not self._pending_size or self._queue or self._running:
+            return None
+        if now < self._auto_retry_at:
+            return self._auto_retry_at - now
+        if self._pending_size >= self.min_transactions:
+            return 0
+        return max(0.0, self._pending_since + self.max_age - now)
+
+    def _worker(self) -> None:
+        """Run queued jobs and auto-mine jobs until the process exits."""
+        while True:
+            with self._cond:
+                while not self._queue:
+                    due = self._auto_due(time.time())
+                    if due == 0:
+                        break
+                    self._cond.wait(timeout=due)
+                if not self._queue:
+                    self._enqueue('auto', {})
+                job = self._queue.popleft()
+                self._running = job
+                job.status = 'running'
+                job.started = time.time()
+
+            try:
+                job.block = self.mine(job.options)
+                job.status = 'done'
+            except ValueError as e:
+                job.error = str(e)
+                job.status = 'failed'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+                if self.logger:
+                    self.logger.error(f"Mining job {job.id} failed: {e}")
+
+            with self._cond:
+                job.finished = time.time()
+                self._running = None
+                self.stats['mined' if job.status == 'done' else 'failed'] += 1
+                if self._pending_size:
+                    # Whatever is still pending arrived after this job took its snapshot
+                    self._pending_since = max(self._pending_since or 0, job.started)
+                if job.status == 'failed' and job.source == 'auto':
+                    # Do not retry a failing auto job in a tight loop
+                    self._auto_retry_at = job.finished + self.max_age
+                self._cond.notify_all()
+            job.done.set()
+            if self.logger and job.status == 'done':
+                self.logger.info(f"Mining job {job.id} ({job.source}) sealed block #{job.block['index']} "
+                                 f"in {job.finished - job.started:.2f}s")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get service state.
+
+        Returns:
+            Dict with auto-mine settings, queue state and counters
+        """
+        with self._cond:
+            return {
+                'auto': self.auto,
+                'min_transactions': self.min_transactions,
+                'max_age': self.max_age,
+                'queued': len(self._queue),
+                'running': self._running.id if self._running else None,
+                'pending_transactions': self._pending_size,
+                'pending_age': time.time() - self._pending_since if self._pending_since else None,
+                'stats': dict(self.stats)
+            }
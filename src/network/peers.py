@@ -0,0 +1,216 @@
+import time
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+# Weight of the newest sample in the moving averages of RTT and throughput
+EWMA_ALPHA = 0.3
+# RTT in seconds assumed for peers without samples, so new peers get tried
+DEFAULT_RTT = 0.2
+# Consecutive failed requests after which a peer is dropped
+MAX_FAILURES = 5
+# Invalid-data incidents after which a peer is dropped
+MAX_INVALID = 3
+# Seconds a dropped peer is ignored before it is given another chance
+DROP_PERIOD = 600
+# Responses smaller than this are too short to measure throughput
+MIN_THROUGHPUT_BYTES = 16 * 1024
+
+class PeerStats:
+    """Request history and quality measurements for one peer."""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.invalid = 0
+        self.rtt = None
+        self.throughput = None
+        self.bytes_received = 0
+        self.last_seen = None
+        self.last_error = None
+        self.dropped_until = 0.0
+
+    def score(self) -> float:
+        """
+        Get the quality score; higher is better.
+        Starts from the inverse of the smoothed RTT and is halved for every
+        consecutive failure and every invalid-data incident.
+
+        Returns:
+            Score between 0 and 100
+        """
+        rtt = self.rtt if self.rtt is not None else DEFAULT_RTT
+        score = 100 / (1 + rtt * 10)
+        score *= 0.5 ** self.consecutive_failures
+        score *= 0.5 ** self.invalid
+        return round(score, 3)
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            'score': self.score(),
+            'rtt_ms': round(self.rtt * 1000, 1) if self.rtt is not None else None,
+            'throughput_kbps': round(self.throughput / 1024, 1) if self.throughput is not None else None,
+            'requests': self.requests,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'invalid_data': self.invalid,
+            'bytes_received': self.bytes_received,
+            'last_seen_age': now - self.last_seen if self.last_seen else None,
+            'last_error': self.last_error,
+            'dropped_for': max(0.0, self.dropped_until - now) or None
+        }
+
+class PeerTable:
+    """
+    Quality table of peers, fed by every outbound request.
+    Ranks peers by score and drops the ones that keep failing or keep
+    sending invalid data for a while.
+    """
+
+    def __init__(self, max_failures: int = MAX_FAILURES, max_invalid: int = MAX_INVALID,
+                 drop_period: float = DROP_PERIOD):
+        """
+        Initialize an empty table.
+
+        Args:
+            max_failures: Consecutive failures before a peer is dropped
+            max_invalid: Invalid-data incidents before a peer is dropped
+            drop_period: Seconds a dropped peer is ignored
+        """
+        self.max_failures = max_failures
+        self.max_invalid = max_invalid
+        self.drop_period = drop_period
+        self._peers: Dict[str, PeerStats] = {}
+        self._lock = threading.Lock()
+        self.logger = None
+
+    def _stats(self, peer: str) -> PeerStats:
+        """Get or create the entry of a peer. Caller holds the lock."""
+        stats = self._peers.get(peer)
+        if stats is None:
+            stats = self._peers[peer] = PeerStats()
+        return stats
+
+    def _drop(self, peer: str, stats: PeerStats, reason: str) -> None:
+        """Drop a peer for the drop period. Caller holds the lock."""
+        if stats.dropped_until > time.time():
+            return
+        stats.dropped_until = time.time() + self.drop_period
+        if self.logger:
+            self.logger.warning(f"Dropping peer {peer} for {self.drop_period}s: {reason}")
+
+    def record_request(self, peer: str, rtt: float, nbytes: Optional[int] = None,
+                       duration: Optional[float] = None, error: Optional[str] = None) -> None:
+        """
+        Record one request to a peer.
+
+        Args:
+            peer: Peer URL (scheme and host)
+            rtt: Seconds until the response headers arrived (or the failure)
+            nbytes: Response body size, if the body was read
+            duration: Seconds for the whole request including the body
+            error: Error message if the request failed
+        """
+        now = time.time()
+        with self._lock:
+            stats = self._stats(peer)
+            stats.requests += 1
+            if error is not None:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                stats.last_error = error
+                if stats.consecutive_failures >= self.max_failures:
+                    self._drop(peer, stats, f"{stats.consecutive_failures} consecutive failures")
+                return
+            stats.consecutive_failures = 0
+            stats.last_seen = now
+            stats.rtt = rtt if stats.rtt is None else (1 - EWMA_ALPHA) * stats.rtt + EWMA_ALPHA * rtt
+            if nbytes:
+                stats.bytes_received += nbytes
+                if nbytes >= MIN_THROUGHPUT_BYTES and duration:
+                    rate = nbytes / duration
+                    stats.throughput = rate if stats.throughput is None else (
+                        (1 - EWMA_ALPHA) * stats.throughput + EWMA_ALPHA * rate)
+
+    def record_invalid(self, peer: str, reason: str) -> None:
+        """
+        Record that a peer sent invalid data (bad block, chain or encoding).
+
+        Args:
+            peer: Peer URL
+            reason: Description of the problem
+        """
+        with self._lock:
+            stats = self._stats(peer)
+            stats.invalid += 1
+            stats.last_error = reason
+            if stats.invalid >= self.max_invalid:
+                self._drop(peer, stats, f"{stats.invalid} invalid-data incidents")
+
+    def rejoined(self, peer: str) -> None:
+        """
+        Give a peer that re-registered with the tracker another chance.
+        Drops for invalid data stay in force.
+
+        Args:
+            peer: Peer URL
+        """
+        with self._lock:
+            stats = self._peers.get(peer)
+            if stats is None:
+                return
+            stats.consecutive_failures = 0
+            if stats.invalid < self.max_invalid:
+                stats.dropped_until = 0.0
+
+    def is_dropped(self, peer: str) -> bool:
+        """
+        Check whether a peer is currently dropped.
+        A peer whose drop period expired gets a clean slate.
+
+        Args:
+            peer: Peer URL
+
+        Returns:
+            True if the peer should not be contacted
+        """
+        with self._lock:
+            stats = self._peers.get(peer)
+            if stats is None or not stats.dropped_until:
+                return False
+            if stats.dropped_until > time.time():
+                return True
+            stats.dropped_until = 0.0
+            stats.consecutive_failures = 0
+            stats.invalid = 0
+            return False
+
+    def rank(self, peers: Iterable[str]) -> List[str]:
+        """
+        Order peers from best to worst, leaving out dropped ones.
+
+        Args:
+            peers: Peer URLs
+
+        Returns:
+            Healthy peers, highest score first
+        """
+        healthy = [peer for peer in peers if not self.is_dropped(peer)]
+        with self._lock:
+            scores = {peer: self._peers[peer].score() if peer in self._peers else PeerStats().score()
+                      for peer in healthy}
+        return sorted(healthy, key=lambda peer: -scores[peer])
+
+    def to_dict(self, peers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the table entries of the given peers.
+
+        Args:
+            peers: Peer URLs
+
+        Returns:
+            Dict mapping peer URL to its score and measurements
+        """
+        now = time.time()
+        with self._lock:
+            return {peer: (self._peers.get(peer) or PeerStats()).to_dict(now) for peer in peers}
@@ -0,0 +1,191 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable
+
+# Number of delivery worker threads
+RELAY_WORKERS = 4
+# Delivery attempts per peer before a block is dropped
+MAX_ATTEMPTS = 4
+# First retry delay in seconds, doubled on each further failure
+RETRY_BASE = 0.5
+# Per-request timeout in seconds for a single delivery
+DELIVERY_TIMEOUT = 3
+# Maximum blocks queued per peer; the oldest are dropped beyond this
+MAX_QUEUE = 64
+
+class _PeerState:
+    """Outbound queue and delivery statistics for one peer."""
+
+    def __init__(self):
+        self.queue = deque()
+        self.busy = False
+        self.ready_at = 0.0
+        self.delivered = 0
+        self.rejected = 0
+        self.failed = 0
+        self.dropped = 0
+        self.attempts = 0
+        self.consecutive_failures = 0
+        self.last_latency = None
+        self.last_rtt = None
+        self.total_latency = 0.0
+        self.last_error = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = self.delivered + self.rejected
+        return {
+            'queued': len(self.queue),
+            'delivered': self.delivered,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'attempts': self.attempts,
+            'consecutive_failures': self.consecutive_failures,
+            'last_latency': self.last_latency,
+            'avg_latency': self.total_latency / completed if completed else None,
+            'last_rtt': self.last_rtt,
+            'last_error': self.last_error,
+            'next_retry_in': max(0.0, self.ready_at - time.time()) if self.queue else None
+        }
+
+class BlockRelay:
+    """
+    Background relay that pushes blocks to peers without blocking the caller.
+    Each peer has its own FIFO queue so blocks arrive in order, while different
+    peers are served in parallel by a small pool of worker threads.
+    """
+
+    def __init__(self, send: Callable[[str, Any, float], bool], logger=None,
+                 workers: int = RELAY_WORKERS, max_attempts: int = MAX_ATTEMPTS,
+                 retry_base: float = RETRY_BASE, timeout: float = DELIVERY_TIMEOUT):
+        """
+        Initialize relay.
+
+        Args:
+            send: Function taking (peer, block, timeout); returns True if the peer
+                  accepted the block, False if it rejected it, and raises on
+                  transport errors that should be retried
+            logger: Logger instance (optional)
+            workers: Number of worker threads
+            max_attempts: Delivery attempts per block and peer
+            retry_base: Initial retry delay in seconds
+            timeout: Per-request timeout in seconds
+        """
+        self.send = send
+        self.logger = logger
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.timeout = timeout
+        self._peers: Dict[str, _PeerState] = {}
+        self._cond = threading.Condition()
+        self._started = False
+
+    def start(self) -> None:
+        """Start worker threads (idempotent)."""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f'relay-{i}', daemon=True).start()
+
+    def enqueue(self, block: Any, peers: Iterable[str]) -> int:
+        """
+        Queue a block for delivery to peers and return immediately.
+
+        Args:
+            block: Block to deliver
+            peers: Peer URLs to deliver to
+
+        Returns:
+            Number of peers the block was queued for
+        """
+        self.start()
+        now = time.time()
+        count = 0
+        with self._cond:
+            for peer in peers:
+                state = self._peers.setdefault(peer, _PeerState())
+                if len(state.queue) >= MAX_QUEUE:
+                    state.queue.popleft()
+                    state.dropped += 1
+                state.queue.append({'block': block, 'attempts': 0, 'queued_at': now})
+                count += 1
+            self._cond.notify_all()
+        return count
+
+    def _next_job(self):
+        """Pick a ready peer and its head job. Caller holds the condition."""
+        now = time.time()
+        wait_for = None
+        for peer, state in self._peers.items():
+            if state.busy or not state.queue:
+                continue
+            if state.ready_at <= now:
+                state.busy = True
+                return peer, state, state.queue.popleft(), None
+            delay = state.ready_at - now
+            wait_for = delay if wait_for is None else min(wait_for, delay)
+        return None, None, None, wait_for
+
+    def _worker(self) -> None:
+        """Deliver queued blocks until the process exits."""
+        while True:
+            with self._cond:
+                peer, state, job, wait_for = self._next_job()
+                while peer is None:
+                    self._cond.wait(timeout=wait_for)
+                    peer, state, job, wait_for = self._next_job()
+
+            start = time.time()
+            error = None
+            accepted = False
+            try:
+                accepted = self.send(peer, job['block'], self.timeout)
+            except Exception as e:
+                error = str(e)
+            finished = time.time()
+
+            with self._cond:
+                state.busy = False
+                state.attempts += 1
+                job['attempts'] += 1
+                if error is None:
+                    latency = finished - job['queued_at']
+                    state.last_latency = latency
+                    state.total_latency += latency
+                    state.last_rtt = finished - start
+                    state.consecutive_failures = 0
+                    state.last_error = None
+                    if accepted:
+                        state.delivered += 1
+                    else:
+                        state.rejected += 1
+                else:
+                    state.last_error = error
+                    state.consecutive_failures += 1
+                    if job['attempts'] < self.max_attempts:
+                        # Retry the same block first to keep per-peer ordering
+                        state.queue.appendleft(job)
+                        state.ready_at = finished + self.retry_base * (2 ** (job['attempts'] - 1))
+                    else:
+                        state.failed += 1
+                self._cond.notify_all()
+
+            if self.logger:
+                if error is None:
+                    self.logger.debug(f"Block relayed to {peer} in {finished - job['queued_at']:.3f}s")
+                else:
+                    self.logger.warning(f"Failed to relay block to {peer} (attempt {job['attempts']}): {error}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-peer delivery statistics.
+
+        Returns:
+            Dict mapping peer URL to its queue depth, delivery counts and latencies
+        """
+        with self._cond:
+            return {peer: state.to_dict() for peer, state in self._peers.items()}
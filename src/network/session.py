@@ -0,0 +1,176 @@
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.network.peers import PeerTable
+
+# Default timeout in seconds for every outbound request
+DEFAULT_TIMEOUT = 5
+# Maximum keep-alive connections held per peer
+POOL_MAXSIZE = 4
+# Maximum number of peers with an open session; least recently used are closed
+MAX_SESSIONS = 64
+# Retries for failed connections (any method) and gateway errors (GET only)
+RETRIES = 2
+# Backoff between retries: BACKOFF_FACTOR * 2 ** (retry - 1) seconds
+BACKOFF_FACTOR = 0.2
+
+def origin_of(url: str) -> str:
+    """
+    Get the scheme and host part of a URL, which identifies a peer.
+
+    Args:
+        url: Full URL
+
+    Returns:
+        Origin such as "http://localhost:5001"
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class PeerSessionPool:
+    """
+    Keep-alive HTTP sessions, one per peer origin.
+    Reuses TCP connections across calls and applies consistent timeouts and retries.
+    Every request to a peer is reported to the peer table (RTT, body size,
+    failures); origins that are not peers, such as the tracker, can be excluded.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, pool_maxsize: int = POOL_MAXSIZE,
+                 max_sessions: int = MAX_SESSIONS, retries: int = RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR, table: PeerTable = None):
+        """
+        Initialize an empty session pool.
+
+        Args:
+            timeout: Default request timeout in seconds
+            pool_maxsize: Connections kept alive per peer
+            max_sessions: Number of peer sessions kept open
+            retries: Retry attempts for connection failures
+            backoff_factor: Exponential backoff factor between retries
+            table: Peer quality table to report requests to (optional)
+        """
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_sessions = max_sessions
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.table = table
+        # Origins whose requests are not reported to the peer table
+        self.unscored = set()
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exclude(self, *urls: str) -> None:
+        """
+        Stop reporting requests to the origins of these URLs to the peer table.
+
+        Args:
+            *urls: URLs that are not peers (e.g. the tracker or this node itself)
+        """
+        self.unscored.update(origin_of(url) for url in urls)
+
+    def _new_session(self) -> requests.Session:
+        """Create a session with a bounded, retrying connection pool."""
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=self.retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET'}),
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize,
+                              max_retries=retry, pool_block=False)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """
+        Get the session for the origin of a URL, creating it if needed.
+
+        Args:
+            url: Full request URL
+
+        Returns:
+            Session bound to the URL's scheme and host
+        """
+        origin = origin_of(url)
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is not None:
+                self._sessions.move_to_end(origin)
+                return session
+            session = self._new_session()
+            self._sessions[origin] = session
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                evicted.close()
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request over the peer's pooled session.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            **kwargs: Passed through to requests; timeout defaults to the pool timeout
+
+        Returns:
+            HTTP response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        origin = origin_of(url)
+        table = self.table if origin not in self.unscored else None
+        start = time.time()
+        try:
+            resp = self.session_for(url).request(method, url, **kwargs)
+        except requests.RequestException as e:
+            if table is not None:
+                table.record_request(origin, time.time() - start, error=str(e))
+            raise
+        if table is not None:
+            # Streamed bodies are read later by the caller; only their RTT is measured here
+            nbytes = None if kwargs.get('stream') else len(resp.content)
+            error = f"HTTP {resp.status_code}" if resp.status_code >= 500 else None
+            table.record_request(origin, resp.elapsed.total_seconds(), nbytes,
+                                 time.time() - start, error)
+        return resp
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request over the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request over the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """Close all sessions and their connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+# Quality table of every peer this process talks to
+peer_table = PeerTable()
+# Shared pool used for all peer and tracker traffic of this process
+pool = PeerSessionPool(table=peer_table)
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the shared pool."""
+    return pool.get(url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Send a POST request through the shared pool."""
+    return pool.post(url, **kwargs)
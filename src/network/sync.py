@@ -0,0 +1,328 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+class _Call:
+    """One in-flight run shared by all callers that arrive while it runs."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls of a function into a single run.
+    Callers arriving while a run is in flight wait for it and share its
+    result (or exception) instead of starting their own.
+    """
+
+    def __init__(self, fn: Callable[[], Any]):
+        """
+        Initialize wrapper.
+
+        Args:
+            fn: Function to run; takes no arguments
+        """
+        self.fn = fn
+        self._lock = threading.Lock()
+        self._call: Optional[_Call] = None
+        self.last_finished = None
+        self.stats = {'runs': 0, 'coalesced': 0, 'fresh_skips': 0}
+
+    def do(self, max_age: float = None) -> Any:
+        """
+        Run the function, or join the run already in flight.
+
+        Args:
+            max_age: If given and a run finished less than this many seconds
+                     ago, return None without running again
+
+        Returns:
+            Result of the (shared) run, or None if skipped as fresh
+
+        Raises:
+            Exception: Whatever the shared run raised
+        """
+        with self._lock:
+            call = self._call
+            if call is None:
+                if (max_age is not None and self.last_finished is not None
+                        and time.time() - self.last_finished < max_age):
+                    self.stats['fresh_skips'] += 1
+                    return None
+                call = self._call = _Call()
+                leader = True
+                self.stats['runs'] += 1
+            else:
+                leader = False
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._call = None
+                self.last_finished = time.time()
+            call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> bool:
+        """Check whether a run is currently in progress."""
+        with self._lock:
+            return self._call is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get run statistics.
+
+        Returns:
+            Dict with run/coalesce/skip counters and seconds since the last run
+        """
+        with self._lock:
+            since = time.time() - self.last_finished if self.last_finished is not None else None
+            return dict(self.stats, in_flight=self._call is not None, seconds_since_last=since)
+
+# Shortest and longest pause between background polls in seconds; the pause
+# doubles after every poll that found nothing new
+MIN_POLL_INTERVAL = 2
+MAX_POLL_INTERVAL = 60
+# Seconds to wait for an announced block to arrive by relay before syncing for it
+ANNOUNCE_GRACE = 2
+# First backoff in seconds for a failing peer, doubled per consecutive failure
+BACKOFF_BASE = 2
+MAX_BACKOFF = 300
+# Peer responses slower than this many seconds are backed off like failures
+SLOW_RESPONSE = 3
+
+class _PeerSyncState:
+    """Sync history of one peer."""
+
+    def __init__(self):
+        self.failures = 0
+        self.slow = 0
+        self.retry_at = 0.0
+        self.last_valid_at = None
+        self.last_elapsed = None
+        self.last_error = None
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            'failures': self.failures,
+            'slow': self.slow,
+            'backoff_remaining': max(0.0, self.retry_at - now),
+            'last_valid_block_age': now - self.last_valid_at if self.last_valid_at else None,
+            'last_elapsed': self.last_elapsed,
+            'last_error': self.last_error
+        }
+
+class SyncScheduler:
+    """
+    Decides when to sync and with which peers.
+    Syncs immediately on triggers and on announced blocks that did not arrive
+    by relay, and otherwise polls at an interval that grows while the network
+    is idle. Failing or slow peers are skipped with exponential backoff;
+    peers that recently supplied valid blocks are contacted first.
+    """
+
+    def __init__(self, run_sync: Callable[[], bool], have_block: Callable[[str], bool], logger=None,
+                 min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                 grace: float = ANNOUNCE_GRACE):
+        """
+        Initialize scheduler.
+
+        Args:
+            run_sync: Function running one sync; returns True if the chain changed
+            have_block: Function telling whether a block hash is in the local chain
+            logger: Logger instance (optional)
+            min_interval: Shortest poll interval in seconds
+            max_interval: Longest poll interval in seconds
+            grace: Seconds an announced block may take to arrive before syncing
+        """
+        self.run_sync = run_sync
+        self.have_block = have_block
+        self.logger = logger
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grace = grace
+        self.interval = min_interval
+        self._next_poll = time.time() + min_interval
+        self._triggered = False
+        self._announced: Dict[str, float] = {}
+        self._peers: Dict[str, _PeerSyncState] = {}
+        self._cond = threading.Condition()
+        self._started = False
+        self.stats = {'polls': 0, 'triggered': 0, 'announced': 0, 'changed': 0}
+
+    def start(self) -> None:
+        """Start the scheduler thread (idempotent)."""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._loop, name='sync-scheduler', daemon=True).start()
+
+    def trigger(self) -> None:
+        """Request a sync as soon as possible (e.g. new peers joined)."""
+        with self._cond:
+            self._triggered = True
+            self._cond.notify()
+
+    def announced(self, block_hashes: List[str]) -> None:
+        """
+        Note blocks announced by a peer; a sync runs if any of them is still
+        missing from the chain after the grace period.
+
+        Args:
+            block_hashes: Announced block hashes
+        """
+        due = time.time() + self.grace
+        with self._cond:
+            for h in block_hashes:
+                self._announced.setdefault(h, due)
+            self._cond.notify()
+
+    def _next_run(self, now: float) -> Tuple[Optional[str], float]:
+        """Pick the reason for the next run, or how long to wait. Caller holds the condition."""
+        if self._triggered:
+            return 'triggered', 0
+        wake = self._next_poll
+        due = [h for h, at in self._announced.items() if at <= now]
+        if due:
+            for h in due:
+                del self._announced[h]
+            if any(not self.have_block(h) for h in due):
+                return 'announced', 0
+        if self._announced:
+            wake = min(wake, min(self._announced.values()))
+        if now >= self._next_poll:
+            return 'polls', 0
+        return None, wake - now
+
+    def _loop(self) -> None:
+        """Run syncs whenever the schedule says so."""
+        while True:
+            with self._cond:
+                reason, wait_for = self._next_run(time.time())
+                while reason is None:
+                    self._cond.wait(timeout=wait_for)
+                    reason, wait_for = self._next_run(time.time())
+                self._triggered = False
+                self.stats[reason] += 1
+
+            try:
+                changed = self.run_sync()
+            except Exception as e:
+                changed = False
+                if self.logger:
+                    self.logger.error(f"Scheduled sync failed: {e}")
+
+            with self._cond:
+                if changed:
+                    self.stats['changed'] += 1
+                if changed or reason != 'polls':
+                    # The network is active; poll again soon
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * 2, self.max_interval)
+                self._next_poll = time.time() + self.interval
+            if self.logger:
+                self.logger.debug(f"Sync ({reason}) changed={changed}; next poll in {self.interval:.0f}s")
+
+    def eligible(self, peers: Iterable[str]) -> List[str]:
+        """
+        Select the peers to contact in a sync.
+
+        Args:
+            peers: Known peer URLs, best first
+
+        Returns:
+            Peers not in backoff, those that recently supplied valid blocks first
+        """
+        now = time.time()
+        with self._cond:
+            selected = []
+            for peer in peers:
+                state = self._peers.get(peer)
+                if state is not None and state.retry_at > now:
+                    continue
+                selected.append((peer, state.last_valid_at or 0 if state else 0))
+        # Stable sort: peers equally recent keep their given order
+        selected.sort(key=lambda item: -item[1])
+        return [peer for peer, _ in selected]
+
+    def record(self, peer: str, elapsed: float, error: str = None) -> None:
+        """
+        Record the outcome of contacting a peer during sync.
+
+        Args:
+            peer: Peer URL
+            elapsed: Seconds the request took
+            error: Error message if the request failed or returned invalid data
+        """
+        now = time.time()
+        with self._cond:
+            state = self._peers.setdefault(peer, _PeerSyncState())
+            state.last_elapsed = elapsed
+            state.last_error = error
+            if error is not None:
+                state.failures += 1
+                state.retry_at = now + min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (state.failures - 1))
+                return
+            state.failures = 0
+            if elapsed > SLOW_RESPONSE:
+                state.slow += 1
+                state.retry_at = now + min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (state.slow - 1))
+            else:
+                state.slow = 0
+                state.retry_at = 0.0
+
+    def supplied(self, peer: str) -> None:
+        """
+        Record that a peer's chain was adopted, so it is contacted first next time.
+
+        Args:
+            peer: Peer URL
+        """
+        with self._cond:
+            self._peers.setdefault(peer, _PeerSyncState()).last_valid_at = time.time()
+
+    def forget(self, active_peers: Iterable[str]) -> None:
+        """
+        Drop state of peers no longer in the network.
+
+        Args:
+            active_peers: Current peer URLs
+        """
+        active = set(active_peers)
+        with self._cond:
+            for peer in list(self._peers):
+                if peer not in active:
+                    del self._peers[peer]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get scheduler state.
+
+        Returns:
+            Dict with the current poll interval, run counters and per-peer backoff
+        """
+        now = time.time()
+        with self._cond:
+            return {
+                'interval': self.interval,
+                'next_poll_in': max(0.0, self._next_poll - now),
+                'pending_announcements': len(self._announced),
+                'runs': dict(self.stats),
+                'peers': {peer: state.to_dict(now) for peer, state in self._peers.items()}
+            }
@@ -0,0 +1,399 @@
+import time
+import bisect
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.blockchain.block import Block
+from src.blockchain.guard import is_vote
+from src.blockchain.follow import ChainFollower
+
+def vote_delta(block):
+    """
+    Count the votes per candidate in one block.
+
+    Args:
+        block: Block to count
+
+    Returns:
+        Dict mapping candidate to number of votes in the block
+    """
+    counts = {}
+    for transaction in block.transactions:
+        if is_vote(transaction):
+            candidate = transaction['recipient']
+            counts[candidate] = counts.get(candidate, 0) + 1
+    return counts
+
+# Timeline resolutions in seconds; buckets start on local-time boundaries
+GRANULARITIES = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+def bucket_start(timestamp: float, size: int) -> int:
+    """
+    Get the start of the local-time bucket containing a timestamp.
+
+    Args:
+        timestamp: Unix timestamp
+        size: Bucket size in seconds
+
+    Returns:
+        Unix timestamp of the bucket start
+    """
+    ts = int(timestamp)
+    offset = time.localtime(ts).tm_gmtoff
+    return ts - (ts + offset) % size
+
+class VoteTimeline:
+    """
+    Vote counts per minute, hour and day, updated as blocks are counted.
+    Each resolution keeps its non-empty bucket starts sorted, so range
+    queries bisect instead of scanning. Caller provides locking.
+    """
+
+    def __init__(self):
+        """Initialize empty buckets."""
+        self.counts: Dict[str, Dict[int, int]] = {name: {} for name in GRANULARITIES}
+        self.starts: Dict[str, List[int]] = {name: [] for name in GRANULARITIES}
+
+    def add(self, timestamp: float, votes: int) -> None:
+        """
+        Add (or with a negative count, remove) votes at a time.
+
+        Args:
+            timestamp: Block timestamp
+            votes: Number of votes
+        """
+        for name, size in GRANULARITIES.items():
+            start = bucket_start(timestamp, size)
+            counts, starts = self.counts[name], self.starts[name]
+            value = counts.get(start, 0) + votes
+            if value:
+                if start not in counts:
+                    bisect.insort(starts, start)
+                counts[start] = value
+            elif start in counts:
+                del counts[start]
+                del starts[bisect.bisect_left(starts, start)]
+
+    def query(self, granularity: str, start: float = None, end: float = None) -> List[Tuple[int, int]]:
+        """
+        Get the non-empty buckets overlapping a time range.
+
+        Args:
+            granularity: 'minute', 'hour' or 'day'
+            start: Range start timestamp (inclusive; open if omitted)
+            end: Range end timestamp (exclusive; open if omitted)
+
+        Returns:
+            List of (bucket start, votes), oldest first
+        """
+        counts, starts = self.counts[granularity], self.starts[granularity]
+        size = GRANULARITIES[granularity]
+        lo = 0 if start is None else bisect.bisect_left(starts, bucket_start(start, size))
+        hi = len(starts) if end is None else bisect.bisect_left(starts, end)
+        return [(bucket, counts[bucket]) for bucket in starts[lo:hi]]
+
+class VoteRecord(NamedTuple):
+    """Where a voter's vote is recorded in the chain."""
+    candidate: str
+    height: int
+    timestamp: float
+    position: int
+
+class BlockTally:
+    """Vote counts and voter records contributed by one block."""
+
+    def __init__(self, block: Block):
+        self.block = block
+        self.candidates = vote_delta(block)
+        self.records = [
+            (transaction['sender'],
+             VoteRecord(transaction['recipient'], block.index, block.timestamp, position))
+            for position, transaction in enumerate(block.transactions) if is_vote(transaction)
+        ]
+        self.votes = len(self.records)
+
+class CandidateRanking:
+    """
+    Candidates kept in two sorted lists, by votes (most first, ties by name)
+    and by name, updated one candidate at a time as blocks are counted.
+    Finding a position bisects, so a page of k candidates is a slice instead
+    of a sort of every candidate. Caller provides locking.
+    """
+
+    def __init__(self):
+        """Initialize an empty ranking."""
+        # (-votes, candidate) so the most voted sort first
+        self.by_votes: List[Tuple[int, str]] = []
+        self.by_name: List[str] = []
+
+    def update(self, candidate: str, old: int, new: int) -> None:
+        """
+        Move a candidate after its vote count changed.
+
+        Args:
+            candidate: Candidate ID
+            old: Previous vote count (0 if not ranked)
+            new: New vote count (0 to remove)
+        """
+        if old:
+            del self.by_votes[bisect.bisect_left(self.by_votes, (-old, candidate))]
+            if not new:
+                del self.by_name[bisect.bisect_left(self.by_name, candidate)]
+        elif new:
+            bisect.insort(self.by_name, candidate)
+        if new:
+            bisect.insort(self.by_votes, (-new, candidate))
+
+    def page(self, order: str, offset: int, limit: Optional[int]) -> List[str]:
+        """
+        Get a slice of the ranking.
+
+        Args:
+            order: 'votes' (most first) or 'name'
+            offset: Number of candidates to skip
+            limit: Maximum number of candidates (all remaining if None)
+
+        Returns:
+            Candidate IDs in the requested order
+        """
+        end = None if limit is None else offset + limit
+        if order == 'votes':
+            return [candidate for _, candidate in self.by_votes[offset:end]]
+        return self.by_name[offset:end]
+
+class TallyEngine(ChainFollower):
+    """
+    Vote totals and the voter index kept up to date as the chain changes.
+    Every block's contribution is stored, so on a reorg the blocks that left
+    the chain are subtracted and the new ones added; readers get the totals
+    in O(candidates) and a voter's vote in O(1) without scanning transactions.
+    """
+
+    def __init__(self):
+        """Initialize an empty tally."""
+        super().__init__()
+        self._lock = threading.Lock()
+        # Contribution of each applied block, counted when it was pushed
+        self._entries: List[BlockTally] = []
+        self.candidates: Dict[str, int] = {}
+        self.ranking = CandidateRanking()
+        # Voter -> their votes in chain order; the last one is the current vote
+        self.voters: Dict[str, List[VoteRecord]] = {}
+        self.timeline = VoteTimeline()
+        self.total_votes = 0
+        self.stats = {'blocks_applied': 0, 'blocks_reverted': 0, 'rebuilds': 0}
+
+    def attach(self, blockchain) -> None:
+        """
+        Count the current chain and follow its changes from now on.
+
+        Args:
+            blockchain: Blockchain to follow
+        """
+        with blockchain.lock:
+            self.rebuild(blockchain.chain)
+            blockchain.subscribe(self.on_change)
+
+    def rebuild(self, chain: Sequence[Block]) -> None:
+        """
+        Recount everything from a chain.
+
+        Args:
+            chain: Blocks to count
+        """
+        with self._lock:
+            self._entries = []
+            self.candidates, self.voters, self.timeline = {}, {}, VoteTimeline()
+            self.ranking = CandidateRanking()
+            self.total_votes = 0
+            self._replay(chain)
+            self.stats['rebuilds'] += 1
+
+    def on_change(self, kind: str, data: Dict[str, Any]) -> None:
+        """
+        Blockchain listener; runs under the writer lock.
+
+        Args:
+            kind: Blockchain event name
+            data: Blockchain event data
+        """
+        with self._lock:
+            self._follow(kind, data)
+
+    def _push(self, height: int, block: Block) -> None:
+        """Add a block on top. Caller holds the lock."""
+        entry = BlockTally(block)
+        self._entries.append(entry)
+        self._apply(entry, 1)
+        self.stats['blocks_applied'] += 1
+
+    def _pop(self, height: int, block: Block) -> None:
+        """
+        Remove the top block. Caller holds the lock.
+        Subtracts the counts stored when it was pushed, so this is also
+        correct for a block that has since been edited.
+        """
+        self._apply(self._entries.pop(), -1)
+        self.stats['blocks_reverted'] += 1
+
+    def _apply(self, entry: BlockTally, sign: int) -> None:
+        """Add or subtract one block's counts. Caller holds the lock."""
+        if not entry.votes:
+            return
+        for candidate, count in entry.candidates.items():
+            old = self.candidates.get(candidate, 0)
+            new = old + sign * count
+            if new:
+                self.candidates[candidate] = new
+            else:
+                self.candidates.pop(candidate, None)
+            self.ranking.update(candidate, old, new)
+        if sign > 0:
+            for voter, record in entry.records:
+                self.voters.setdefault(voter, []).append(record)
+        else:
+            # Blocks are removed newest first, so their records are at the end
+            for voter, _ in reversed(entry.records):
+                records = self.voters[voter]
+                records.pop()
+                if not records:
+                    del self.voters[voter]
+        self.timeline.add(entry.block.timestamp, sign * entry.votes)
+        self.total_votes += sign * entry.votes
+
+    def tip(self) -> Tuple[int, Optional[str]]:
+        """
+        Get the block the tally is up to.
+
+        Returns:
+            tuple: (height, hash), or (-1, None) before anything was counted
+        """
+        with self._lock:
+            if not self._applied:
+                return -1, None
+            block = self._applied[-1]
+            return block.index, block.hash
+
+    def lookup(self, voter: str) -> Optional[VoteRecord]:
+        """
+        Find a voter's vote in the chain.
+
+        Args:
+            voter: Voter ID
+
+        Returns:
+            The voter's latest confirmed vote, or None if they have not voted
+        """
+        with self._lock:
+            records = self.voters.get(voter)
+            return records[-1] if records else None
+
+    def voted_below(self, voter: str, height: int) -> Optional[bool]:
+        """
+        Check whether a voter has a vote below a height, for the Bloom-mode
+        vote guard (which calls it under the blockchain writer lock).
+
+        Args:
+            voter: Voter ID
+            height: Height bound (exclusive)
+
+        Returns:
+            True or False, or None if the tally has not counted up to that height yet
+        """
+        with self._lock:
+            if height > len(self._applied):
+                return None
+            records = self.voters.get(voter)
+            return bool(records) and records[0].height < height
+
+    def count_unconfirmed(self, voters) -> int:
+        """
+        Count voters without a vote in the counted chain.
+
+        Args:
+            voters: Voter IDs
+
+        Returns:
+            Number of the given voters the tally has no vote for
+        """
+        with self._lock:
+            return sum(1 for voter in voters if voter not in self.voters)
+
+    def results(self) -> Tuple[Dict[str, int], int]:
+        """
+        Get the votes per candidate.
+
+        Returns:
+            tuple: (candidate to votes, total votes)
+        """
+        with self._lock:
+            return dict(self.candidates), self.total_votes
+
+    def candidate_page(self, order: str = 'name', offset: int = 0,
+                       limit: Optional[int] = None) -> Tuple[List[Tuple[str, int]], int, int]:
+        """
+        Get a page of candidates from the maintained ranking.
+
+        Args:
+            order: 'votes' (most first, ties by name) or 'name'
+            offset: Number of candidates to skip
+            limit: Maximum number of candidates (all remaining if None)
+
+        Returns:
+            tuple: (list of (candidate, votes), number of candidates, total votes)
+        """
+        with self._lock:
+            rows = [(candidate, self.candidates[candidate])
+                    for candidate in self.ranking.page(order, offset, limit)]
+            return rows, len(self.candidates), self.total_votes
+
+    def voter_summary(self) -> Dict[str, Any]:
+        """
+        Get voter statistics.
+
+        Returns:
+            Dict with the number of distinct voters, total votes and the
+            hourly vote timeline
+        """
+        with self._lock:
+            return {
+                'total_voters': len(self.voters),
+                'total_votes': self.total_votes,
+                'vote_timeline': {
+                    time.strftime('%Y-%m-%d %H:00', time.localtime(start)): votes
+                    for start, votes in self.timeline.query('hour')
+                }
+            }
+
+    def timeline_range(self, granularity: str, start: float = None, end: float = None) -> List[Tuple[int, int]]:
+        """
+        Get vote counts per time bucket.
+
+        Args:
+            granularity: 'minute', 'hour' or 'day'
+            start: Range start timestamp (inclusive; open if omitted)
+            end: Range end timestamp (exclusive; open if omitted)
+
+        Returns:
+            List of (bucket start, votes) for non-empty buckets, oldest first
+        """
+        with self._lock:
+            return self.timeline.query(granularity, start, end)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get engine state.
+
+        Returns:
+            Dict with the counted height, sizes and update counters
+        """
+        height, block_hash = self.tip()
+        with self._lock:
+            return {
+                'height': height,
+                'hash': block_hash,
+                'candidates': len(self.candidates),
+                'voters': len(self.voters),
+                'total_votes': self.total_votes,
+                'stats': dict(self.stats)
+            }
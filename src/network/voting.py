@@ -1,5 +1,10 @@
+import json
 import time
-from flask import jsonify, request
+from flask import Response, jsonify, request
+from src.network.tally import TallyEngine, GRANULARITIES, vote_delta
+
+# Most votes accepted in one /votes/batch request
+MAX_BATCH_SIZE = 10000
 
 class Vote:
     def __init__(self, voter, candidate):
@@ -14,10 +19,60 @@ class Vote:
             'timestamp': self.timestamp
         }
 
-# Store voted users to prevent double voting
-voted_users = set()
+def parse_vote_batch(body: bytes, mimetype: str):
+    """
+    Parse a vote batch sent as a JSON array, or as NDJSON (one vote per line)
+    when the content type is application/x-ndjson.
+    
+    Args:
+        body: Request body
+        mimetype: Request content type
+        
+    Returns:
+        List of parsed items; NDJSON lines that are not valid JSON become None
+        
+    Raises:
+        ValueError: If the body is not a JSON array (or not UTF-8)
+    """
+    text = body.decode('utf-8')
+    if mimetype != 'application/x-ndjson':
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("expected a JSON array")
+        return items
+    items = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(None)
+    return items
+
+def refused(reason: str, retry_after=None):
+    """
+    Build the response for a submission refused by admission control.
+    
+    Args:
+        reason: 'saturated', 'rate_limited' or 'too_large'
+        retry_after: Seconds the client should wait (optional)
+        
+    Returns:
+        Flask response tuple (429, or 413 if the submission can never fit)
+    """
+    messages = {
+        'saturated': 'Node is busy: too many pending transactions',
+        'rate_limited': 'Too many votes from this client',
+        'too_large': 'Submission exceeds the node limits'
+    }
+    body = jsonify({'status': 'error', 'reason': reason, 'message': messages[reason]})
+    if retry_after is None:
+        return body, 413
+    return body, 429, {'Retry-After': str(retry_after)}
 
-def setup_voting_routes(app, blockchain, client_logger):
+def setup_voting_routes(app, blockchain, client_logger, on_transaction=None, on_transactions=None,
+                        admission=None, cache=None):
     """
     Setup voting-related routes for the Flask app.
     
@@ -25,7 +80,41 @@ def setup_voting_routes(app, blockchain, client_logger):
         app: Flask application instance
         blockchain: Blockchain instance
         client_logger: Logger instance
+        on_transaction: Callback invoked with each accepted vote transaction (optional)
+        on_transactions: Callback invoked with the list of vote transactions
+                         accepted by a batch (optional; defaults to on_transaction per vote)
+        admission: AdmissionController limiting vote submission (optional)
+        cache: ResponseCache for the read-only result endpoints (optional)
+        
+    Returns:
+        The TallyEngine serving the result endpoints
     """
+    # Vote totals maintained incrementally as blocks are added or reorganized
+    tally = TallyEngine()
+    tally.attach(blockchain)
+
+    def respond(name, build, mempool=False):
+        """
+        Serve a read-only JSON response through the response cache.
+        
+        Args:
+            name: Endpoint name used in the cache key
+            build: Function returning the response dictionary
+            mempool: Whether the response also depends on the pending pool
+            
+        Returns:
+            Flask response
+        """
+        if cache is None:
+            return jsonify(build())
+        # Key by the block the tally has counted, not the published chain tip: the
+        # chain snapshot is replaced before the tally listener runs. A body computed
+        # across a chain change is not stored (the cache is invalidated meanwhile)
+        key = (name, tuple(sorted(request.args.items(multi=True))), tally.tip()[1],
+               blockchain.edit_revision, blockchain.mempool_version if mempool else None)
+        body = cache.get_or_compute(key, lambda: app.json.dumps(build()).encode())
+        return Response(body, mimetype='application/json')
+
     @app.route('/vote', methods=['POST'])
     def vote():
         """
@@ -51,13 +140,6 @@ def setup_voting_routes(app, blockchain, client_logger):
                     'message': 'Missing required parameters'
                 }), 400
 
-            # Check if user has already voted
-            if voter in voted_users:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'User has already voted'
-                }), 400
-
             # Create voting transaction
             transaction = {
                 'sender': voter,
@@ -65,9 +147,25 @@ def setup_voting_routes(app, blockchain, client_logger):
                 'amount': 1  # Each vote counts as 1
             }
 
-            # Add to pending transactions
-            blockchain.add_transaction(transaction)
-            voted_users.add(voter)
+            # Check and record the vote atomically with respect to other writers
+            with blockchain.lock:
+                # Check if user has already voted, on the chain or in the pending pool
+                if blockchain.vote_guard.has_voted(voter):
+                    return jsonify({
+                        'status': 'error',
+                        'message': 'User has already voted'
+                    }), 400
+
+                if admission is not None:
+                    admitted, reason, retry_after = admission.admit(
+                        request.remote_addr, 1, len(blockchain.pending_transactions))
+                    if not admitted:
+                        return refused(reason, retry_after)
+
+                # Add to pending transactions
+                blockchain.add_transaction(transaction)
+            if on_transaction:
+                on_transaction(transaction)
 
             client_logger.info(f"User {voter} voted for {candidate}")
 
@@ -86,6 +184,85 @@ def setup_voting_routes(app, blockchain, client_logger):
                 'message': f'Vote submission failed: {str(e)}'
             }), 500
 
+    @app.route('/votes/batch', methods=['POST'])
+    def vote_batch():
+        """
+        Submit many votes in one request.
+        All votes are validated and deduplicated in one pass against the
+        pending pool and the chain, then added with a single pool update.
+        
+        Request body (JSON array, or NDJSON with one object per line when
+        Content-Type is application/x-ndjson):
+        [
+            {"voter": str, "candidate": str},
+            ...
+        ]
+        
+        Returns:
+            JSON response with per-item results and ingest rate
+        """
+        start = time.perf_counter()
+        try:
+            items = parse_vote_batch(request.get_data(), request.mimetype)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid batch: {str(e)}'
+            }), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({
+                'status': 'error',
+                'message': f'Batch too large: {len(items)} votes, at most {MAX_BATCH_SIZE}'
+            }), 413
+
+        results = []
+        accepted = []
+        seen = set()
+        with blockchain.lock:
+            for index, item in enumerate(items):
+                voter = item.get('voter') if isinstance(item, dict) else None
+                candidate = item.get('candidate') if isinstance(item, dict) else None
+                if not isinstance(voter, str) or not isinstance(candidate, str) or not voter or not candidate:
+                    reason = 'invalid_item' if not isinstance(item, dict) else 'missing_parameters'
+                elif voter in seen:
+                    reason = 'duplicate_in_batch'
+                elif blockchain.vote_guard.has_voted(voter):
+                    reason = 'already_voted'
+                else:
+                    seen.add(voter)
+                    accepted.append({'sender': voter, 'recipient': candidate, 'amount': 1})
+                    results.append({'index': index, 'status': 'accepted'})
+                    continue
+                results.append({'index': index, 'status': 'rejected', 'reason': reason})
+            if admission is not None and accepted:
+                admitted, reason, retry_after = admission.admit(
+                    request.remote_addr, len(accepted), len(blockchain.pending_transactions))
+                if not admitted:
+                    return refused(reason, retry_after)
+            blockchain.add_transactions(accepted)
+
+        if accepted:
+            if on_transactions:
+                on_transactions(accepted)
+            elif on_transaction:
+                for transaction in accepted:
+                    on_transaction(transaction)
+
+        elapsed = time.perf_counter() - start
+        client_logger.info(f"Batch of {len(items)} votes: {len(accepted)} accepted in {elapsed * 1000:.1f} ms")
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'received': len(items),
+                'accepted': len(accepted),
+                'rejected': len(items) - len(accepted),
+                'results': results,
+                'elapsed_ms': round(elapsed * 1000, 2),
+                'votes_per_second': round(len(items) / elapsed) if elapsed > 0 else None
+            }
+        })
+
     @app.route('/votes', methods=['GET'])
     def get_votes():
         """
@@ -94,15 +271,8 @@ def setup_voting_routes(app, blockchain, client_logger):
         Returns:
             JSON response with vote counts and total votes
         """
-        try:
-            # Count votes for each candidate
-            vote_counts = {}
-            for block in blockchain.chain:
-                for transaction in block.transactions:
-                    # Only count transactions with amount=1
-                    if transaction.get('amount') == 1:
-                        candidate = transaction['recipient']
-                        vote_counts[candidate] = vote_counts.get(candidate, 0) + 1
+        def build():
+            vote_counts, total_votes = tally.results()
 
             # Convert to list format
             results = [
@@ -113,16 +283,16 @@ def setup_voting_routes(app, blockchain, client_logger):
                 for candidate, count in vote_counts.items()
             ]
 
-            total_votes = sum(vote_counts.values())
-
-            return jsonify({
+            return {
                 'status': 'success',
                 'data': {
                     'results': results,
-                    'total_votes': total_votes,
-                    'last_updated': time.time()
+                    'total_votes': total_votes
                 }
-            })
+            }
+
+        try:
+            return respond('votes', build)
 
         except Exception as e:
             client_logger.error(f"Failed to get voting results: {str(e)}")
@@ -150,32 +320,20 @@ def setup_voting_routes(app, blockchain, client_logger):
                     'message': 'Missing voter ID'
                 }), 400
 
-            # Check if user has voted
-            has_voted = voter in voted_users
-            voted_candidate = None
-            vote_time = None
-            block_height = None
-
-            if has_voted:
-                # Find user's vote in blockchain
-                for block in reversed(blockchain.chain):
-                    for transaction in block.transactions:
-                        if transaction['sender'] == voter and transaction['amount'] == 1:
-                            voted_candidate = transaction['recipient']
-                            vote_time = block.timestamp
-                            block_height = block.index
-                            break
-                    if voted_candidate:
-                        break
+            # Confirmed vote from the voter index; otherwise the vote may still be pending
+            record = tally.lookup(voter)
+            has_voted = record is not None or blockchain.vote_guard.has_voted(voter)
 
             return jsonify({
                 'status': 'success',
                 'data': {
                     'voter': voter,
                     'has_voted': has_voted,
-                    'voted_candidate': voted_candidate,
-                    'vote_time': vote_time,
-                    'block_height': block_height
+                    'confirmed': record is not None,
+                    'voted_candidate': record.candidate if record else None,
+                    'vote_time': record.timestamp if record else None,
+                    'block_height': record.height if record else None,
+                    'tx_index': record.position if record else None
                 }
             })
 
@@ -189,46 +347,70 @@ def setup_voting_routes(app, blockchain, client_logger):
     @app.route('/candidates', methods=['GET'])
     def get_candidates():
         """
-        Get list of all candidates and their vote counts.
+        Get candidates and their vote counts, optionally one page at a time.
+        
+        Query parameters:
+        - sort: str  # 'name' (default) or 'votes' (most votes first, ties by name)
+        - offset: int  # Number of candidates to skip (default 0)
+        - limit: int  # Maximum number of candidates (default: all)
+        - top: int  # Shorthand for sort=votes&limit=<top>
         
         Returns:
-            JSON response with list of candidates and their statistics
+            JSON response with the requested candidates and their statistics
         """
-        try:
-            # Get all unique candidates from blockchain
-            candidates = set()
-            vote_counts = {}
-            
-            for block in blockchain.chain:
-                for transaction in block.transactions:
-                    if transaction['amount'] == 1:
-                        candidate = transaction['recipient']
-                        candidates.add(candidate)
-                        vote_counts[candidate] = vote_counts.get(candidate, 0) + 1
-
-            # Calculate total votes
-            total_votes = sum(vote_counts.values())
+        top = request.args.get('top', type=int)
+        order = 'votes' if 'top' in request.args else request.args.get('sort', 'name')
+        offset = request.args.get('offset', 0, type=int)
+        limit = top if 'top' in request.args else request.args.get('limit', type=int)
+        if order not in ('name', 'votes'):
+            return jsonify({
+                'status': 'error',
+                'message': "Invalid sort, expected 'name' or 'votes'"
+            }), 400
+        # Unparseable values come back as None
+        if offset is None or offset < 0 or (
+                ('top' in request.args or 'limit' in request.args) and (limit is None or limit < 0)):
+            return jsonify({
+                'status': 'error',
+                'message': 'offset, limit and top must be non-negative integers'
+            }), 400
+        if 'top' in request.args and 'limit' in request.args:
+            return jsonify({
+                'status': 'error',
+                'message': 'Use either top or limit, not both'
+            }), 400
+
+        def build():
+            rows, total_candidates, total_votes = tally.candidate_page(order, offset, limit)
             
             # Prepare response
             candidates_list = []
-            for candidate in sorted(candidates):
-                votes = vote_counts.get(candidate, 0)
+            for position, (candidate, votes) in enumerate(rows):
                 percentage = (votes / total_votes * 100) if total_votes > 0 else 0
                 
-                candidates_list.append({
+                entry = {
                     'candidate': candidate,
                     'votes': votes,
                     'percentage': round(percentage, 2)
-                })
+                }
+                if order == 'votes':
+                    entry['rank'] = offset + position + 1
+                candidates_list.append(entry)
 
-            return jsonify({
+            return {
                 'status': 'success',
                 'data': {
                     'candidates': candidates_list,
+                    'total_candidates': total_candidates,
                     'total_votes': total_votes,
-                    'last_updated': time.time()
+                    'sort': order,
+                    'offset': offset,
+                    'limit': limit
                 }
-            })
+            }
+
+        try:
+            return respond('candidates', build)
 
         except Exception as e:
             client_logger.error(f"Failed to get candidates list: {str(e)}")
@@ -245,48 +427,102 @@ def setup_voting_routes(app, blockchain, client_logger):
         Returns:
             JSON response with voting statistics
         """
-        try:
-            # Get all unique voters
-            voters = set()
-            total_votes = 0
-            
-            for block in blockchain.chain:
-                for transaction in block.transactions:
-                    if transaction['amount'] == 1:
-                        voter = transaction['sender']
-                        voters.add(voter)
-                        total_votes += 1
-
-            # Get current voted users
-            current_voters = len(voted_users)
+        def build():
+            summary = tally.voter_summary()
+            total_voters = summary['total_voters']
+
+            # Voters on the chain plus those whose only vote is still pending
+            with blockchain.lock:
+                pending = blockchain.vote_guard.pending_voters()
+            current_voters = total_voters + tally.count_unconfirmed(pending)
             
             # Calculate participation rate
-            participation_rate = (current_voters / len(voters) * 100) if len(voters) > 0 else 0
-            
-            # Get vote distribution by time
-            vote_timeline = {}
-            for block in blockchain.chain:
-                for transaction in block.transactions:
-                    if transaction['amount'] == 1:
-                        timestamp = block.timestamp
-                        hour = time.strftime('%Y-%m-%d %H:00', time.localtime(timestamp))
-                        vote_timeline[hour] = vote_timeline.get(hour, 0) + 1
+            participation_rate = (current_voters / total_voters * 100) if total_voters > 0 else 0
 
-            return jsonify({
+            return {
                 'status': 'success',
                 'data': {
-                    'total_voters': len(voters),
+                    'total_voters': total_voters,
                     'current_voters': current_voters,
                     'participation_rate': round(participation_rate, 2),
-                    'total_votes': total_votes,
-                    'vote_timeline': vote_timeline,
-                    'last_updated': time.time()
+                    'total_votes': summary['total_votes'],
+                    'vote_timeline': summary['vote_timeline']
                 }
-            })
+            }
+
+        try:
+            # Pending voters count towards current_voters
+            return respond('voter_stats', build, mempool=True)
 
         except Exception as e:
             client_logger.error(f"Failed to get voter statistics: {str(e)}")
             return jsonify({
                 'status': 'error',
                 'message': f'Failed to get voter statistics: {str(e)}'
-            }), 500 
\ No newline at end of file
+            }), 500 
+
+    @app.route('/vote_timeline', methods=['GET'])
+    def get_vote_timeline():
+        """
+        Get confirmed votes per time bucket.
+        
+        Query parameters:
+        - granularity: str  # 'minute', 'hour' (default) or 'day'
+        - start: float  # Range start timestamp, inclusive (optional)
+        - end: float  # Range end timestamp, exclusive (optional)
+        
+        Returns:
+            JSON response with non-empty buckets in the range, oldest first
+        """
+        try:
+            granularity = request.args.get('granularity', 'hour')
+            if granularity not in GRANULARITIES:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Invalid granularity, expected one of {', '.join(GRANULARITIES)}"
+                }), 400
+            # Unparseable values come back as None
+            start = request.args.get('start', type=float)
+            end = request.args.get('end', type=float)
+            if ('start' in request.args and start is None) or ('end' in request.args and end is None):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'start and end must be Unix timestamps'
+                }), 400
+
+            def build():
+                buckets = tally.timeline_range(granularity, start, end)
+                return {
+                    'status': 'success',
+                    'data': {
+                        'granularity': granularity,
+                        'bucket_seconds': GRANULARITIES[granularity],
+                        'start': start,
+                        'end': end,
+                        'buckets': [{'start': bucket, 'votes': votes} for bucket, votes in buckets],
+                        'total_votes': sum(votes for _, votes in buckets)
+                    }
+                }
+
+            return respond('vote_timeline', build)
+
+        except Exception as e:
+            client_logger.error(f"Failed to get vote timeline: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': f'Failed to get vote timeline: {str(e)}'
+            }), 500
+
+    @app.route('/vote_guard_stats', methods=['GET'])
+    def get_vote_guard_stats():
+        """
+        Get double-vote guard state.
+        
+        Returns:
+            JSON response with guard mode, sizes and rejection counters
+        """
+        with blockchain.lock:
+            data = blockchain.vote_guard.to_dict()
+        return jsonify({'status': 'success', 'data': data})
+
+    return tally